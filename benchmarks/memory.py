@@ -0,0 +1,104 @@
+"""
+The memory held by a synthetic show, measured with tracemalloc and reported as JSON.
+
+    python -m benchmarks.memory --contestants 10000 --output memory.json
+
+The show is measured both as built by allocation and as loaded from its saved YAML, which
+ is how the reports and the server hold it.
+"""
+
+import gc
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Dict, Callable, Optional, Sequence
+from pathlib import Path
+
+from greenbook import __version__
+from greenbook.cli.main import get_manager, get_registrar
+from benchmarks.synthetic import generate_contestants
+
+DEFAULT_CONTESTANTS = 10000
+
+
+def _retained_bytes(build: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    The memory still held by what build returns once it has finished, and the peak on the way.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = build()
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"result": result, "bytes": after - before, "peak_bytes": peak - before}
+
+
+def measure(n_contestants: int, seed: int) -> Dict[str, Any]:
+    contestants = generate_contestants(n_contestants, seed=seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        location = Path(tmp_dir)
+        registrar = get_registrar(location)
+        registrar.register_many(contestants)
+        allocated = registrar.entries()
+        del registrar
+
+        def _allocate():
+            manager = get_manager(location)
+            manager.allocate(allocated)
+            return manager.show
+
+        allocated_show = _retained_bytes(_allocate)
+        n_entries = allocated_show["result"].total_entries()
+        del allocated_show["result"]
+        loaded_show = _retained_bytes(lambda: get_manager(location).show)
+        del loaded_show["result"]
+    return {
+        "contestants": n_contestants,
+        "entries": n_entries,
+        "allocated": {**allocated_show, "bytes_per_entry": allocated_show["bytes"] / n_entries},
+        "loaded": {**loaded_show, "bytes_per_entry": loaded_show["bytes"] / n_entries},
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Measure the memory held by a synthetic Greenbook show.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--contestants",
+        type=int,
+        default=DEFAULT_CONTESTANTS,
+        help="Number of contestants in the show.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic show.")
+    parser.add_argument(
+        "--output", type=str, default=None, help="Write the JSON here instead of stdout."
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    # synthetic names trip the duplicate registration warnings
+    logging.getLogger("greenbook").setLevel(logging.ERROR)
+    report = {
+        "greenbook_version": __version__,
+        "seed": args.seed,
+        **measure(args.contestants, args.seed),
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
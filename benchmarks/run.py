@@ -0,0 +1,245 @@
+"""
+Timed scenarios over synthetic shows of increasing size, reported as JSON.
+
+    python -m benchmarks.run --sizes 100 1000 10000 --output bench.json
+
+Each size runs through a show in a fresh directory: bulk registration, a sample of single
+ registrations on top of it, allocation, judging, reports and rendering. Scenarios which
+ cost a full load or save per item (single registrations, single judgments, slips) are
+ timed on a sample, and every result also gives the time per item.
+
+Planning the judging is timed on a schedule of PLAN_CLASSES classes between PLAN_JUDGES
+ judges, the same at every size, some of whom only judge a couple of sections.
+"""
+
+import io
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+from typing import Any, Dict, List, Callable, Optional, Sequence
+from pathlib import Path
+from datetime import datetime, timezone
+
+from greenbook import __version__
+from greenbook.cli.main import get_manager, get_registrar
+from benchmarks.synthetic import (
+    generate_schedule,
+    generate_judgments,
+    generate_class_sizes,
+    generate_contestants,
+)
+from greenbook.render.labels import render_contestant_to_file
+from greenbook.render.printer import LABEL_FORMATS
+from greenbook.secretary.planning import Judge, plan_judging
+
+_LOG = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_SAMPLE = 20
+PLAN_CLASSES = 200
+PLAN_JUDGES = 10
+
+SCENARIOS = (
+    "bulk_register",
+    "register",
+    "allocate",
+    "judge",
+    "judge_batch",
+    "history",
+    "ranking",
+    "prizes",
+    "export",
+    "render_slips",
+    "entry_labels",
+    "final_report",
+    "plan_judging",
+)
+
+
+class Recorder:
+    def __init__(self, size: int, scenarios: Optional[Sequence[str]] = None):
+        self._size = size
+        self._scenarios = scenarios
+        self.results: List[Dict[str, Any]] = []
+
+    def enabled(self, scenario: str) -> bool:
+        return self._scenarios is None or scenario in self._scenarios
+
+    def time(self, scenario: str, func: Callable[[], Any], n_items: int) -> Any:
+        # reports print to stdout, which is kept for the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+        self.results.append(
+            {
+                "scenario": scenario,
+                "size": self._size,
+                "items": n_items,
+                "seconds": seconds,
+                "seconds_per_item": seconds / max(n_items, 1),
+            }
+        )
+        _LOG.warning(f"{scenario} (size {self._size}): {seconds:.3f}s for {n_items} items")
+        return result
+
+
+def run_size(
+    size: int, sample: int, seed: int, scenarios: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    recorder = Recorder(size, scenarios)
+    contestants = generate_contestants(size + sample, seed=seed)
+    bulk, singles = contestants[:size], contestants[size:]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        location = Path(tmp_dir)
+        # the bulk registration is needed by every later scenario, so always runs
+        registrar = get_registrar(location)
+        recorder.time("bulk_register", lambda: registrar.register_many(bulk), len(bulk))
+        if recorder.enabled("register"):
+            recorder.time(
+                "register", lambda: [registrar.register(c) for c in singles], len(singles)
+            )
+
+        def _allocate():
+            manager = get_manager(location)
+            manager.allocate(get_registrar(location).entries())
+            return manager
+
+        manager = recorder.time("allocate", _allocate, len(bulk))
+        judgments = generate_judgments(
+            {c.class_id: len(c) for c in manager.show.classes()}, seed=seed
+        )
+        if recorder.enabled("judge"):
+
+            def _judge():
+                for judgment in judgments[:sample]:
+                    get_manager(location).add_judgment(
+                        class_id=judgment.class_id,
+                        first=judgment.first,
+                        second=judgment.second,
+                        third=judgment.third,
+                        commendations=judgment.commendations,
+                    )
+
+            recorder.time("judge", _judge, min(sample, len(judgments)))
+        if recorder.enabled("judge_batch"):
+            recorder.time(
+                "judge_batch",
+                lambda: get_manager(location).add_judgments(judgments),
+                len(judgments),
+            )
+        manager = get_manager(location)
+        if recorder.enabled("history"):
+            saved_times = sorted({change.time for change in manager.history.changes()})
+            recorder.time(
+                "history",
+                lambda: [manager.history.show_at(saved) for saved in saved_times],
+                len(saved_times),
+            )
+        n_contestants = len(manager.show.unique_contestants())
+        if recorder.enabled("ranking"):
+            recorder.time("ranking", manager.report_ranking, n_contestants)
+        if recorder.enabled("prizes"):
+            recorder.time("prizes", manager.report_prizes, n_contestants)
+        if recorder.enabled("export"):
+            recorder.time(
+                "export",
+                lambda: manager.export(location / "classes.csv"),
+                manager.show.total_entries(),
+            )
+        if recorder.enabled("render_slips"):
+            sampled_entries = list(manager.contestant_entries().items())[:sample]
+
+            def _render_slips():
+                for contestant, entries in sampled_entries:
+                    render_contestant_to_file(
+                        contestant.name, entries, location / "render", price=0.0
+                    )
+
+            recorder.time("render_slips", _render_slips, len(sampled_entries))
+        if recorder.enabled("entry_labels"):
+            recorder.time(
+                "entry_labels",
+                lambda: [manager.entry_labels(format) for format in LABEL_FORMATS],
+                manager.show.total_entries() * len(LABEL_FORMATS),
+            )
+        if recorder.enabled("final_report"):
+            recorder.time(
+                "final_report",
+                lambda: manager.render_final_report(location / "render"),
+                len(manager.show.classes()),
+            )
+    if recorder.enabled("plan_judging"):
+        schedule = generate_schedule(PLAN_CLASSES, n_sections=PLAN_JUDGES)
+        judges = [
+            Judge(
+                f"Judge {i}",
+                (schedule.section_ids[i - 1], schedule.section_ids[i]) if i % 2 else (),
+            )
+            for i in range(PLAN_JUDGES)
+        ]
+        class_sizes = generate_class_sizes(schedule, seed=seed)
+        recorder.time(
+            "plan_judging",
+            lambda: plan_judging(class_sizes, schedule, judges, 1.0, minutes_per_class=2.0),
+            len(class_sizes),
+        )
+    return recorder.results
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark Greenbook on synthetic shows.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Numbers of contestants."
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE,
+        help="Number of items timed in the per-item scenarios.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic shows.")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=None,
+        help="Only run these scenarios (bulk_register and allocate always run).",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="Write the JSON here instead of stdout."
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    # synthetic names trip the duplicate registration warnings
+    logging.getLogger("greenbook").setLevel(logging.ERROR)
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.sample, args.seed, args.scenarios))
+    report = {
+        "greenbook_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "seed": args.seed,
+        "sample": args.sample,
+        "results": results,
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
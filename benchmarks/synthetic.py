@@ -0,0 +1,118 @@
+"""
+A seeded generator of synthetic shows, for benchmarking.
+
+Contestants mostly enter a couple of favourite sections, as at a real show, enter each
+ class at most MAX_ENTRIES_PER_CLASS times, and only some families enter the children's
+ section.
+"""
+
+import random
+from typing import Dict, List, Sequence
+from itertools import product
+
+from greenbook.definitions import MAX_ENTRIES_PER_CLASS
+from greenbook.data.entries import Contestant
+from greenbook.secretary.judging import ClassJudgment
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE, Schedule
+
+FIRST_NAMES = (
+    "Alice Bob Carole Dahlia Edward Fiona George Harriet Ian Joan Kenneth Lucy Martin "
+    "Nora Oliver Penelope Quentin Rosemary Stanley Tabitha Ursula Victor Wilfred Yvonne "
+    "Arthur Beatrice Cecil Doris Ernest Florence Gerald Hilda Ivy Jasper Kathleen Leonard "
+    "Mabel Norman Olive Percy Queenie Reginald Sybil Trevor Violet Walter Agatha Bertie"
+).split()
+SURNAMES = (
+    "Appleby Beetroot Carrot Dahlia Eggplant Fennel Gooseberry Hazel Ivy Juniper Kale "
+    "Leek Marrow Nettle Onion Parsnip Quince Radish Shortbread Tomato Umber Vetch Wilja "
+    "Yarrow Ash Bramble Chard Damson Elder Fig Garlic Hawthorn Lovage Medlar Nutmeg "
+    "Oakley Pumpkin Rhubarb Sorrel Turnip Walnut Mulberry Greengage Pippin Russet Cobnut"
+).split()
+INITIALS = "ABCDEFGHJKLMNOPRSTW"
+
+# relative popularity of each section, roughly in line with a village show's entries
+SECTION_WEIGHTS = {"A": 6, "B": 3, "C": 5, "D": 2, "E": 6, "F": 4, "G": 2, "H": 4, "I": 1}
+CHILDREN_SECTION = "J"
+CHILDREN_FRACTION = 0.1
+FAVOURITE_FRACTION = 0.8
+DOUBLE_ENTRY_FRACTION = 0.15
+MEAN_ENTRIES = 6
+
+
+def _names(n: int, rng: random.Random) -> List[str]:
+    combinations = list(product(FIRST_NAMES, INITIALS, SURNAMES))
+    if n > len(combinations):
+        raise ValueError(f"Can only generate {len(combinations)} distinct names.")
+    return [f"{first} {initial}. {last}" for first, initial, last in rng.sample(combinations, n)]
+
+
+def _entries(rng: random.Random, schedule: Schedule) -> List[str]:
+    sections = [s for s in SECTION_WEIGHTS if s in schedule.section_ids]
+    weights = [SECTION_WEIGHTS[s] for s in sections]
+    favourites = set(rng.choices(sections, weights=weights, k=rng.randint(1, 3)))
+    if CHILDREN_SECTION in schedule.section_ids and rng.random() < CHILDREN_FRACTION:
+        favourites.add(CHILDREN_SECTION)
+    favourite_classes = [c for s in sorted(favourites) for c in schedule.section_class_ids(s)]
+    other_classes = [
+        c for s in sections if s not in favourites for c in schedule.section_class_ids(s)
+    ]
+    # a geometric number of entries, at least one
+    n_entries = min(1 + int(rng.expovariate(1 / (MEAN_ENTRIES - 1))), 40)
+    counts: Dict[str, int] = {}
+    for _ in range(n_entries):
+        pool = favourite_classes if rng.random() < FAVOURITE_FRACTION else other_classes
+        class_id = rng.choice(pool)
+        if class_id not in counts:
+            counts[class_id] = 1
+        elif counts[class_id] < MAX_ENTRIES_PER_CLASS and rng.random() < DOUBLE_ENTRY_FRACTION:
+            counts[class_id] += 1
+    return [class_id for class_id, count in counts.items() for _ in range(count)]
+
+
+def generate_contestants(
+    n: int, seed: int = 0, schedule: Schedule = DEFAULT_SCHEDULE
+) -> List[Contestant]:
+    rng = random.Random(seed)
+    return [
+        Contestant(
+            name=name,
+            classes=_entries(rng, schedule),
+            paid=round(rng.choice([0.0, 0.0, 0.5, 1.0]), 2),
+        )
+        for name in _names(n, rng)
+    ]
+
+
+def generate_schedule(n_classes: int, n_sections: int) -> Schedule:
+    """
+    A schedule of classes numbered 1 to n_classes, dealt out in turn between sections S1 to
+     S{n_sections}.
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    for i in range(1, n_classes + 1):
+        sections.setdefault(f"S{(i - 1) % n_sections + 1}", {})[str(i)] = f"Class {i}"
+    return Schedule.from_config({"sections": sections})
+
+
+def generate_class_sizes(schedule: Schedule, seed: int = 0) -> Dict[str, int]:
+    """
+    Between 1 and 40 entries in each class of the schedule.
+    """
+    rng = random.Random(seed)
+    return {class_id: rng.randint(1, 40) for class_id in schedule.class_ids}
+
+
+def generate_judgments(class_sizes: Dict[str, int], seed: int = 0) -> Sequence[ClassJudgment]:
+    """
+    Placings for every class: up to one first, second and third, and a few commendations.
+    """
+    rng = random.Random(seed)
+    judgments = []
+    for class_id, size in sorted(class_sizes.items()):
+        placed = rng.sample(range(1, size + 1), min(size, 3 + rng.randint(0, 3)))
+        judgment = ClassJudgment(class_id=class_id)
+        for place, entry in zip(["1", "2", "3"], placed):
+            judgment.add(place, entry)
+        for entry in placed[3:]:
+            judgment.add("C", entry)
+        judgments.append(judgment)
+    return judgments
@@ -3,36 +3,95 @@ The CLI module for the Greenbook application.
 """
 
 import os
+import sys
+import pandas as pd
+import asyncio
 import logging
 import argparse
-from typing import Tuple, Union, Sequence
+from typing import Tuple, Union, Optional, Sequence
 from pathlib import Path
 
 from greenbook import __version__
+from greenbook.data.lookup import LookupTable
+from greenbook.data.columns import ShowColumns
 from greenbook.data.entries import Contestant
+from greenbook.render.judging import clock_time, render_judging_sheets
+from greenbook.render.printer import LABEL_FORMATS, write_labels
+from greenbook.secretary.fees import FEES_COL, BALANCE_COL
+from greenbook.server.service import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    DEFAULT_FLUSH_INTERVAL,
+    ShowServer,
+)
+from greenbook.secretary.query import (
+    DIMENSIONS,
+    AGGREGATIONS,
+    DEFAULT_AGGREGATIONS,
+    Query,
+    Condition,
+    run_query,
+)
+from greenbook.secretary.watch import (
+    BOARD_FORMATS,
+    DEFAULT_POLL_INTERVAL,
+    ResultsWatcher,
+)
+from greenbook.secretary.sheets import SHEET_FORMATS
+from greenbook.secretary.archive import ARCHIVE_DIMENSIONS, Archive
+from greenbook.secretary.history import History, diff_shows, parse_time, describe_class
+from greenbook.secretary.judging import read_judgment_sheet, parse_entry_reference
+from greenbook.secretary.mailing import (
+    SENT_FILE,
+    ADDRESSES_FILE,
+    DEFAULT_RETRIES,
+    DEFAULT_SUBJECT,
+    DEFAULT_SMTP_PORT,
+    DEFAULT_CONNECTIONS,
+    SentLog,
+    SmtpPool,
+    SmtpSettings,
+    send_slips,
+    read_addresses,
+)
 from greenbook.secretary.manager import Manager
+from greenbook.telemetry.metrics import REGISTRY, METRICS_FILE
+from greenbook.secretary.planning import parse_judge, plan_judging
+from greenbook.telemetry.profiling import run_profiled
+from greenbook.definitions.schedule import (
+    SCHEDULE_FILE,
+    DEFAULT_SCHEDULE,
+    write_schedule,
+    location_schedule,
+)
+from greenbook.secretary.federation import federate, load_shows
 from greenbook.secretary.registration import Registrar
 
-ALLOWED_SCORES = [
-    "1",
-    "2",
-    "3",
-    "C",
-]
-
 _LOG = logging.getLogger(__name__)
 
+DEFAULT_ARCHIVE = Path(os.getenv("GREENBOOK_ARCHIVE", "~/greenbook-archive.sqlite"))
+
 
-def get_registrar(loc) -> Registrar:
+def get_registrar(loc, autosave: bool = True) -> Registrar:
     location = Path(loc) / "contestants.csv"
     location.parent.mkdir(parents=True, exist_ok=True)
-    return Registrar(ledger_loc=location)
+    schedule = location_schedule(location.parent)
+    return Registrar(ledger_loc=location, autosave=autosave, schedule=schedule)
 
 
-def get_manager(loc) -> Manager:
+def get_manager(loc, autosave: bool = True, operator: Optional[str] = None) -> Manager:
     location = Path(loc) / "classes.yaml"
     location.parent.mkdir(parents=True, exist_ok=True)
-    return Manager(ledger_loc=location)
+    schedule = location_schedule(location.parent)
+    return Manager(ledger_loc=location, autosave=autosave, schedule=schedule, operator=operator)
+
+
+def get_history(loc) -> History:
+    return History.of_ledger(Path(loc) / "classes.yaml")
+
+
+def get_archive(loc: Optional[Union[str, Path]]) -> Archive:
+    return Archive(Path(loc) if loc else DEFAULT_ARCHIVE.expanduser())
 
 
 def _handle_register(args):
@@ -41,8 +100,25 @@ def _handle_register(args):
     registrar.register(contestant)
 
 
+def _handle_delete(args):
+    registrar = get_registrar(args.location)
+    registrar.delete_contestant(args.name)
+
+
+def _handle_amend(args):
+    registrar = get_registrar(args.location)
+    contestant = Contestant(name=args.name, classes=args.entries, paid=float(args.paid))
+    registrar.amend(contestant)
+
+
+def _handle_compact(args):
+    registrar = get_registrar(args.location)
+    dropped = registrar.compact()
+    _LOG.info(f"Dropped {dropped} deleted rows from the ledger.")
+
+
 def _handle_judge(args):
-    manager = get_manager(args.location)
+    manager = get_manager(args.location, operator=args.operator)
     manager.add_judgment(
         class_id=args.class_id,
         first=args.first,
@@ -52,15 +128,24 @@ def _handle_judge(args):
     )
 
 
+def _handle_judge_batch(args):
+    manager = get_manager(args.location, operator=args.operator)
+    judgments, errors = read_judgment_sheet(Path(args.file))
+    errors.extend(manager.check_judgments(judgments))
+    if errors:
+        raise ValueError(f"Results sheet {args.file} has errors:\n" + "\n".join(errors))
+    manager.add_judgments(judgments)
+
+
 def _handle_allocate(args):
     registrar = get_registrar(args.location)
-    manager = get_manager(args.location)
-    manager.allocate(contestants=registrar.contestants())
+    manager = get_manager(args.location, operator=args.operator)
+    manager.allocate(registrar.entries())
     _handle_render_entrants(args)
 
 
 def _handle_manual_prize(args):
-    manager = get_manager(args.location)
+    manager = get_manager(args.location, operator=args.operator)
     manager.add_prize(
         class_id=args.class_id,
         contestant_id=args.contestant_id,
@@ -68,10 +153,63 @@ def _handle_manual_prize(args):
     )
 
 
+def get_lookup_table(loc) -> Optional[LookupTable]:
+    """
+    The show's lookup table, if it is at least as new as the show itself.
+    """
+    ledger_loc = Path(loc) / "classes.yaml"
+    table_loc = ledger_loc.with_suffix(".lookup")
+    if not ledger_loc.exists() or not table_loc.exists():
+        return None
+    if table_loc.stat().st_mtime < ledger_loc.stat().st_mtime:
+        return None
+    return LookupTable(table_loc)
+
+
+def get_show_columns(loc) -> ShowColumns:
+    """
+    The columnar view of the show, read from beside the show if it is at least as new as
+     the show and encoded against the current schedule, or built from the show otherwise.
+    """
+    ledger_loc = Path(loc) / "classes.yaml"
+    columns_loc = ledger_loc.with_suffix(".columns.npz")
+    schedule = location_schedule(ledger_loc.parent)
+    if columns_loc.exists() and columns_loc.stat().st_mtime >= ledger_loc.stat().st_mtime:
+        columns = ShowColumns.load(columns_loc)
+        if columns.matches(schedule):
+            return columns
+    manager = get_manager(loc)
+    if manager.show is None:
+        raise ValueError("The show has not been allocated yet.")
+    return manager.columns()
+
+
 def _handle_lookup(args):
+    table = get_lookup_table(args.location)
+    if table is not None:
+        with table:
+            name = table.lookup(class_id=args.class_id, contestant_id=args.contestant_id)
+    else:
+        manager = get_manager(args.location)
+        name = manager.lookup_contestant(
+            class_id=args.class_id, contestant_id=args.contestant_id
+        ).name
+    _LOG.info(f"Contestant {args.contestant_id} in class {args.class_id}: {name}")
+
+
+def _handle_find(args):
+    registrar = get_registrar(args.location)
     manager = get_manager(args.location)
-    contestant = manager.lookup_contestant(class_id=args.class_id, contestant_id=args.contestant_id)
-    _LOG.info(f"Contestant {args.contestant_id} in class {args.class_id}: {contestant}")
+    allocated = {}
+    if manager.show is not None:
+        allocated = {c.name: entries for c, entries in manager.contestant_entries().items()}
+    matches = registrar.similar_names(args.name, limit=args.limit)
+    if not matches:
+        print(f"No contestants found matching {args.name}")
+    for name, score in matches:
+        entries = allocated.get(name, ())
+        entries_str = ", ".join(f"class {e.class_id} entry {e.contestant_id}" for e in entries)
+        print(f"{name} ({score:.2f}): {entries_str or 'not allocated'}")
 
 
 def _handle_prizes(args):
@@ -97,10 +235,233 @@ def _handle_render_entrants(args):
     manager.render_contestants(render_loc)
 
 
+def _handle_send_slips(args):
+    location = Path(args.location)
+    manager = get_manager(location)
+    if manager.show is None:
+        raise ValueError("The show has not been allocated yet.")
+    addresses = read_addresses(
+        Path(args.addresses) if args.addresses else location / ADDRESSES_FILE
+    )
+    settings = SmtpSettings(
+        host=args.smtp_host,
+        port=args.smtp_port,
+        username=args.smtp_user,
+        password=os.getenv("GREENBOOK_SMTP_PASSWORD"),
+        starttls=not args.plain,
+    )
+    with SmtpPool(settings.connect, size=args.connections, retries=args.retries) as pool:
+        report = send_slips(
+            manager.slip_locs(location / "render"),
+            addresses,
+            pool,
+            SentLog(location / SENT_FILE),
+            sender=args.sender,
+            subject=args.subject,
+            resend=args.resend,
+        )
+    _LOG.info(
+        f"Sent {len(report.sent)} slips over {pool.connections_opened} connections, "
+        f"skipping {len(report.skipped)} sent before."
+    )
+    if report.no_address:
+        _LOG.warning(f"No email address for: {', '.join(report.no_address)}")
+    if report.no_slip:
+        _LOG.warning(f"No slip rendered for: {', '.join(report.no_slip)}")
+    for name, error in report.failed.items():
+        _LOG.error(f"Could not send the slip of {name}: {error}")
+
+
+def _handle_render_labels(args):
+    location = Path(args.location)
+    manager = get_manager(location)
+    output = Path(args.output) if args.output else location / "render" / f"labels.{args.format}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_labels(manager.entry_labels(args.format), output)
+    _LOG.info(f"Wrote the entry labels to {output}")
+
+
 def _handle_final_report(args):
     manager = get_manager(args.location)
     render_loc = Path(args.location) / "render"
-    manager.render_final_report(render_loc)
+    manager.render_final_report(render_loc, workers=args.workers)
+
+
+def _handle_serve(args):
+    server = ShowServer(
+        registrar=get_registrar(args.location, autosave=False),
+        manager=get_manager(args.location, autosave=False, operator=args.operator),
+        host=args.host,
+        port=args.port,
+        flush_interval=args.flush_interval,
+        metrics_loc=Path(args.location) / METRICS_FILE,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        _LOG.info("Stopped serving the show.")
+
+
+def _handle_watch(args):
+    watcher = ResultsWatcher(
+        history=get_history(args.location),
+        schedule=location_schedule(Path(args.location)),
+        directory=Path(args.output) if args.output else Path(args.location) / "render",
+        format=args.format,
+    )
+    _LOG.info(f"Watching the show in {args.location}, stop with Ctrl-C.")
+    try:
+        watcher.run(interval=args.interval)
+    except KeyboardInterrupt:
+        _LOG.info("Stopped watching the show.")
+
+
+def _handle_federate(args):
+    locations = [Path(show) for show in args.shows]
+    federation = federate(load_shows(locations, get_show_columns, workers=args.workers))
+    repeat = int((federation.shows_entered > 1).sum())
+    _LOG.info(
+        f"Federated {federation.shows} shows with {len(federation.names)} contestants, "
+        f"{repeat} of whom entered more than one."
+    )
+    for result in federation.prize_results(location_schedule(locations[0])):
+        print(result)
+    for name, points in federation.ranking()[: args.top]:
+        print(f"{name}: {points}")
+
+
+def _handle_init_schedule(args):
+    location = Path(args.location)
+    location.mkdir(parents=True, exist_ok=True)
+    config_loc = location / SCHEDULE_FILE
+    if config_loc.exists():
+        raise ValueError(f"{config_loc} already exists.")
+    write_schedule(DEFAULT_SCHEDULE, config_loc)
+    _LOG.info(f"Wrote the default schedule to {config_loc} for editing.")
+
+
+def _handle_balances(args):
+    registrar = get_registrar(args.location)
+    balances = registrar.balances()
+    if args.outstanding:
+        balances = balances[balances[BALANCE_COL] > 0]
+    output = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        if args.format == "json":
+            balances.to_json(output, orient="records", indent=2)
+            output.write("\n")
+        else:
+            balances.to_csv(output, index=False)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    _LOG.info(
+        f"{len(balances)} contestants owe £{balances[BALANCE_COL].clip(lower=0).sum():.2f} "
+        f"of £{balances[FEES_COL].sum():.2f} in fees."
+    )
+
+
+def _handle_export(args):
+    manager = get_manager(args.location)
+    manager.export(args.output, format=args.format, all_classes=not args.nonempty)
+
+
+def _handle_query(args):
+    query = Query(
+        where=[Condition.parse(c) for c in args.where],
+        by=args.by,
+        aggregations=args.aggregate or DEFAULT_AGGREGATIONS,
+        having=[Condition.parse(c) for c in args.having],
+    )
+    schedule = location_schedule(Path(args.location))
+    _print_frame(run_query(get_show_columns(args.location), schedule, query), args.format)
+
+
+def _print_frame(result: pd.DataFrame, format: str):
+    if format == "json":
+        result.to_json(sys.stdout, orient="records", indent=2)
+        sys.stdout.write("\n")
+    elif format == "csv":
+        result.to_csv(sys.stdout, index=False)
+    else:
+        print(result.to_string(index=False))
+
+
+def _handle_archive(args):
+    manager = get_manager(args.location)
+    if manager.show is None:
+        raise ValueError("Nothing to archive: the show has not been allocated.")
+    with get_archive(args.archive) as archive:
+        entries = archive.add_show(args.name, manager.show, manager.schedule)
+        _LOG.info(f"Archived {entries} entries as {args.name}, of {len(archive.shows())} shows.")
+
+
+def _handle_archive_query(args):
+    query = Query(
+        where=[Condition.parse(c) for c in args.where],
+        by=args.by,
+        aggregations=args.aggregate or DEFAULT_AGGREGATIONS,
+        having=[Condition.parse(c) for c in args.having],
+        dimensions=ARCHIVE_DIMENSIONS,
+    )
+    with get_archive(args.archive) as archive:
+        _print_frame(archive.query(query), args.format)
+
+
+def _handle_archive_prizes(args):
+    with get_archive(args.archive) as archive:
+        _print_frame(archive.prize_winners(prize=args.prize, last=args.last), args.format)
+
+
+def _handle_plan_judging(args):
+    plan = plan_judging(
+        class_sizes=get_show_columns(args.location).class_sizes(),
+        schedule=location_schedule(Path(args.location)),
+        judges=args.judges,
+        minutes_per_entry=args.minutes_per_entry,
+        minutes_per_class=args.minutes_per_class,
+    )
+    for judge in plan.judges:
+        slots = plan.slots[judge.name]
+        finish = clock_time(args.start, plan.load(judge))
+        print(f"{judge.name}: {len(slots)} classes, finishing at {finish}")
+    output = Path(args.output) if args.output else Path(args.location) / "judging"
+    sheets_loc = render_judging_sheets(plan, output, start=args.start)
+    _LOG.info(
+        f"Judging finishes at {clock_time(args.start, plan.makespan)}, "
+        f"{plan.makespan - plan.lower_bound:.0f} minutes after the earliest any plan could. "
+        f"Wrote the judges' sheets to {sheets_loc}"
+    )
+
+
+def _handle_history(args):
+    for change in get_history(args.location).changes():
+        if args.class_id is None or args.class_id in change.class_ids():
+            saved = change.time.isoformat(timespec="seconds")
+            print(f"{saved} {change.operator}: {change.describe()}")
+
+
+def _handle_at(args):
+    history = get_history(args.location)
+    show = history.show_at(parse_time(args.time))
+    if args.compare_to is not None:
+        other = history.show_at(parse_time(args.compare_to))
+        differences = diff_shows(show, other)
+        if args.class_id is not None:
+            differences = [d for d in differences if d.startswith(f"class {args.class_id}:")]
+        for difference in differences:
+            print(difference)
+        _LOG.info(f"Found {len(differences)} differences.")
+    elif show is None:
+        _LOG.info(f"The show had not been allocated at {args.time}.")
+    else:
+        for show_class in show.classes():
+            if args.class_id is None or show_class.class_id == args.class_id:
+                print(describe_class(show_class))
+
+
+def _handle_metrics(args):
+    print(REGISTRY.totals(Path(args.location) / METRICS_FILE).exposition(), end="")
 
 
 class CLI:
@@ -114,17 +475,52 @@ class CLI:
             help="The local in which the Greenbook data are stored.",
             default=os.getenv("GREENBOOK_LOCATION", Path("~/greenbook-data").expanduser()),
         )
+        self._parser.add_argument(
+            "--operator",
+            help="Who is making the changes, as recorded in the show's history. Defaults to "
+            "GREENBOOK_OPERATOR, or else the user's login.",
+            default=None,
+        )
+        self._parser.add_argument(
+            "--profile",
+            dest="profile",
+            action="store_true",
+            help="Profile the command, writing a cProfile dump and JSON lines of timing spans "
+            "of its phases to the profile directory of the location.",
+            default=False,
+        )
         subparsers = self._parser.add_subparsers(dest="command")
         self._add_registration(subparsers)
+        self._add_delete(subparsers)
+        self._add_amend(subparsers)
+        self._add_compact(subparsers)
         self._add_allocation(subparsers)
         self._add_judging(subparsers)
+        self._add_judge_batch(subparsers)
         self._add_lookup(subparsers)
+        self._add_find(subparsers)
         self._add_prizes(subparsers)
         self._add_ranking(subparsers)
         self._add_report_class(subparsers)
         self._add_final_report(subparsers)
         self._add_render_entrants(subparsers)
+        self._add_render_labels(subparsers)
+        self._add_send_slips(subparsers)
         self._add_manual_prize(subparsers)
+        self._add_serve(subparsers)
+        self._add_watch(subparsers)
+        self._add_metrics(subparsers)
+        self._add_balances(subparsers)
+        self._add_export(subparsers)
+        self._add_query(subparsers)
+        self._add_history(subparsers)
+        self._add_at(subparsers)
+        self._add_federate(subparsers)
+        self._add_archive(subparsers)
+        self._add_archive_query(subparsers)
+        self._add_archive_prizes(subparsers)
+        self._add_plan_judging(subparsers)
+        self._add_init_schedule(subparsers)
 
     def _add_registration(self, subparsers):
         parser = subparsers.add_parser("register", help="Register a new contestant.")
@@ -159,6 +555,55 @@ class CLI:
             default=0.0,
         )
 
+    def _add_delete(self, subparsers):
+        parser = subparsers.add_parser(
+            "delete",
+            help="Delete a contestant. Their entries keep their numbers until the ledger is "
+            "compacted.",
+        )
+        parser.set_defaults(func=_handle_delete)
+
+        parser.add_argument(
+            "--name", dest="name", help="The name of the contestant.", required=True
+        )
+
+    def _add_amend(self, subparsers):
+        parser = subparsers.add_parser(
+            "amend",
+            help="Replace the entries and payment of a registered contestant.",
+        )
+        parser.set_defaults(func=_handle_amend)
+
+        parser.add_argument(
+            "--name", dest="name", help="The name of the contestant.", required=True
+        )
+
+        parser.add_argument(
+            "--entries",
+            dest="entries",
+            required=True,
+            type=lambda x: list(x.split(",")),
+            help="Comma-separated list of all the entry numbers of the contestant.",
+        )
+
+        parser.add_argument(
+            "--paid",
+            dest="paid",
+            help="The total amount paid by the contestant.",
+            required=False,
+            type=float,
+            default=0.0,
+        )
+
+    def _add_compact(self, subparsers):
+        parser = subparsers.add_parser(
+            "compact",
+            help="Rewrite the ledger without deleted contestants. This renumbers later "
+            "entries, so allocate again afterwards.",
+        )
+
+        parser.set_defaults(func=_handle_compact)
+
     def _add_allocation(self, subparsers):
         parser = subparsers.add_parser(
             "allocate",
@@ -176,14 +621,7 @@ class CLI:
         parser.set_defaults(func=_handle_judge)
 
         def place_mapper(in_val: str) -> Sequence[Union[int, Tuple[str, int]]]:
-            contestants = []
-            for contestant in in_val.split(","):
-                if ":" in contestant:
-                    class_id, contestant_id = contestant.split(":")
-                    contestants.append((class_id, int(contestant_id)))
-                else:
-                    contestants.append(int(contestant))
-            return contestants
+            return [parse_entry_reference(contestant) for contestant in in_val.split(",")]
 
         parser.add_argument(
             "--class",
@@ -226,6 +664,96 @@ class CLI:
             default=[],
         )
 
+    def _add_judge_batch(self, subparsers):
+        parser = subparsers.add_parser(
+            "judge_batch",
+            help="Add judging results for many classes from a results sheet.",
+        )
+
+        parser.set_defaults(func=_handle_judge_batch)
+
+        parser.add_argument(
+            "--file",
+            dest="file",
+            help=(
+                "CSV results sheet with columns class, place (1, 2, 3 or C) and entry "
+                "(an entry number, or class:entry for an entry moved from another class)."
+            ),
+            required=True,
+            type=str,
+        )
+
+    def _add_send_slips(self, subparsers):
+        parser = subparsers.add_parser(
+            "send_slips",
+            help="Email each contestant their rendered entry slip, skipping those sent before.",
+        )
+        parser.add_argument(
+            "--sender",
+            type=str,
+            default=os.getenv("GREENBOOK_SMTP_SENDER"),
+            required=os.getenv("GREENBOOK_SMTP_SENDER") is None,
+            help="The address the slips are sent from. Defaults to GREENBOOK_SMTP_SENDER.",
+        )
+        parser.add_argument(
+            "--addresses",
+            type=str,
+            default=None,
+            help=f"A CSV file of the name and email of each contestant, instead of "
+            f"{ADDRESSES_FILE} in the location.",
+        )
+        parser.add_argument(
+            "--smtp_host",
+            type=str,
+            default=os.getenv("GREENBOOK_SMTP_HOST", "localhost"),
+            help="The SMTP server. Defaults to GREENBOOK_SMTP_HOST, or else localhost.",
+        )
+        parser.add_argument(
+            "--smtp_port",
+            type=int,
+            default=DEFAULT_SMTP_PORT,
+            help="The port of the SMTP server.",
+        )
+        parser.add_argument(
+            "--smtp_user",
+            type=str,
+            default=os.getenv("GREENBOOK_SMTP_USER"),
+            help="Who to log in to the SMTP server as, with the password in "
+            "GREENBOOK_SMTP_PASSWORD. Defaults to GREENBOOK_SMTP_USER, or else no login.",
+        )
+        parser.add_argument(
+            "--plain",
+            action="store_true",
+            default=False,
+            help="Do not upgrade the connection with STARTTLS, e.g. for a relay on this machine.",
+        )
+        parser.add_argument(
+            "--subject",
+            type=str,
+            default=DEFAULT_SUBJECT,
+            help="The subject of the emails.",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=DEFAULT_CONNECTIONS,
+            help="The number of connections to send over at once.",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=DEFAULT_RETRIES,
+            help="How many times to retry a slip which could not be sent for a passing reason.",
+        )
+        parser.add_argument(
+            "--resend",
+            action="store_true",
+            default=False,
+            help="Send every slip, including those sent before.",
+        )
+
+        parser.set_defaults(func=_handle_send_slips)
+
     def _add_manual_prize(self, subparsers):
         parser = subparsers.add_parser(
             "manual_prize",
@@ -282,6 +810,30 @@ class CLI:
             type=str,
         )
 
+    def _add_find(self, subparsers):
+        parser = subparsers.add_parser(
+            "find",
+            help="Find contestants by approximate name, with their entries.",
+        )
+
+        parser.set_defaults(func=_handle_find)
+
+        parser.add_argument(
+            "--name",
+            dest="name",
+            help="The name, or part of the name, to search for.",
+            required=True,
+            type=str,
+        )
+
+        parser.add_argument(
+            "--limit",
+            dest="limit",
+            help="The maximum number of matches to list.",
+            default=10,
+            type=int,
+        )
+
     def _add_prizes(self, subparsers):
         parser = subparsers.add_parser(
             "prizes",
@@ -319,6 +871,12 @@ class CLI:
             "final_report",
             help="Generate the final report.",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="The number of processes to render the report in. Defaults to the number of CPUs.",
+        )
 
         parser.set_defaults(func=_handle_final_report)
 
@@ -330,9 +888,406 @@ class CLI:
 
         parser.set_defaults(func=_handle_render_entrants)
 
+    def _add_render_labels(self, subparsers):
+        parser = subparsers.add_parser(
+            "render_labels",
+            help="Write a label for each entry as commands for a label or receipt printer.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=LABEL_FORMATS,
+            default="zpl",
+            help="zpl for label printers, or escpos for receipt printers.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The file or printer device, e.g. /dev/usb/lp0, to write the labels to, "
+            "instead of labels.zpl or labels.escpos in the location's render directory.",
+        )
+
+        parser.set_defaults(func=_handle_render_labels)
+
+    def _add_serve(self, subparsers):
+        parser = subparsers.add_parser(
+            "serve",
+            help="Serve registration, judging and results over HTTP/JSON to local devices.",
+        )
+
+        parser.set_defaults(func=_handle_serve)
+
+        parser.add_argument(
+            "--host",
+            dest="host",
+            help="The address to listen on. Use this machine's local network address "
+            "to accept other devices.",
+            default=DEFAULT_HOST,
+            type=str,
+        )
+
+        parser.add_argument(
+            "--port",
+            dest="port",
+            help="The port to listen on.",
+            default=DEFAULT_PORT,
+            type=int,
+        )
+
+        parser.add_argument(
+            "--flush_interval",
+            dest="flush_interval",
+            help="Seconds to wait after a change so that further changes share the same write.",
+            default=DEFAULT_FLUSH_INTERVAL,
+            type=float,
+        )
+
+    def _add_watch(self, subparsers):
+        parser = subparsers.add_parser(
+            "watch",
+            help="Keep a results board up to date as classes are judged, re-rendering only "
+            "the classes which change.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=BOARD_FORMATS,
+            default="html",
+            help="html for a page which reloads itself, or pdf to keep the final report "
+            "up to date.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The directory to write the board to, instead of the show's render directory.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help="Seconds between checks for changes to the show.",
+        )
+
+        parser.set_defaults(func=_handle_watch)
+
+    def _add_metrics(self, subparsers):
+        parser = subparsers.add_parser(
+            "metrics",
+            help="Print the metrics of all commands run on the show, in Prometheus text format.",
+        )
+
+        parser.set_defaults(func=_handle_metrics)
+
+    def _add_balances(self, subparsers):
+        parser = subparsers.add_parser(
+            "balances",
+            help="Export the entry fees, payments and balance of every registered contestant.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "json"],
+            default="csv",
+            help="The format of the balance sheet.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The file to write the balance sheet to, instead of stdout.",
+        )
+        parser.add_argument(
+            "--outstanding",
+            action="store_true",
+            help="Only include contestants who still owe fees.",
+        )
+
+        parser.set_defaults(func=_handle_balances)
+
+    def _add_export(self, subparsers):
+        parser = subparsers.add_parser(
+            "export",
+            help="Export the class sheet of the allocated show, giving the contestant of each "
+            "entry number in each class.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=list(SHEET_FORMATS),
+            default="csv",
+            help="The format of the class sheet. Parquet needs pyarrow.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The file to write the class sheet to, instead of stdout.",
+        )
+        parser.add_argument(
+            "--nonempty",
+            action="store_true",
+            help="Leave out classes without entries.",
+        )
+
+        parser.set_defaults(func=_handle_export)
+
+    def _add_history(self, subparsers):
+        parser = subparsers.add_parser(
+            "history",
+            help="List every change made to the show, when it was saved and who made it.",
+        )
+        parser.add_argument(
+            "--class",
+            dest="class_id",
+            type=str,
+            default=None,
+            help="Only list the changes to this class.",
+        )
+
+        parser.set_defaults(func=_handle_history)
+
+    def _add_at(self, subparsers):
+        parser = subparsers.add_parser(
+            "at",
+            help="Show the results of the classes as they stood at a time, or what has changed "
+            "in them between then and another time.",
+        )
+        parser.add_argument(
+            "--time",
+            type=str,
+            required=True,
+            help="A date and time, e.g. 2024-08-10T14:30, a time today, e.g. 14:30, or now.",
+        )
+        parser.add_argument(
+            "--compare_to",
+            type=str,
+            default=None,
+            help="Another time, or now, to list the differences from the show at --time to.",
+        )
+        parser.add_argument(
+            "--class",
+            dest="class_id",
+            type=str,
+            default=None,
+            help="Only show this class.",
+        )
+
+        parser.set_defaults(func=_handle_at)
+
+    def _add_query(self, subparsers):
+        parser = subparsers.add_parser(
+            "query",
+            help="Answer questions about the entries of the show, e.g. "
+            "query --where class=25B,25C --by contestant --aggregate classes --having classes=2",
+        )
+        parser.add_argument(
+            "--where",
+            nargs="+",
+            default=[],
+            help=f"Only count the entries matching these conditions on {', '.join(DIMENSIONS)}, "
+            "e.g. section=H place!=-",
+        )
+        parser.add_argument(
+            "--by",
+            nargs="+",
+            default=[],
+            choices=list(DIMENSIONS),
+            help="Group the entries by these columns.",
+        )
+        parser.add_argument(
+            "--aggregate",
+            nargs="+",
+            default=None,
+            choices=list(AGGREGATIONS),
+            help="What to compute for each group. Defaults to the number of entries.",
+        )
+        parser.add_argument(
+            "--having",
+            nargs="+",
+            default=[],
+            help="Only list the groups whose aggregates match these conditions, e.g. placed=0",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["table", "csv", "json"],
+            default="table",
+            help="The format of the results.",
+        )
+
+        parser.set_defaults(func=_handle_query)
+
+    def _add_archive_location(self, parser):
+        parser.add_argument(
+            "--archive",
+            default=None,
+            help="The archive of past shows. Defaults to GREENBOOK_ARCHIVE, or else "
+            f"{DEFAULT_ARCHIVE}.",
+        )
+
+    def _add_archive(self, subparsers):
+        parser = subparsers.add_parser(
+            "archive",
+            help="Add the finished show to the archive of past shows, replacing any show "
+            "archived under the same name.",
+        )
+        parser.add_argument(
+            "--name", required=True, help="The name of the show in the archive, e.g. 2024."
+        )
+        self._add_archive_location(parser)
+        parser.set_defaults(func=_handle_archive)
+
+    def _add_archive_query(self, subparsers):
+        parser = subparsers.add_parser(
+            "archive_query",
+            help="Answer questions about the entries of past shows, as query does for this "
+            'one, e.g. archive_query --where contestant="Major Marrow" class=45 place=1 '
+            "--by show",
+        )
+        parser.add_argument(
+            "--where",
+            nargs="+",
+            default=[],
+            help="Only count the entries matching these conditions on "
+            f"{', '.join(ARCHIVE_DIMENSIONS)}, e.g. show>=2015 place!=-",
+        )
+        parser.add_argument(
+            "--by",
+            nargs="+",
+            default=[],
+            choices=list(ARCHIVE_DIMENSIONS),
+            help="Group the entries by these columns.",
+        )
+        parser.add_argument(
+            "--aggregate",
+            nargs="+",
+            default=None,
+            choices=list(AGGREGATIONS),
+            help="What to compute for each group. Defaults to the number of entries.",
+        )
+        parser.add_argument(
+            "--having",
+            nargs="+",
+            default=[],
+            help="Only list the groups whose aggregates match these conditions, e.g. placed=0",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["table", "csv", "json"],
+            default="table",
+            help="The format of the results.",
+        )
+        self._add_archive_location(parser)
+        parser.set_defaults(func=_handle_archive_query)
+
+    def _add_archive_prizes(self, subparsers):
+        parser = subparsers.add_parser(
+            "archive_prizes",
+            help="List the winners of the prizes at past shows, latest first.",
+        )
+        parser.add_argument("--prize", default=None, help="Only list the winners of this prize.")
+        parser.add_argument(
+            "--last", type=int, default=None, help="Only list the winners at the last shows."
+        )
+        parser.add_argument(
+            "--format",
+            choices=["table", "csv", "json"],
+            default="table",
+            help="The format of the results.",
+        )
+        self._add_archive_location(parser)
+        parser.set_defaults(func=_handle_archive_prizes)
+
+    def _add_federate(self, subparsers):
+        parser = subparsers.add_parser(
+            "federate",
+            help="Total the points of contestants over several shows with the same schedule, "
+            "for the prizes and ranking of the region.",
+        )
+        parser.add_argument(
+            "--show",
+            dest="shows",
+            action="append",
+            required=True,
+            help="The location of a show, given once per show.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="The number of processes to load the shows in. Defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=None,
+            help="Only print this many of the ranking.",
+        )
+
+        parser.set_defaults(func=_handle_federate)
+
+    def _add_plan_judging(self, subparsers):
+        parser = subparsers.add_parser(
+            "plan_judging",
+            help="Split the judging of the allocated classes between the judges so that it "
+            "finishes as soon as possible, and write a sheet for each judge.",
+        )
+        parser.add_argument(
+            "--judges",
+            nargs="+",
+            required=True,
+            type=parse_judge,
+            help="Each judge's name, followed by = and the sections they may judge if not all, "
+            'e.g. "Joan Hollier=F,G" "Ken Leek"',
+        )
+        parser.add_argument(
+            "--minutes_per_entry",
+            type=float,
+            default=1.0,
+            help="The time to judge each entry of a class.",
+        )
+        parser.add_argument(
+            "--minutes_per_class",
+            type=float,
+            default=2.0,
+            help="The time to judge a class on top of the time for its entries.",
+        )
+        parser.add_argument(
+            "--start",
+            type=str,
+            default="10:00",
+            help="The time judging starts, as HH:MM.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The directory to write the judges' sheets to, instead of judging in the "
+            "location.",
+        )
+
+        parser.set_defaults(func=_handle_plan_judging)
+
+    def _add_init_schedule(self, subparsers):
+        parser = subparsers.add_parser(
+            "init_schedule",
+            help=f"Write the default schedule of classes and fees to {SCHEDULE_FILE} in the "
+            "location, to be edited for this show.",
+        )
+
+        parser.set_defaults(func=_handle_init_schedule)
+
     def run(self):
         args = self._parser.parse_args()
-        args.func(args)
+        try:
+            if args.profile:
+                run_profiled(
+                    lambda: args.func(args),
+                    directory=Path(args.location) / "profile",
+                    name=args.command,
+                )
+            else:
+                args.func(args)
+        finally:
+            if Path(args.location).is_dir():
+                REGISTRY.flush(Path(args.location) / METRICS_FILE)
 
 
 def run_cli():
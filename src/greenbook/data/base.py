@@ -1,4 +1,5 @@
-from typing import Generic, TypeVar
+from typing import Any, Dict, Generic, TypeVar
+from dataclasses import fields
 from ruamel.yaml import YAML
 
 _TYAMLOBJ = TypeVar("_TYAMLOBJ", bound="YamlSerializationMixin")
@@ -15,3 +16,22 @@ class YamlSerializationMixin(Generic[_TYAMLOBJ]):
 
         # Register the class with the yaml loader
         yaml.register_class(cls)
+
+
+class SlotsStateMixin:
+    """
+    Gives a slotted dataclass the state of an ordinary one, a mapping of its fields, so that
+     it is written to and read from YAML (and pickled) just as before it had slots.
+
+    Loading runs __post_init__, as it does for an ordinary dataclass.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self.__post_init__()
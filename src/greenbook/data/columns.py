@@ -0,0 +1,157 @@
+"""
+A columnar view of the show: flat arrays with an element per entry giving its class code
+ (its position in the schedule), entry number, contestant code, place and points, so that
+ questions about the whole show can be answered by vectorized operations instead of by
+ walking its classes.
+
+An entry placed in a class it was moved to from another has a row of its own in that class,
+ with entry number 0, as well as its row in the class it was entered in.
+
+The view is saved beside the show as an .npz of the arrays, along with the class ids of the
+ schedule they were encoded against and the names of the contestants.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import Dict, List, Tuple, Sequence
+from pathlib import Path
+from dataclasses import dataclass
+
+from greenbook.data.show import Show
+from greenbook.data.storage import atomic_write
+from greenbook.definitions.point import (
+    FIRST_PLACE_POINTS,
+    THIRD_PLACE_POINTS,
+    SECOND_PLACE_POINTS,
+)
+from greenbook.definitions.schedule import Schedule
+
+UNPLACED = 0
+COMMENDED = 4
+# place code -> how the place is written, as on a judging sheet
+PLACE_LABELS = ("-", "1", "2", "3", "C")
+PLACE_POINTS = np.array([0, FIRST_PLACE_POINTS, SECOND_PLACE_POINTS, THIRD_PLACE_POINTS, 0])
+
+
+@dataclass
+class ShowColumns:
+    class_ids: Tuple[str, ...]
+    names: Tuple[str, ...]
+    class_codes: np.ndarray
+    entries: np.ndarray
+    contestants: np.ndarray
+    places: np.ndarray
+    points: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.class_codes)
+
+    @classmethod
+    def from_show(cls, show: Show, schedule: Schedule) -> ShowColumns:
+        classes = show.classes()
+        lengths = np.array([len(show_class) for show_class in classes], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        name_codes: Dict[str, int] = {}
+        contestants = np.fromiter(
+            (
+                name_codes.setdefault(contestant.name, len(name_codes))
+                for show_class in classes
+                for contestant in show_class.contestants
+            ),
+            dtype=np.int32,
+            count=int(lengths.sum()),
+        )
+        class_codes = np.repeat(
+            schedule.encode([show_class.class_id for show_class in classes]), lengths
+        )
+        entries = (np.arange(lengths.sum()) - np.repeat(starts, lengths) + 1).astype(np.int32)
+        places = np.zeros(len(entries), dtype=np.int8)
+        points = np.zeros(len(entries), dtype=np.int8)
+
+        # placings are few, so are marked one by one, with entries moved from other
+        # classes added as rows of their own
+        moved: List[Tuple[int, int, int, int]] = []
+        for show_class, start in zip(classes, starts):
+            code = schedule.codes[show_class.class_id]
+            scored = set()
+            placings = (
+                show_class.first_place,
+                show_class.second_place,
+                show_class.third_place,
+                show_class.commendations,
+            )
+            for place, placing in enumerate(placings, start=1):
+                for contestant, entry in placing:
+                    # a contestant only scores for their best place in a class
+                    score = 0 if contestant.name in scored else PLACE_POINTS[place]
+                    if score:
+                        scored.add(contestant.name)
+                    if isinstance(entry, int):
+                        places[start + entry - 1] = place
+                        points[start + entry - 1] = score
+                    else:
+                        name = name_codes.setdefault(contestant.name, len(name_codes))
+                        moved.append((code, name, place, score))
+        if moved:
+            moved_codes, moved_names, moved_places, moved_points = np.array(moved).T
+            class_codes = np.concatenate([class_codes, moved_codes])
+            contestants = np.concatenate([contestants, moved_names])
+            entries = np.concatenate([entries, np.zeros(len(moved), dtype=np.int32)])
+            places = np.concatenate([places, moved_places])
+            points = np.concatenate([points, moved_points])
+        return cls(
+            class_ids=schedule.class_ids,
+            names=tuple(name_codes),
+            class_codes=class_codes.astype(np.int32),
+            entries=entries.astype(np.int32),
+            contestants=contestants.astype(np.int32),
+            places=places.astype(np.int8),
+            points=points.astype(np.int8),
+        )
+
+    def save(self, location: Path):
+        with atomic_write(location, "wb") as f:
+            np.savez(
+                f,
+                class_ids=np.array(self.class_ids, dtype=str),
+                names=np.array(self.names, dtype=str),
+                class_codes=self.class_codes,
+                entries=self.entries,
+                contestants=self.contestants,
+                places=self.places,
+                points=self.points,
+            )
+
+    @classmethod
+    def load(cls, location: Path) -> ShowColumns:
+        with np.load(location, allow_pickle=False) as data:
+            return cls(
+                class_ids=tuple(str(c) for c in data["class_ids"]),
+                names=tuple(str(n) for n in data["names"]),
+                class_codes=data["class_codes"],
+                entries=data["entries"],
+                contestants=data["contestants"],
+                places=data["places"],
+                points=data["points"],
+            )
+
+    def class_sizes(self) -> Dict[str, int]:
+        """
+        The number of entries in each class with any.
+        """
+        counts = np.bincount(self.class_codes[self.entries > 0], minlength=len(self.class_ids))
+        return {self.class_ids[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def matches(self, schedule: Schedule) -> bool:
+        """
+        Whether the class codes are those of the schedule.
+        """
+        return self.class_ids == tuple(schedule.class_ids)
+
+
+def place_codes(labels: Sequence[str]) -> List[int]:
+    try:
+        return [PLACE_LABELS.index(label.upper()) for label in labels]
+    except ValueError:
+        raise ValueError(f"Places are one of {', '.join(PLACE_LABELS)}, not {labels}.")
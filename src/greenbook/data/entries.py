@@ -1,33 +1,35 @@
-import pandas as pd
+import sys
+import numpy as np
 import pickle
 import hashlib
 from attr import attrib
-from typing import Sequence
+from typing import List, Tuple, Iterator, Sequence
 from collections import Counter
 from dataclasses import dataclass
 from ruamel.yaml import YAML, yaml_object
 
+from greenbook.data.base import SlotsStateMixin
 from greenbook.data.consts import MAX_ENTRIES_PER_CONTESTANT
-from greenbook.definitions.classes import FLAT_CLASSES
 
 yaml = YAML()
 HASH_LEN = 8
 
 
 @yaml_object(yaml)
-@dataclass
-class Contestant:
+@dataclass(slots=True)
+class Contestant(SlotsStateMixin):
     name: str = attrib(type=str)
     classes: Sequence[str] = attrib(type=Sequence[str])
     paid: float = attrib(type=float)
 
     def __post_init__(self):
+        # a show holds many contestants, so share the strings and keep the classes compact
+        self.name = sys.intern(self.name)
+        self.classes = tuple(sys.intern(c) for c in self.classes)
+        self.paid = float(self.paid)
         n_entries_per_class = Counter(self.classes)
         assert all(n <= MAX_ENTRIES_PER_CONTESTANT for n in n_entries_per_class.values())
         assert len(self.name.split()) >= 2
-        for c in self.classes:
-            if c not in FLAT_CLASSES:
-                raise ValueError(f"Unknown class {c}")
         assert self.paid >= 0.0
 
     def unique_id(self) -> str:
@@ -63,18 +65,41 @@ class Contestant:
 
 @yaml_object(yaml)
 class DeletedContestant(Contestant):
+    __slots__ = ()
+
     def __post_init__(self):
         super().__post_init__()
         assert self.name.startswith("DELETED (")
 
 
 @dataclass
-class ContestantData:
-    entries_df: pd.DataFrame = attrib()
-    paid: float = attrib()
-
-
-@dataclass
-class AllocatedContestant:
-    contestant: Contestant = attrib()
-    entries_df: pd.DataFrame = attrib()
+class RegisteredEntries:
+    """
+    Every registered entry, as flat arrays with an element per entry giving its class code
+     (the position of its class in class_ids), its entry number in the class and the
+     position of its contestant in contestants. The entries are ordered by class and then
+     by entry number, so the contestants of each class are a contiguous run.
+    """
+
+    class_ids: Tuple[str, ...]
+    contestants: Tuple[Contestant, ...]
+    class_codes: np.ndarray
+    numbers: np.ndarray
+    owners: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.class_codes)
+
+    def by_class(self) -> Iterator[Tuple[str, List[Contestant]]]:
+        """
+        The contestant of each entry of each class with any, in the order of their numbers.
+        """
+        codes, starts = np.unique(self.class_codes, return_index=True)
+        ends = [*starts[1:], len(self.class_codes)]
+        for code, start, end in zip(codes, starts, ends):
+            yield self.class_ids[code], [self.contestants[o] for o in self.owners[start:end]]
+
+    def entry_numbers(self, name: str, class_id: str) -> List[int]:
+        owner = [c.name for c in self.contestants].index(name)
+        mask = (self.owners == owner) & (self.class_codes == self.class_ids.index(class_id))
+        return self.numbers[mask].tolist()
@@ -0,0 +1,116 @@
+"""
+A compact binary lookup table from (class, entry number) to contestant name, which can be
+ memory-mapped read-only and queried without parsing the show's YAML.
+
+All integers are little-endian unsigned. The layout is:
+
+    header:       magic (4 bytes), format version (u16), padding (u16),
+                  number of classes (u32), number of entries (u32)
+    class table:  per class, sorted by class id: class id string offset (u32),
+                  first entry slot (u32), number of entries (u32)
+    entry table:  per entry slot: contestant string offset (u32)
+    string table: per string: length in bytes (u16), then UTF-8 bytes
+
+Entries of a class occupy consecutive slots, so entry number n of a class is found at its
+ first slot + n - 1. Each contestant's name is stored once and shared between entries.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from typing import Dict, List, Tuple
+from pathlib import Path
+
+from greenbook.data.show import Show
+from greenbook.data.storage import atomic_write
+
+MAGIC = b"GBLK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+CLASS_RECORD = struct.Struct("<III")
+ENTRY_RECORD = struct.Struct("<I")
+STRING_LENGTH = struct.Struct("<H")
+
+
+def write_lookup_table(show: Show, location: Path):
+    """
+    Write the table next to its final location and move it into place, so readers never
+     see a partial file and existing readers keep their mapping of the previous version.
+    """
+    strings = bytearray()
+    string_offsets: Dict[str, int] = {}
+
+    def _string(value: str) -> int:
+        if value not in string_offsets:
+            encoded = value.encode("utf-8")
+            string_offsets[value] = len(strings)
+            strings.extend(STRING_LENGTH.pack(len(encoded)))
+            strings.extend(encoded)
+        return string_offsets[value]
+
+    class_records: List[Tuple[int, int, int]] = []
+    entry_offsets: List[int] = []
+    for show_class in show.classes():
+        class_records.append((_string(show_class.class_id), len(entry_offsets), len(show_class)))
+        entry_offsets.extend(_string(contestant.name) for contestant in show_class.contestants)
+
+    with atomic_write(location, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(class_records), len(entry_offsets)))
+        for record in class_records:
+            f.write(CLASS_RECORD.pack(*record))
+        f.write(struct.pack(f"<{len(entry_offsets)}I", *entry_offsets))
+        f.write(strings)
+
+
+class LookupTable:
+    """
+    A read-only view of a lookup table. The file is memory-mapped, so processes reading the
+     same table share its pages, and names are only decoded when looked up.
+    """
+
+    def __init__(self, location: Path):
+        with location.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n_classes, n_entries = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{location} is not a version {FORMAT_VERSION} lookup table.")
+        self._entries_start = HEADER.size + n_classes * CLASS_RECORD.size
+        self._strings_start = self._entries_start + n_entries * ENTRY_RECORD.size
+        self._classes: Dict[str, Tuple[int, int]] = {}
+        for idx in range(n_classes):
+            class_offset, first_slot, n_class_entries = CLASS_RECORD.unpack_from(
+                self._map, HEADER.size + idx * CLASS_RECORD.size
+            )
+            self._classes[self._string(class_offset)] = (first_slot, n_class_entries)
+
+    def _string(self, offset: int) -> str:
+        start = self._strings_start + offset
+        (length,) = STRING_LENGTH.unpack_from(self._map, start)
+        start += STRING_LENGTH.size
+        end = start + length
+        return str(self._map[start:end], "utf-8")
+
+    def class_ids(self) -> List[str]:
+        return list(self._classes)
+
+    def class_size(self, class_id: str) -> int:
+        return self._classes.get(class_id, (0, 0))[1]
+
+    def lookup(self, class_id: str, contestant_id: int) -> str:
+        first_slot, n_class_entries = self._classes.get(class_id, (0, 0))
+        if not 0 < contestant_id <= n_class_entries:
+            raise ValueError(f"Class {class_id} has no entry {contestant_id}.")
+        slot = self._entries_start + (first_slot + contestant_id - 1) * ENTRY_RECORD.size
+        (offset,) = ENTRY_RECORD.unpack_from(self._map, slot)
+        return self._string(offset)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> LookupTable:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
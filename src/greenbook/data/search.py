@@ -0,0 +1,87 @@
+import re
+import unicodedata
+from typing import Dict, List, Tuple, Iterable
+from collections import Counter
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+DEFAULT_MIN_SCORE = 0.3
+DUPLICATE_MIN_SCORE = 0.6
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lower-case the name, strip accents and punctuation, and collapse whitespace.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = decomposed.encode("ascii", "ignore").decode("ascii").lower()
+    return NON_ALPHANUMERIC.sub(" ", ascii_name).strip()
+
+
+def trigrams(name: str) -> frozenset:
+    """
+    The trigrams of each word of the normalized name, with each word padded by two spaces
+     in front and one behind so that word starts count for more than word middles.
+    """
+    grams = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        grams.update("".join(gram) for gram in zip(padded, padded[1:], padded[2:]))
+    return frozenset(grams)
+
+
+class NameIndex:
+    """
+    An inverted index from trigram to name, ranking names by the Dice coefficient of
+     their trigrams with the query's.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: List[str] = []
+        self._n_grams: List[int] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def add(self, name: str):
+        if name in self._ids:
+            return
+        name_id = len(self._names)
+        grams = trigrams(name)
+        self._ids[name] = name_id
+        self._names.append(name)
+        self._n_grams.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(name_id)
+
+    def remove(self, name: str):
+        """
+        Stop matching the name. Its postings are left in place and skipped by search, so
+         that removing a name does not mean rebuilding the index.
+        """
+        self._ids.pop(name, None)
+
+    def search(
+        self, query: str, limit: int = 10, min_score: float = DEFAULT_MIN_SCORE
+    ) -> List[Tuple[str, float]]:
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for name_id, n_shared in shared.items():
+            if self._ids.get(self._names[name_id]) != name_id:
+                continue
+            score = 2 * n_shared / (len(query_grams) + self._n_grams[name_id])
+            if score >= min_score:
+                scored.append((self._names[name_id], score))
+        scored.sort(key=lambda match: (-match[1], match[0]))
+        return scored[:limit]
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import sys
 import pandas as pd
+import pickle
+import hashlib
 from attr import attrib
-from typing import Dict, Tuple, Union, Optional, Sequence
+from typing import Any, Dict, List, Tuple, Union, Optional, Sequence
+from collections import Counter
 from dataclasses import dataclass
 from ruamel.yaml import YAML, yaml_object
 
+from greenbook.data.base import SlotsStateMixin
 from greenbook.data.consts import MAX_ENTRIES_PER_CONTESTANT
 from greenbook.data.entries import Contestant
 from greenbook.definitions.point import (
@@ -17,7 +22,11 @@ from greenbook.definitions.point import (
 yaml = YAML()
 
 
-@dataclass
+def _placings(placings: Sequence[Tuple[Contestant, Union[int, str]]]) -> Tuple[Tuple, ...]:
+    return tuple((contestant, entry) for contestant, entry in placings)
+
+
+@dataclass(slots=True)
 class Entry:
     contestant_id: int = attrib(type=int)
     class_id: str = attrib(type=str)
@@ -25,8 +34,8 @@ class Entry:
 
 
 @yaml_object(yaml)
-@dataclass
-class ShowClass:
+@dataclass(slots=True)
+class ShowClass(SlotsStateMixin):
     class_id: str = attrib(type=str)
     name: str = attrib(type=str)
     contestants: Sequence[Contestant] = attrib(type=Sequence[Contestant])
@@ -36,10 +45,17 @@ class ShowClass:
     commendations: Sequence[Tuple[Contestant, int]] = attrib(type=Sequence[Tuple[Contestant, int]])
 
     def __post_init__(self):
-        assert all(
-            self.count_contestant(c) <= MAX_ENTRIES_PER_CONTESTANT
-            for c in self.unique_contestants()
-        )
+        # lists (or the YAML loader's commented sequences) cost far more than tuples
+        self.class_id = sys.intern(str(self.class_id))
+        self.name = sys.intern(self.name)
+        self.contestants = tuple(self.contestants)
+        self.first_place = _placings(self.first_place)
+        self.second_place = _placings(self.second_place)
+        self.third_place = _placings(self.third_place)
+        self.commendations = _placings(self.commendations)
+        # counted by id, since comparing contestants one by one is quadratic in the entries
+        counts = Counter(contestant.unique_id() for contestant in self.contestants)
+        assert all(n <= MAX_ENTRIES_PER_CONTESTANT for n in counts.values())
 
     def __contains__(self, contestant: Contestant) -> bool:
         return contestant in self.contestants
@@ -94,6 +110,19 @@ class ShowClass:
     def __str__(self) -> str:
         return f"{self.class_id}: {self.name} ({len(self.contestants)} contestants)"
 
+    def fingerprint(self) -> str:
+        """
+        A hash of everything the results of the class depend on, which changes whenever
+         its entries are allocated or it is judged.
+        """
+        placings = [
+            [(contestant.name, str(entry)) for contestant, entry in placing]
+            for placing in (self.first_place, self.second_place, self.third_place)
+        ]
+        placings.append([(c.name, str(entry)) for c, entry in self.commendations])
+        data = (self.class_id, self.name, [c.name for c in self.contestants], placings)
+        return hashlib.blake2b(pickle.dumps(data), digest_size=16).hexdigest()
+
     def to_df(self) -> pd.DataFrame:
         """
         Produce and return a DataFrame with columns: contestant_id, name, place (if any)
@@ -136,13 +165,22 @@ class ShowClass:
 
 @yaml_object(yaml)
 class Show:
+    __slots__ = ("_classes", "_prizes")
+
     def __init__(
         self, classes: Sequence[ShowClass], prizes: Sequence[Tuple[Contestant, int, str]] = ()
     ):
         self._classes = {s.class_id: s for s in classes}
-        self._prizes = prizes
+        self._prizes = tuple(tuple(prize) for prize in prizes)
         assert len(self._classes) == len(classes)
 
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_classes": self._classes, "_prizes": self._prizes}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self._classes = dict(state["_classes"])
+        self._prizes = tuple(tuple(prize) for prize in state.get("_prizes", ()))
+
     def classes(self) -> Sequence[ShowClass]:
         return sorted(self._classes.values(), key=lambda s: s.class_id)
 
@@ -164,7 +202,7 @@ class Show:
     def update_class(self, show_class: ShowClass) -> Show:
         classes = {key: value for key, value in self._classes.items() if key != show_class.class_id}
         classes[show_class.class_id] = show_class
-        return Show(list(classes.values()))
+        return Show(list(classes.values()), self._prizes)
 
     def add_prize(self, contestant: Contestant, class_id: str, prize: str) -> Show:
         return Show(self.classes(), [*self._prizes, (contestant, class_id, prize)])
@@ -172,14 +210,14 @@ class Show:
     def contestant_entries(
         self,
     ) -> Dict[Contestant, Sequence[Entry]]:
-        entries = {}
+        entries: Dict[Contestant, List[Entry]] = {}
         for show_class in self.classes():
             for number, contestant in enumerate(show_class.contestants):
-                entries[contestant] = entries.get(contestant, []) + [
+                entries.setdefault(contestant, []).append(
                     Entry(
                         contestant_id=number + 1, class_id=show_class.class_id, name=show_class.name
                     )
-                ]
+                )
         return entries
 
     @property
@@ -0,0 +1,177 @@
+"""
+Crash-safe writes of the show's state.
+
+Every file is written to a temporary file beside it, fsynced and then renamed over it, so
+ a crash or Ctrl-C part way through a write leaves the previous version in place rather
+ than a truncated file. The exception is an append-only file, such as the registration
+ ledger, whose readers must ignore an incomplete last line.
+
+Several processes may share the show's files, e.g. stewards judging from a network folder.
+ Versioned files start with a version header which is incremented by every rewrite, made
+ while holding an advisory lock on the file, so that a writer can tell whether another
+ process has saved the file since it was loaded. Appends leave the version as it is, and
+ are told apart by the file's size.
+"""
+
+import os
+import logging
+from typing import IO, Tuple, Union, Iterator, Protocol
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not POSIX
+    fcntl = None
+
+_LOG = logging.getLogger(__name__)
+
+VERSION_PREFIX = "# greenbook-version: "
+
+
+class Store(Protocol):
+    """
+    Something holding state which is saved to disk, either after every change or, with
+     autosave off, only by an explicit call to save.
+    """
+
+    autosave: bool
+
+    @property
+    def dirty(self) -> bool: ...
+
+    def save(self): ...
+
+
+def _fsync_directory(directory: Path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(location: Path, mode: str = "w") -> Iterator[IO]:
+    """
+    Open a file to be written in place of location once the block exits without error.
+    """
+    if "w" not in mode:
+        raise ValueError(f"Atomic writes must open the file for writing, not {mode=}.")
+    location = Path(location)
+    tmp_location = location.with_name(f".{location.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_location.open(mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_location, location)
+    except BaseException:
+        tmp_location.unlink(missing_ok=True)
+        raise
+    # make the rename itself durable
+    _fsync_directory(location.parent)
+
+
+def commit(*stores: Store) -> int:
+    """
+    Save each of the stores which has unsaved changes, returning how many were saved.
+    """
+    saved = 0
+    for store in stores:
+        if store.dirty:
+            store.save()
+            saved += 1
+    return saved
+
+
+@contextmanager
+def group_commit(*stores: Store) -> Iterator[None]:
+    """
+    Queue up the changes made to the stores within the block and write each store once
+     when it exits, rather than once per change.
+
+    If the block raises, nothing is written and the changes remain unsaved.
+    """
+    autosaves = [store.autosave for store in stores]
+    for store in stores:
+        store.autosave = False
+    try:
+        yield
+    finally:
+        for store, autosave in zip(stores, autosaves):
+            store.autosave = autosave
+    commit(*stores)
+
+
+@contextmanager
+def locked(location: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on location, waiting for any other process to release it.
+    """
+    location = Path(location)
+    lock_location = location.with_name(f".{location.name}.lock")
+    with lock_location.open("a") as f:
+        if fcntl is None:
+            _LOG.warning(f"File locking is not supported here, so {location} is not locked.")
+            yield
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_version(f: IO[str], version: int):
+    f.write(f"{VERSION_PREFIX}{version}\n")
+
+
+@contextmanager
+def open_versioned(location: Path) -> Iterator[Tuple[int, IO[str]]]:
+    """
+    Open a versioned file for reading, positioned after its version header. Files written
+     before versions were recorded are version 0.
+    """
+    with Path(location).open("r") as f:
+        header = f.readline()
+        if header.startswith(VERSION_PREFIX):
+            version = int(header.removeprefix(VERSION_PREFIX))
+        else:
+            version = 0
+            f.seek(0)
+        yield version, f
+
+
+def read_version(location: Path) -> int:
+    if not Path(location).exists():
+        return 0
+    with open_versioned(location) as (version, _):
+        return version
+
+
+def read_versioned(location: Path) -> Tuple[int, str, int]:
+    """
+    The version and contents (after the version header) of a versioned file, and the
+     number of bytes read, which tells whether anything has been appended to it since.
+    """
+    raw = Path(location).read_bytes()
+    text = raw.decode("utf-8")
+    version = 0
+    if text.startswith(VERSION_PREFIX):
+        header, _, text = text.partition("\n")
+        version = int(header.removeprefix(VERSION_PREFIX))
+    return version, text, len(raw)
+
+
+def append_durably(location: Path, data: Union[str, bytes]) -> int:
+    """
+    Append to a file and fsync it, returning the size of the file afterwards.
+    """
+    with Path(location).open("ab" if isinstance(data, bytes) else "a") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        return os.fstat(f.fileno()).st_size
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple, Sequence
+from typing import Dict, List, Tuple, Mapping, TypeVar, Hashable, Optional, Sequence
 
 from greenbook.data.show import Show
 from greenbook.data.entries import Contestant
-from greenbook.definitions.classes import CLASSES
+from greenbook.definitions.schedule import Schedule
+
+# the points of each contestant in each class, by class id, which may be totalled over shows
+C = TypeVar("C", bound=Hashable)
+ClassPoints = Mapping[str, Mapping[C, int]]
 
 
 # region abstract prizes
@@ -11,8 +15,20 @@ class BasePrize(ABC):
     def __init__(self, name: str):
         self._name = name
 
+    def class_ids(self, schedule: Schedule) -> Optional[Sequence[str]]:
+        """
+        The classes of the schedule the prize is decided by, or None for all of them.
+        """
+        return None
+
+    def winner(self, show: Show, schedule: Schedule) -> Sequence[Contestant]:
+        return self.winner_by_points(class_points(show, self.class_ids(schedule)), schedule)
+
     @abstractmethod
-    def winner(self, show: Show) -> Contestant:
+    def winner_by_points(self, points: ClassPoints, schedule: Schedule) -> Sequence[C]:
+        """
+        The winners, given the points of each contestant in each class.
+        """
         pass
 
     def __str__(self) -> str:
@@ -24,36 +40,78 @@ class HighestPointsInClasses(BasePrize):
         self._class_ids = class_ids
         super().__init__(name)
 
-    def winner(self, show: Show) -> Sequence[Contestant]:
-        points: Dict[Contestant, int] = {}
-        for class_id in self._class_ids:
-            show_class = show.class_lookup(class_id)
-            if show_class is None:
-                continue
-            for contestant, point in show_class.points().items():
-                points[contestant] = points.get(contestant, 0) + point
-        if not points:
+    def class_ids(self, schedule: Schedule) -> Sequence[str]:
+        return self._class_ids
+
+    def winner_by_points(self, points: ClassPoints, schedule: Schedule) -> Sequence[C]:
+        totals = total_points(points, self.class_ids(schedule))
+        if not totals:
             return []
-        max_score = max(points.values())
-        return [contestant for contestant, point in points.items() if point == max_score]
+        max_score = max(totals.values())
+        return [contestant for contestant, point in totals.items() if point == max_score]
 
 
 class HighestPointInSection(HighestPointsInClasses):
     def __init__(self, name: str, section: str):
-        class_ids = [class_id for class_id, _ in CLASSES[section]]
-        super().__init__(name, class_ids)
+        self._section = section
+        super().__init__(name, class_ids=())
+
+    def class_ids(self, schedule: Schedule) -> Sequence[str]:
+        return schedule.section_class_ids(self._section)
 
 
 # endregion
 
 
 # region utils
+def class_points(
+    show: Show, class_ids: Optional[Sequence[str]] = None
+) -> Dict[str, Dict[Contestant, int]]:
+    """
+    The points of each contestant in each of the classes, or in every class of the show.
+    """
+    if class_ids is None:
+        classes = show.classes()
+    else:
+        classes = [show.class_lookup(class_id) for class_id in class_ids]
+    return {c.class_id: c.points() for c in classes if c is not None}
+
+
+def total_points(points: ClassPoints, class_ids: Optional[Sequence[str]] = None) -> Dict[C, int]:
+    totals: Dict[C, int] = {}
+    for class_id in points if class_ids is None else class_ids:
+        for contestant, point in points.get(class_id, {}).items():
+            totals[contestant] = totals.get(contestant, 0) + point
+    return totals
+
+
+def rank_by_points(points: ClassPoints) -> List[Tuple[C, int]]:
+    return sorted(total_points(points).items(), key=lambda x: x[1], reverse=True)
+
+
 def sort_contestant_by_points(show: Show) -> Sequence[Tuple[Contestant, int]]:
-    points: Dict[Contestant, int] = {}
-    for show_class in show.classes():
-        for contestant, point in show_class.points().items():
-            points[contestant] = points.get(contestant, 0) + point
-    return sorted(points.items(), key=lambda x: x[1], reverse=True)
+    return rank_by_points(class_points(show))
+
+
+def prize_results(
+    show: Show, schedule: Schedule, points: Optional[ClassPoints] = None
+) -> List[str]:
+    """
+    The winners of each prize, then of each prize awarded by hand, as "prize: winners".
+
+    The prizes are decided on the points of each contestant in each class of the show,
+     which are worked out once for them all unless given.
+    """
+    if points is None:
+        points = class_points(show)
+    winning_strings = []
+    for prize in ALL_PRIZES:
+        winners = prize.winner_by_points(points, schedule)
+        winner_str = ", ".join([str(w) for w in sorted(winners)])
+        winning_strings.append(f"{prize}: {winner_str}")
+    for contestant, _, prize_name in show.prizes:
+        winning_strings.append(f"{prize_name}: {contestant.name}")
+    return winning_strings
 
 
 # endregion
@@ -78,8 +136,10 @@ class MBShield(BasePrize):
     def __init__(self):
         super().__init__(name="M & B Shield")
 
-    def winner(self, show: Show) -> Sequence[Contestant]:
-        sorted_contestants = sort_contestant_by_points(show)
+    def winner_by_points(self, points: ClassPoints, schedule: Schedule) -> Sequence[C]:
+        sorted_contestants = rank_by_points(points)
+        if not sorted_contestants:
+            return []
         max_score = sorted_contestants[0][1]
         winners = [contestant for contestant, point in sorted_contestants if point == max_score]
         all_scores = [point for _, point in sorted_contestants]
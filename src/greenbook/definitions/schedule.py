@@ -0,0 +1,182 @@
+"""
+The show's schedule of sections, classes and entry fees, compiled into dense integer class
+ codes so that hot paths can use array indexing rather than searching the class ids.
+
+By default the schedule is the one defined in classes.py and prices.py. A show can instead
+ provide its own in a schedule.yaml of the form
+
+    entry_fee: 0.1
+    free_sections: [J]
+    section_fees:        # optional, overrides entry_fee for a whole section
+      H: 0.2
+    class_fees:          # optional, overrides entry_fee and section_fees for a class
+      "62": 0.5
+    section_caps:        # optional, the most a contestant pays for their entries in a section
+      H: 1.0
+    fee_cap: 3.0         # optional, the most a contestant pays for all their entries
+    sections:
+      A:
+        "1": White Potatoes
+        "2": Coloured Potatoes
+      B:
+        "18": Apples, Dessert
+
+The schedule is compiled from the config each time it is loaded, which takes a few
+ milliseconds, rather than cached beside the show.
+"""
+
+from __future__ import annotations
+
+import re
+import numpy as np
+import logging
+from typing import Any, Dict, List, Tuple, Optional, Sequence
+from pathlib import Path
+from ruamel.yaml import YAML
+
+from greenbook.data.storage import atomic_write
+from greenbook.definitions.prices import ENTRY_COST, FREE_CLASSES
+from greenbook.definitions.classes import CLASSES
+
+_LOG = logging.getLogger(__name__)
+
+SCHEDULE_FILE = "schedule.yaml"
+
+
+def _natural_key(class_id: str) -> Tuple[int, str]:
+    digits = re.sub(r"\D", "", class_id)
+    return int(digits) if digits else -1, class_id
+
+
+class Schedule:
+    """
+    Class code i is the i-th class of the schedule, in the order the config lists them.
+    """
+
+    def __init__(
+        self,
+        sections: Dict[str, Sequence[Tuple[str, str]]],
+        entry_fee: float,
+        free_sections: Sequence[str] = (),
+        section_fees: Optional[Dict[str, float]] = None,
+        class_fees: Optional[Dict[str, float]] = None,
+        section_caps: Optional[Dict[str, float]] = None,
+        fee_cap: Optional[float] = None,
+    ):
+        section_fees = dict(section_fees or {})
+        class_fees = dict(class_fees or {})
+        section_caps = dict(section_caps or {})
+        self.section_ids: Tuple[str, ...] = tuple(sections)
+        self.class_ids: Tuple[str, ...] = tuple(c for s in sections.values() for c, _ in s)
+        self.class_names: Tuple[str, ...] = tuple(n for s in sections.values() for _, n in s)
+        self.codes: Dict[str, int] = {class_id: idx for idx, class_id in enumerate(self.class_ids)}
+        if len(self.codes) != len(self.class_ids):
+            raise ValueError("Class ids must be unique across the schedule.")
+        section_codes = {section: idx for idx, section in enumerate(self.section_ids)}
+        unknown = (set(free_sections) | set(section_fees) | set(section_caps)) - set(section_codes)
+        unknown |= set(class_fees) - set(self.codes)
+        if unknown:
+            raise ValueError(f"Fees are given for unknown sections or classes: {sorted(unknown)}")
+        if any(cap < 0 for cap in section_caps.values()) or (fee_cap is not None and fee_cap < 0):
+            raise ValueError("Fee caps cannot be negative.")
+
+        # class code -> section code
+        self.class_sections = np.array(
+            [section_codes[section] for section, classes in sections.items() for _ in classes],
+            dtype=np.int32,
+        )
+        # section code x class code -> whether the class is in the section
+        self.section_masks = (
+            self.class_sections[None, :] == np.arange(len(self.section_ids))[:, None]
+        )
+        # class code -> position in the natural order of class ids: 1, 2, ..., 25A, 25B, ...
+        order = sorted(range(len(self.class_ids)), key=lambda c: _natural_key(self.class_ids[c]))
+        self.sort_order = np.array(order, dtype=np.int32)
+        self.sort_rank = np.empty_like(self.sort_order)
+        self.sort_rank[self.sort_order] = np.arange(len(order), dtype=np.int32)
+
+        for section in free_sections:
+            section_fees[section] = 0.0
+        self.free_sections: Tuple[str, ...] = tuple(free_sections)
+        self.entry_fees = np.full(len(self.class_ids), entry_fee, dtype=np.float64)
+        for section, fee in section_fees.items():
+            self.entry_fees[self.section_masks[section_codes[section]]] = fee
+        for class_id, fee in class_fees.items():
+            self.entry_fees[self.codes[class_id]] = fee
+        # section code -> the most a contestant pays in the section
+        self.section_caps = np.full(len(self.section_ids), np.inf)
+        for section, cap in section_caps.items():
+            self.section_caps[section_codes[section]] = cap
+        self.fee_cap = np.inf if fee_cap is None else float(fee_cap)
+        self._config = {
+            "entry_fee": entry_fee,
+            "free_sections": list(free_sections),
+            "section_fees": {k: v for k, v in section_fees.items() if k not in free_sections},
+            "class_fees": class_fees,
+            "section_caps": section_caps,
+            "fee_cap": fee_cap,
+            "sections": {section: dict(classes) for section, classes in sections.items()},
+        }
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __contains__(self, class_id: str) -> bool:
+        return class_id in self.codes
+
+    def class_name(self, class_id: str) -> str:
+        return self.class_names[self.codes[class_id]]
+
+    def section_of(self, class_id: str) -> str:
+        return self.section_ids[self.class_sections[self.codes[class_id]]]
+
+    def section_class_ids(self, section: str) -> List[str]:
+        mask = self.section_masks[self.section_ids.index(section)]
+        return [self.class_ids[code] for code in np.flatnonzero(mask)]
+
+    def sort_key(self, class_id: str) -> int:
+        return int(self.sort_rank[self.codes[class_id]])
+
+    def encode(self, class_ids: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.codes[c] for c in class_ids), dtype=np.int32, count=len(class_ids))
+
+    def to_config(self) -> Dict[str, Any]:
+        return self._config
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Schedule:
+        sections = {
+            str(section): [(str(class_id), str(name)) for class_id, name in classes.items()]
+            for section, classes in config["sections"].items()
+        }
+        return cls(
+            sections=sections,
+            entry_fee=float(config.get("entry_fee", ENTRY_COST)),
+            free_sections=[str(s) for s in config.get("free_sections", [])],
+            section_fees={str(k): float(v) for k, v in config.get("section_fees", {}).items()},
+            class_fees={str(k): float(v) for k, v in config.get("class_fees", {}).items()},
+            section_caps={str(k): float(v) for k, v in config.get("section_caps", {}).items()},
+            fee_cap=None if config.get("fee_cap") is None else float(config["fee_cap"]),
+        )
+
+
+DEFAULT_SCHEDULE = Schedule(sections=CLASSES, entry_fee=ENTRY_COST, free_sections=FREE_CLASSES)
+
+
+def load_schedule(config_loc: Path) -> Schedule:
+    schedule = Schedule.from_config(YAML(typ="safe").load(config_loc.read_bytes()))
+    _LOG.debug(f"Compiled schedule of {len(schedule)} classes from {config_loc}")
+    return schedule
+
+
+def write_schedule(schedule: Schedule, config_loc: Path):
+    with atomic_write(config_loc) as f:
+        YAML().dump(schedule.to_config(), f)
+
+
+def location_schedule(location: Path) -> Schedule:
+    """
+    The schedule of the show in the location, or the default schedule if it has none.
+    """
+    config_loc = Path(location) / SCHEDULE_FILE
+    return load_schedule(config_loc) if config_loc.exists() else DEFAULT_SCHEDULE
@@ -0,0 +1,110 @@
+"""
+A results board for a screen at the show: a single HTML page which reloads itself, giving
+ the prizes as they stand, the leading contestants and the results of each class, the
+ most recently judged first.
+"""
+
+import html
+from typing import Tuple, Sequence
+from pathlib import Path
+from datetime import datetime
+
+from greenbook.data.show import ShowClass
+from greenbook.data.entries import Contestant
+from greenbook.data.storage import atomic_write
+from greenbook.telemetry.metrics import REGISTRY
+
+BOARD_FILE = "results-board.html"
+LEADERS = 10
+
+_BOARD_CLASSES = REGISTRY.counter(
+    "greenbook_rendered_board_classes_total", "Class results rendered for the results board."
+)
+
+_STYLE = """
+body { font-family: sans-serif; margin: 1em 2em; }
+h1 { margin-bottom: 0; }
+.updated { color: #666; }
+.columns { display: flex; gap: 3em; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { padding: 0.2em 0.8em; text-align: left; border-bottom: 1px solid #ccc; }
+"""
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="{refresh}">
+<title>{title}</title>
+<style>{style}</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="updated">Updated at {updated}</p>
+<div class="columns">
+<section>
+<h2>Prizes</h2>
+<ul>
+{prizes}
+</ul>
+<h2>Leaders</h2>
+<ol>
+{leaders}
+</ol>
+</section>
+<section>
+<h2>Latest results</h2>
+{classes}
+</section>
+</div>
+</body>
+</html>
+"""
+
+
+def render_class_html(show_class: ShowClass) -> str:
+    """
+    The results table of a class, as an HTML fragment.
+    """
+    df = show_class.to_df()
+    df["place"] = df["place"].replace("None", "")
+    table = df.to_html(index=False, border=0, na_rep="")
+    _BOARD_CLASSES.inc()
+    return (
+        f"<h3>Class {html.escape(show_class.class_id)} --- {html.escape(show_class.name)}</h3>"
+        f"\n{table}"
+    )
+
+
+def render_board(
+    class_results: Sequence[str],
+    prize_results: Sequence[str],
+    ranking: Sequence[Tuple[Contestant, int]],
+    updated: datetime,
+    refresh: int = 1,
+    title: str = "Show results",
+) -> str:
+    """
+    The whole board, given the HTML results of the classes to show, in order. The page
+     reloads itself every refresh seconds.
+    """
+    return _PAGE.format(
+        refresh=refresh,
+        title=html.escape(title),
+        style=_STYLE,
+        updated=updated.strftime("%H:%M:%S"),
+        prizes="\n".join(f"<li>{html.escape(prize)}</li>" for prize in prize_results),
+        leaders="\n".join(
+            f"<li>{html.escape(contestant.name)}: {points} points</li>"
+            for contestant, points in ranking[:LEADERS]
+        ),
+        classes="\n".join(class_results) or "<p>No classes have been judged yet.</p>",
+    )
+
+
+def write_board(board: str, directory: Path) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    file_loc = directory / BOARD_FILE
+    with atomic_write(file_loc, "wb") as f:
+        f.write(board.encode("utf-8"))
+    return file_loc
@@ -0,0 +1,53 @@
+import matplotlib.pyplot as plt
+from pathlib import Path
+from matplotlib.backends.backend_pdf import PdfPages
+
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
+from greenbook.secretary.planning import JudgingPlan
+
+_PLAN_PAGES = REGISTRY.counter("greenbook_rendered_plan_pages_total", "Judging sheets rendered.")
+
+
+def clock_time(start: str, minutes: float) -> str:
+    """
+    The time of day the given number of minutes after start, which is written HH:MM.
+    """
+    hours, mins = (int(part) for part in start.split(":"))
+    total = hours * 60 + mins + round(minutes)
+    return f"{total // 60 % 24:02d}:{total % 60:02d}"
+
+
+def render_judging_sheets(plan: JudgingPlan, directory: Path, start: str = "00:00") -> Path:
+    """
+    A page per judge listing their classes in order, with when to start and finish each.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    file_loc = directory / "judging-plan.pdf"
+    with span("render.judging_sheets", judges=len(plan.judges)):
+        with PdfPages(file_loc) as pp:
+            for judge in plan.judges:
+                slots = plan.slots[judge.name]
+                fig, ax = plt.subplots(figsize=(8.27, 11.69), dpi=100)
+                ax.axis("off")
+                if slots:
+                    ax.table(
+                        cellText=[
+                            [
+                                slot.class_id,
+                                slot.name,
+                                slot.entries,
+                                clock_time(start, slot.start),
+                                clock_time(start, slot.finish),
+                            ]
+                            for slot in slots
+                        ],
+                        colLabels=["Class", "Name", "Entries", "Start", "Finish"],
+                        loc="upper center",
+                    )
+                finish = clock_time(start, slots[-1].finish) if slots else start
+                ax.set_title(f"Judging for {judge.name} (finish by {finish})")
+                pp.savefig(fig)
+                plt.close(fig)
+                _PLAN_PAGES.inc()
+    return file_loc
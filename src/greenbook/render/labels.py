@@ -4,9 +4,14 @@ from pathlib import Path
 from matplotlib.backends.backend_pdf import PdfPages
 
 from greenbook.data.show import Entry
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
 
 MAX_PER_PAGE = 28
 
+_SLIP_SECONDS = REGISTRY.histogram("greenbook_render_slip_seconds", "Time to render a slip.")
+_SLIP_PAGES = REGISTRY.counter("greenbook_rendered_slip_pages_total", "Slip pages rendered.")
+
 
 def render_entries(contestant_name: str, entries: Sequence[Entry], price: float) -> plt.Figure:
     fig, ax = plt.subplots(figsize=(8.27, 11.69), dpi=100)
@@ -41,15 +46,21 @@ def render_entries(contestant_name: str, entries: Sequence[Entry], price: float)
     return fig
 
 
+def slip_loc(directory: Path, contestant_name: str) -> Path:
+    return directory / f"{contestant_name}.pdf"
+
+
 def render_contestant_to_file(
     contestant_name: str, entries: Sequence[Entry], directory: Path, price: float
 ):
     directory.mkdir(parents=True, exist_ok=True)
-    filename = directory / f"{contestant_name}.pdf"
+    filename = slip_loc(directory, contestant_name)
     remaining_entries = list(entries)
-    with PdfPages(filename) as pp:
-        while remaining_entries:
-            fig = render_entries(contestant_name, remaining_entries[:MAX_PER_PAGE], price)
-            pp.savefig(fig)
-            plt.close(fig)
-            remaining_entries = remaining_entries[MAX_PER_PAGE:]
+    with span("render.slip", entries=len(remaining_entries)), _SLIP_SECONDS.time():
+        with PdfPages(filename) as pp:
+            while remaining_entries:
+                fig = render_entries(contestant_name, remaining_entries[:MAX_PER_PAGE], price)
+                pp.savefig(fig)
+                plt.close(fig)
+                _SLIP_PAGES.inc()
+                remaining_entries = remaining_entries[MAX_PER_PAGE:]
@@ -0,0 +1,21 @@
+"""
+Joining single-page PDFs, as written by matplotlib, into one document without rendering
+ them again.
+"""
+
+import io
+from pypdf import PdfReader, PdfWriter
+from typing import Sequence
+
+
+def merge_pdfs(pdfs: Sequence[bytes]) -> bytes:
+    """
+    A document of the pages of each of the PDFs in turn.
+    """
+    writer = PdfWriter()
+    for pdf in pdfs:
+        for page in PdfReader(io.BytesIO(pdf)).pages:
+            writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
@@ -0,0 +1,84 @@
+"""
+Rendering documents in worker processes side by side.
+
+Matplotlib draws each page on a single core, so the pages of a report are rendered by a
+ pool of processes, by default one per CPU. The timing spans and metrics recorded by a
+ render in a worker are sent back with its result, and recorded in the parent when the
+ result is collected, so that they are reported just as if it had rendered there.
+"""
+
+import os
+from typing import Any, Dict, Tuple, Generic, TypeVar, Callable, Optional
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from greenbook.telemetry.spans import write_spans, collect_spans
+from greenbook.telemetry.metrics import REGISTRY
+
+T = TypeVar("T")
+
+# the result of a render, with the spans and metrics it recorded
+_Rendered = Tuple[Any, str, Dict[str, Dict[str, Any]]]
+
+
+def _render_in_worker(render: Callable[..., T], args: Tuple) -> _Rendered:
+    # a forked worker starts with the parent's metrics, and a reused one with its last
+    # render's, so only those recorded by this render are sent back
+    REGISTRY.reset()
+    with collect_spans() as spans:
+        result = render(*args)
+    return result, spans.getvalue(), REGISTRY.to_dict()
+
+
+class Rendering(Generic[T]):
+    def __init__(self, future: "Future[_Rendered]"):
+        self._future = future
+
+    def result(self) -> T:
+        """
+        Wait for the render, recording its spans and metrics.
+        """
+        result, spans, metrics = self._future.result()
+        write_spans(spans)
+        REGISTRY.merge(metrics)
+        return result
+
+
+class _RenderingInProcess(Rendering[T]):
+    def __init__(self, render: Callable[..., T], args: Tuple):
+        self._render = render
+        self._args = args
+
+    def result(self) -> T:
+        return self._render(*self._args)
+
+
+class RenderPool:
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Render in up to workers processes, or as many as there are CPUs. With a single
+         worker, each render happens in this process, when its result is asked for.
+        """
+        self._workers = max(1, workers or os.cpu_count() or 1)
+        self._executor = ProcessPoolExecutor(self._workers) if self._workers > 1 else None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def submit(self, render: Callable[..., T], *args) -> Rendering[T]:
+        """
+        Start rendering, with a picklable render function and arguments.
+        """
+        if self._executor is None:
+            return _RenderingInProcess(render, args)
+        return Rendering(self._executor.submit(_render_in_worker, render, args))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,99 @@
+"""
+Entry slips as raw label printer commands, written straight to a file or to the printer's
+ device, e.g. /dev/usb/lp0, instead of rendered as PDFs to be printed and cut by hand.
+
+Each entry gets a label of its own giving its class, its entry number and the initials of
+ its contestant. ZPL is understood by Zebra and most other label printers, and ESC/POS by
+ receipt printers, which cut after each label.
+"""
+
+import re
+import stat
+from typing import Dict, List, Tuple, Sequence
+from pathlib import Path
+
+from greenbook.data.show import Entry
+from greenbook.data.storage import atomic_write
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
+
+LABEL_FORMATS = ("zpl", "escpos")
+
+# a 2" x 1" label at 203 dpi
+_ZPL_LABEL = (
+    "^XA^CI28^PW406^LL203"
+    "^FO20,15^A0N,70,70^FDClass {class_id}^FS"
+    "^FO20,95^A0N,50,50^FDEntry {entry}^FS"
+    "^FO300,95^A0N,50,50^FD{initials}^FS"
+    "^XZ\n"
+)
+_ESC_POS_INIT = b"\x1b@"
+_ESC_POS_LABEL = (
+    # centred, double width and height
+    b"\x1ba\x01\x1d!\x11Class %s\n"
+    b"Entry %d\n"
+    # normal size, then feed and cut
+    b"\x1d!\x00%s\n"
+    b"\x1dVB\x00"
+)
+
+_UNPRINTABLE = re.compile(r"[\^~]")
+
+_LABELS = REGISTRY.counter("greenbook_printed_labels_total", "Entry labels written.")
+
+
+def initials(name: str) -> str:
+    return "".join(part[0] for part in name.split() if part[0].isalnum()).upper()
+
+
+def _zpl(labels: List[Tuple[str, int, str]]) -> bytes:
+    return "".join(
+        _ZPL_LABEL.format(class_id=class_id, entry=entry, initials=initials)
+        for class_id, entry, initials in labels
+    ).encode("utf-8")
+
+
+def _escpos(labels: List[Tuple[str, int, str]]) -> bytes:
+    # receipt printers start on code page 437
+    return _ESC_POS_INIT + b"".join(
+        _ESC_POS_LABEL
+        % (class_id.encode("cp437", "replace"), entry, initials.encode("cp437", "replace"))
+        for class_id, entry, initials in labels
+    )
+
+
+def label_stream(names_entries: Sequence[Tuple[str, Sequence[Entry]]], format: str) -> bytes:
+    """
+    The printer commands for a label for each entry of each contestant, in turn.
+    """
+    if format not in LABEL_FORMATS:
+        raise ValueError(f"Labels are written as one of {', '.join(LABEL_FORMATS)}, not {format}.")
+    # ^ and ~ start commands in ZPL, so cannot be printed
+    class_ids: Dict[str, str] = {}
+    labels = [
+        (
+            class_ids.setdefault(entry.class_id, _UNPRINTABLE.sub("", entry.class_id)),
+            entry.contestant_id,
+            contestant_initials,
+        )
+        for name, entries in names_entries
+        for contestant_initials in [initials(name)]
+        for entry in entries
+    ]
+    with span("render.labels", labels=len(labels)):
+        stream = _zpl(labels) if format == "zpl" else _escpos(labels)
+    _LABELS.inc(len(labels))
+    return stream
+
+
+def write_labels(stream: bytes, output: Path):
+    """
+    Write the labels to a file, or to the printer if output is a device.
+    """
+    output = Path(output)
+    if output.exists() and not stat.S_ISREG(output.stat().st_mode):
+        with output.open("wb") as f:
+            f.write(stream)
+    else:
+        with atomic_write(output, "wb") as f:
+            f.write(stream)
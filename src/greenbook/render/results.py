@@ -1,52 +1,73 @@
+import io
 import pandas as pd
 from typing import Tuple, Sequence
 from pathlib import Path
 from matplotlib import pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 
+from greenbook.render.pdf import merge_pdfs
 from greenbook.data.entries import Contestant
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
 
+_REPORT_SECONDS = REGISTRY.histogram(
+    "greenbook_render_report_seconds", "Time to render one of the final report documents."
+)
+_REPORT_PAGES = REGISTRY.counter("greenbook_rendered_report_pages_total", "Report pages rendered.")
 
-def render_class_results(class_results: Sequence[Tuple[str, str, pd.DataFrame]], directory: Path):
+
+def render_class_page(class_id: str, class_name: str, df: pd.DataFrame) -> bytes:
+    """
+    A single-page PDF of the results table of a class.
+    """
+    fig, ax = plt.subplots()
+    ax.axis("off")
+    ax.table(cellText=df.values, colLabels=df.columns, rowLabels=df.index, loc="center")
+    ax.set_title(f"Results for class {class_id} --- {class_name}")
+    page = io.BytesIO()
+    fig.savefig(page, format="pdf")
+    plt.close(fig)
+    _REPORT_PAGES.inc()
+    return page.getvalue()
+
+
+def render_class_results(class_pages: Sequence[bytes], directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
     file_loc = directory / "final-class-report.pdf"
-    # plot each table as a new page in the PDF
-    with PdfPages(file_loc) as pp:
-        for class_id, class_name, df in class_results:
-            fig, ax = plt.subplots()
-            ax.axis("off")
-            ax.table(cellText=df.values, colLabels=df.columns, rowLabels=df.index, loc="center")
-            ax.set_title(f"Results for class {class_id} --- {class_name}")
-            plt.close(fig)
-            pp.savefig(fig)
+    # join the pages of each class, which may have been rendered by an earlier report
+    with span("render.class_results", pages=len(class_pages)), _REPORT_SECONDS.time():
+        file_loc.write_bytes(merge_pdfs(class_pages))
 
 
 def render_prizes(prize_results: Sequence[str], directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
     file_loc = directory / "final-prize-report.pdf"
-    fig, ax = plt.subplots()
-    for idx, prize in enumerate(prize_results):
-        ax.axis("off")
-        ax.text(0.5, 0.9 - idx * 0.1, prize, ha="center", va="top", size=10)
-    ax.set_title("Prize Winners")
-    fig.savefig(file_loc)
-    plt.close(fig)
+    with span("render.prizes", prizes=len(prize_results)), _REPORT_SECONDS.time():
+        fig, ax = plt.subplots()
+        for idx, prize in enumerate(prize_results):
+            ax.axis("off")
+            ax.text(0.5, 0.9 - idx * 0.1, prize, ha="center", va="top", size=10)
+        ax.set_title("Prize Winners")
+        fig.savefig(file_loc)
+        plt.close(fig)
+        _REPORT_PAGES.inc()
 
 
 def render_ranking(ranking: Sequence[Tuple[Contestant, int]], directory: Path):
     directory.mkdir(parents=True, exist_ok=True)
     file_loc = directory / "final-ranking-report.pdf"
-    fig, ax = plt.subplots()
-    ax.axis("off")
-    for idx, (contestant, points) in enumerate(ranking):
-        ax.text(
-            0.5,
-            0.9 - idx * 0.05,
-            f"{contestant.name}: {points} points",
-            ha="center",
-            va="top",
-            size=10,
-        )
-    ax.set_title("Ranking")
-    fig.savefig(file_loc)
-    plt.close(fig)
+    with span("render.ranking", contestants=len(ranking)), _REPORT_SECONDS.time():
+        fig, ax = plt.subplots()
+        ax.axis("off")
+        for idx, (contestant, points) in enumerate(ranking):
+            ax.text(
+                0.5,
+                0.9 - idx * 0.05,
+                f"{contestant.name}: {points} points",
+                ha="center",
+                va="top",
+                size=10,
+            )
+        ax.set_title("Ranking")
+        fig.savefig(file_loc)
+        plt.close(fig)
+        _REPORT_PAGES.inc()
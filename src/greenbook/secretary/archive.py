@@ -0,0 +1,266 @@
+"""
+An archive of finished shows, e.g. one per year, in a single SQLite database, so that
+ questions across the years are answered from its indexes instead of by loading each
+ year's show.
+
+Each entry of each show is a row giving the show, its class and section, the contestant,
+ its entry number, place and points, indexed by contestant and by class. Contestants are
+ the same person across shows if their names are the same once normalized, and are given
+ by the name they were last archived under. The winners of each prize are kept too.
+
+Queries are those of the show's own query command, with the show as a further column,
+ e.g. how often a contestant has won class 45:
+
+    where contestant="Major Marrow" class=45 place=1; by show
+"""
+
+import pandas as pd
+import logging
+import sqlite3
+from typing import Any, Dict, List, Tuple, Optional
+from pathlib import Path
+from datetime import datetime
+
+from greenbook.data.show import Show
+from greenbook.data.search import normalize_name
+from greenbook.data.columns import PLACE_LABELS, ShowColumns, place_codes
+from greenbook.secretary.query import DIMENSIONS, Query, Condition
+from greenbook.telemetry.spans import span
+from greenbook.definitions.prizes import ALL_PRIZES
+from greenbook.definitions.schedule import Schedule
+
+_LOG = logging.getLogger(__name__)
+
+# to be incremented whenever the tables change
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_DIMENSIONS = ("show", *DIMENSIONS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shows (
+    show_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    archived TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contestants (
+    contestant_id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    show_id INTEGER NOT NULL,
+    class_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    contestant_id INTEGER NOT NULL,
+    entry INTEGER NOT NULL,
+    place INTEGER NOT NULL,
+    points INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_contestant ON entries (contestant_id, class_id);
+CREATE INDEX IF NOT EXISTS entries_by_class ON entries (class_id, place);
+CREATE INDEX IF NOT EXISTS entries_by_show ON entries (show_id);
+CREATE TABLE IF NOT EXISTS prizes (
+    show_id INTEGER NOT NULL,
+    prize TEXT NOT NULL,
+    contestant_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prizes_by_prize ON prizes (prize);
+CREATE INDEX IF NOT EXISTS prizes_by_show ON prizes (show_id);
+"""
+
+# the column of each dimension to filter, group and sort on, and the column listed
+_COLUMNS = {
+    "show": ("s.name", "s.name"),
+    "class": ("e.class_id", "e.class_id"),
+    "section": ("e.section", "e.section"),
+    "contestant": ("c.key", "c.name"),
+    "entry": ("e.entry", "e.entry"),
+    "place": ("e.place", "e.place"),
+}
+_PLACED = "SUM(e.place != 0)"
+_AGGREGATES = {
+    "entries": "COUNT(*)",
+    "contestants": "COUNT(DISTINCT e.contestant_id)",
+    "classes": "COUNT(DISTINCT e.class_id)",
+    "placed": f"COALESCE({_PLACED}, 0)",
+    "points": "COALESCE(SUM(e.points), 0)",
+    "placed_rate": f"COALESCE(ROUND(CAST({_PLACED} AS REAL) / COUNT(*), 3), 0)",
+}
+
+
+def _condition_sql(column: str, condition: Condition, values: List[Any]) -> Tuple[str, List]:
+    if condition.op in ("=", "!="):
+        placeholders = ", ".join("?" * len(values))
+        negation = "NOT " if condition.op == "!=" else ""
+        return f"{column} {negation}IN ({placeholders})", values
+    if len(values) != 1:
+        raise ValueError(f"Can only compare with {condition.op} against a single value.")
+    return f"{column} {condition.op} ?", values
+
+
+class Archive:
+    def __init__(self, location: Path):
+        self._location = Path(location)
+        self._connection = sqlite3.connect(self._location)
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self._connection:
+                self._connection.executescript(_SCHEMA)
+                self._connection.execute(f"PRAGMA user_version = {ARCHIVE_FORMAT_VERSION}")
+        elif version != ARCHIVE_FORMAT_VERSION:
+            self._connection.close()
+            raise ValueError(f"{self._location} was archived by a different greenbook.")
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def shows(self) -> List[str]:
+        return [
+            name for (name,) in self._connection.execute("SELECT name FROM shows ORDER BY name")
+        ]
+
+    def _contestant_ids(self, names: Tuple[str, ...]) -> List[int]:
+        keys = [normalize_name(name) for name in names]
+        self._connection.executemany(
+            "INSERT INTO contestants (key, name) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET name = excluded.name",
+            zip(keys, names),
+        )
+        ids = dict(self._connection.execute("SELECT key, contestant_id FROM contestants"))
+        return [ids[key] for key in keys]
+
+    def add_show(self, name: str, show: Show, schedule: Schedule) -> int:
+        """
+        Archive the show under the given name, in place of any show archived under it
+         before, returning the number of entries archived.
+        """
+        columns = ShowColumns.from_show(show, schedule)
+        winners = [
+            (str(prize), contestant.name)
+            for prize in ALL_PRIZES
+            for contestant in prize.winner(show, schedule)
+        ]
+        winners.extend((prize, contestant.name) for contestant, _, prize in show.prizes)
+        with span("archive.add_show", entries=len(columns)), self._connection:
+            self._connection.execute(
+                "INSERT INTO shows (name, archived) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET archived = excluded.archived",
+                (name, datetime.now().astimezone().isoformat(timespec="seconds")),
+            )
+            (show_id,) = self._connection.execute(
+                "SELECT show_id FROM shows WHERE name = ?", (name,)
+            ).fetchone()
+            self._connection.execute("DELETE FROM entries WHERE show_id = ?", (show_id,))
+            self._connection.execute("DELETE FROM prizes WHERE show_id = ?", (show_id,))
+
+            contestant_ids = self._contestant_ids(columns.names)
+            sections = [schedule.section_ids[code] for code in schedule.class_sections]
+            self._connection.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        show_id,
+                        columns.class_ids[class_code],
+                        sections[class_code],
+                        contestant_ids[contestant],
+                        entry,
+                        place,
+                        points,
+                    )
+                    for class_code, contestant, entry, place, points in zip(
+                        columns.class_codes.tolist(),
+                        columns.contestants.tolist(),
+                        columns.entries.tolist(),
+                        columns.places.tolist(),
+                        columns.points.tolist(),
+                    )
+                ),
+            )
+            names = {normalize_name(n): n for _, n in winners}
+            ids = dict(zip(names, self._contestant_ids(tuple(names.values()))))
+            self._connection.executemany(
+                "INSERT INTO prizes VALUES (?, ?, ?)",
+                ((show_id, prize, ids[normalize_name(n)]) for prize, n in winners),
+            )
+        _LOG.info(f"Archived {len(columns)} entries of {name} in {self._location}")
+        return len(columns)
+
+    def query(self, query: Query) -> pd.DataFrame:
+        """
+        The aggregates of each group of the archived entries which pass the filters, as
+         for a query of a single show.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for condition in query.where:
+            column = _COLUMNS[condition.column][0]
+            if condition.column == "entry":
+                values: List[Any] = condition.numbers()
+            elif condition.column == "place":
+                values = place_codes(condition.values)
+            elif condition.column == "contestant":
+                values = [normalize_name(value) for value in condition.values]
+            else:
+                values = list(condition.values)
+            clause, clause_params = _condition_sql(column, condition, values)
+            clauses.append(clause)
+            params.extend(clause_params)
+        groups = [_COLUMNS[column][0] for column in query.by]
+        selected = [f'{_COLUMNS[column][1]} AS "{column}"' for column in query.by]
+        selected.extend(f'{_AGGREGATES[a]} AS "{a}"' for a in query.aggregations)
+        sql = (
+            f"SELECT {', '.join(selected)} FROM entries e "
+            "JOIN shows s USING (show_id) JOIN contestants c USING (contestant_id)"
+        )
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        if groups:
+            sql += f" GROUP BY {', '.join(groups)}"
+        if query.having:
+            havings = []
+            for condition in query.having:
+                clause, clause_params = _condition_sql(
+                    _AGGREGATES[condition.column], condition, condition.numbers()
+                )
+                havings.append(clause)
+                params.extend(clause_params)
+            # without group-bys, the whole archive is a single group
+            sql += f" {'HAVING' if groups else 'GROUP BY NULL HAVING'} {' AND '.join(havings)}"
+        if groups:
+            sql += f" ORDER BY {', '.join(groups)}"
+        with span("archive.query", conditions=len(query.where)):
+            result = pd.read_sql_query(sql, self._connection, params=params)
+        if "place" in query.by:
+            result["place"] = [PLACE_LABELS[code] for code in result["place"]]
+        return result
+
+    def prize_winners(
+        self, prize: Optional[str] = None, last: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        The winners of each prize, or of the given prize, at each show, or at the last
+         shows, latest first.
+        """
+        clauses = []
+        params: Dict[str, Any] = {}
+        if prize is not None:
+            clauses.append("p.prize = :prize COLLATE NOCASE")
+            params["prize"] = prize
+        if last is not None:
+            clauses.append(
+                "p.show_id IN (SELECT show_id FROM shows ORDER BY name DESC LIMIT :last)"
+            )
+            params["last"] = last
+        sql = (
+            'SELECT s.name AS "show", p.prize AS "prize", c.name AS "winner" FROM prizes p '
+            "JOIN shows s USING (show_id) JOIN contestants c USING (contestant_id)"
+        )
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        sql += " ORDER BY s.name DESC, p.prize, c.name"
+        return pd.read_sql_query(sql, self._connection, params=params)
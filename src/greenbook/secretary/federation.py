@@ -0,0 +1,117 @@
+"""
+Totals over several shows run to the same schedule, for the regional trophies: a combined
+ ranking, and each prize decided as it is at a single show, but on the points of each
+ contestant in each class added up over every show.
+
+Contestants at different shows are the same person if their names are the same once
+ normalized, i.e. ignoring case, accents, punctuation and spacing. Each show is read as its
+ columnar view, in worker processes side by side, and only the entries which scored are
+ combined.
+"""
+
+import os
+import numpy as np
+from typing import Dict, List, Tuple, Callable, Optional, Sequence
+from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+from greenbook.data.search import normalize_name
+from greenbook.data.columns import ShowColumns
+from greenbook.telemetry.spans import span
+from greenbook.definitions.prizes import ALL_PRIZES, rank_by_points
+from greenbook.definitions.schedule import Schedule
+
+
+@dataclass
+class Federation:
+    shows: int
+    # the name of each contestant, as first given at any show
+    names: Tuple[str, ...]
+    # the number of shows each contestant entered
+    shows_entered: np.ndarray
+    # the points of each contestant, by name, in each class, totalled over the shows
+    points: Dict[str, Dict[str, int]]
+
+    def ranking(self) -> List[Tuple[str, int]]:
+        return rank_by_points(self.points)
+
+    def prize_results(self, schedule: Schedule) -> List[str]:
+        """
+        The winners of each prize, as "prize: winners". Prizes awarded by hand are left to
+         each show.
+        """
+        return [
+            f"{prize}: {', '.join(sorted(prize.winner_by_points(self.points, schedule)))}"
+            for prize in ALL_PRIZES
+        ]
+
+
+def load_shows(
+    locations: Sequence[Path],
+    load: Callable[[Path], ShowColumns],
+    workers: Optional[int] = None,
+) -> List[ShowColumns]:
+    """
+    Load each show with load, which must be picklable, in up to workers processes, or as
+     many as there are CPUs.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(locations)))
+    with span("federation.load", shows=len(locations), workers=workers):
+        if workers == 1:
+            return [_result(location, lambda: load(location)) for location in locations]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(load, location) for location in locations]
+            return [
+                _result(location, future.result) for location, future in zip(locations, futures)
+            ]
+
+
+def _result(location: Path, result: Callable[[], ShowColumns]) -> ShowColumns:
+    try:
+        return result()
+    except ValueError as e:
+        raise ValueError(f"Could not load the show in {location}: {e}") from e
+
+
+def federate(shows: Sequence[ShowColumns]) -> Federation:
+    """
+    Combine the shows, which must have been encoded against the same schedule.
+    """
+    if not shows:
+        raise ValueError("At least one show is needed to federate.")
+    class_ids = shows[0].class_ids
+    if any(show.class_ids != class_ids for show in shows):
+        raise ValueError("The shows must all have the same schedule to be federated.")
+    with span("federation.combine", shows=len(shows)) as counts:
+        codes_by_key: Dict[str, int] = {}
+        names: List[str] = []
+        entered, class_codes, contestants, points = [], [], [], []
+        for show in shows:
+            codes = np.empty(len(show.names), dtype=np.int64)
+            for i, name in enumerate(show.names):
+                code = codes_by_key.setdefault(normalize_name(name), len(names))
+                if code == len(names):
+                    names.append(name)
+                codes[i] = code
+            entered.append(np.unique(codes))
+            scored = show.points > 0
+            class_codes.append(show.class_codes[scored].astype(np.int64))
+            contestants.append(codes[show.contestants[scored]])
+            points.append(show.points[scored].astype(np.int64))
+
+        # sum the points of each contestant in each class over the shows
+        keys = np.concatenate(class_codes) * len(names) + np.concatenate(contestants)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(points)).astype(np.int64)
+        class_points: Dict[str, Dict[str, int]] = {}
+        for key, total in zip(unique_keys.tolist(), totals.tolist()):
+            class_code, contestant = divmod(key, len(names))
+            class_points.setdefault(class_ids[class_code], {})[names[contestant]] = total
+        counts["contestants"] = len(names)
+    return Federation(
+        shows=len(shows),
+        names=tuple(names),
+        shows_entered=np.bincount(np.concatenate(entered), minlength=len(names)),
+        points=class_points,
+    )
@@ -0,0 +1,86 @@
+"""
+Entry fees, payments and balances of every contestant, computed in one vectorized pass
+ over their entries rather than contestant by contestant.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Sequence
+
+from greenbook.definitions.schedule import Schedule
+
+CONTESTANT_COL = "contestant"
+ENTRIES_COL = "entries"
+FEES_COL = "fees"
+PAID_COL = "paid"
+BALANCE_COL = "balance"
+BALANCE_COLS = (CONTESTANT_COL, ENTRIES_COL, FEES_COL, PAID_COL, BALANCE_COL)
+
+
+def compute_fees(
+    schedule: Schedule, owners: np.ndarray, class_codes: np.ndarray, n_contestants: int
+) -> np.ndarray:
+    """
+    The fee due from each contestant, given the owning contestant and the class code of
+     every entry. A section cap limits what a contestant pays for their entries in that
+     section, and the fee cap what they pay for all of them.
+    """
+    n_sections = len(schedule.section_ids)
+    cells = owners * n_sections + schedule.class_sections[class_codes]
+    section_fees = np.bincount(
+        cells, weights=schedule.entry_fees[class_codes], minlength=n_contestants * n_sections
+    ).reshape(n_contestants, n_sections)
+    fees = np.minimum(section_fees, schedule.section_caps[None, :]).sum(axis=1)
+    return np.minimum(fees, schedule.fee_cap)
+
+
+def _balances_df(
+    names: Sequence[str], owners: np.ndarray, fees: np.ndarray, paid: np.ndarray
+) -> pd.DataFrame:
+    fees = fees.round(2)
+    paid = paid.round(2)
+    return pd.DataFrame(
+        {
+            CONTESTANT_COL: list(names),
+            ENTRIES_COL: np.bincount(owners, minlength=len(names)),
+            FEES_COL: fees,
+            PAID_COL: paid,
+            BALANCE_COL: (fees - paid).round(2),
+        },
+        columns=BALANCE_COLS,
+    )
+
+
+def contestant_balances(
+    schedule: Schedule,
+    names: Sequence[str],
+    entry_classes: Sequence[Sequence[str]],
+    paid: Sequence[float],
+) -> pd.DataFrame:
+    """
+    The balance sheet of the named contestants, given the classes of their entries and
+     what they have paid, with a row per contestant in the order given.
+    """
+    owners = np.repeat(np.arange(len(names)), [len(classes) for classes in entry_classes])
+    class_codes = schedule.encode([c for classes in entry_classes for c in classes])
+    fees = compute_fees(schedule, owners, class_codes, n_contestants=len(names))
+    return _balances_df(names, owners, fees, np.asarray(paid, dtype=np.float64))
+
+
+def ledger_balances(
+    schedule: Schedule, ledger: pd.DataFrame, name_col: str, paid_col: str
+) -> pd.DataFrame:
+    """
+    The balance sheet of every contestant in a registration ledger, which has a row per
+     entry marking its class, in the order they first registered.
+    """
+    owners, names = pd.factorize(ledger[name_col])
+    marked = ledger[list(schedule.class_ids)].notna().to_numpy()
+    is_entry = marked.any(axis=1)
+    class_codes = marked.argmax(axis=1)[is_entry]
+    entry_owners = owners[is_entry]
+    fees = compute_fees(schedule, entry_owners, class_codes, n_contestants=len(names))
+    paid = np.bincount(
+        owners, weights=ledger[paid_col].fillna(0).to_numpy(dtype=np.float64), minlength=len(names)
+    )
+    return _balances_df([str(name) for name in names], entry_owners, fees, paid)
@@ -0,0 +1,422 @@
+"""
+A journal of every change made to the show, saying when it was saved and by whom, from
+ which the show as it stood at any time can be rebuilt and compared with another.
+
+The journal, classes.history, is JSON Lines appended to by every save of the show. Every
+ CHECKPOINT_INTERVAL changes, and after every allocation, which replaces the show rather
+ than changing it, the whole show is written to a checkpoint named after the size of the
+ journal at that point, as the same YAML the show itself is saved as. Rebuilding the show
+ at a time loads the last checkpoint before it and replays the few changes saved between
+ the two.
+"""
+
+import io
+import os
+import json
+import bisect
+import getpass
+import logging
+from typing import Any, Dict, List, Tuple, Optional, Sequence
+from pathlib import Path
+from datetime import date, time, datetime
+from dataclasses import field, dataclass
+from ruamel.yaml import YAML
+
+from greenbook.data.show import Show, ShowClass
+from greenbook.data.storage import append_durably
+from greenbook.telemetry.spans import span
+from greenbook.secretary.judging import ClassJudgment, judge_class
+from greenbook.telemetry.metrics import REGISTRY
+
+_LOG = logging.getLogger(__name__)
+
+# the version of the checkpoints, to be incremented whenever the show's classes change;
+# checkpoints of other versions are never loaded, and version 1 was pickled
+HISTORY_FORMAT_VERSION = 2
+CHECKPOINT_INTERVAL = 50
+
+ALLOCATE = "allocate"
+JUDGE = "judge"
+PRIZE = "prize"
+# the places of a judgment, and the placings of a class they become
+_PLACE_ATTRS = {
+    "first": "first_place",
+    "second": "second_place",
+    "third": "third_place",
+    "commendations": "commendations",
+}
+PLACES = tuple(_PLACE_ATTRS)
+
+_CHANGES = REGISTRY.counter("greenbook_history_changes_total", "Changes added to the journal.")
+_CHECKPOINTS = REGISTRY.counter("greenbook_history_checkpoints_total", "Checkpoints written.")
+
+
+def default_operator() -> str:
+    """
+    Who is making changes, which is GREENBOOK_OPERATOR if set, or else the user's login.
+    """
+    operator = os.getenv("GREENBOOK_OPERATOR")
+    if operator:
+        return operator
+    try:
+        return getpass.getuser()
+    except (OSError, KeyError):
+        return "unknown"
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a time given as an ISO date and time, as just a time of day today, or as now.
+     Times without a timezone are local.
+    """
+    if value == "now":
+        return datetime.now().astimezone()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.combine(date.today(), time.fromisoformat(value))
+        except ValueError:
+            raise ValueError(f"Cannot read the time {value!r}, e.g. 14:30 or 2024-08-10T14:30")
+    return parsed.astimezone()
+
+
+yaml = YAML()
+
+
+def snapshot(show: Show) -> bytes:
+    stream = io.BytesIO()
+    yaml.dump(show, stream)
+    return stream.getvalue()
+
+
+@dataclass
+class Change:
+    action: str
+    operator: str
+    details: Dict[str, Any]
+    # when the change was saved
+    time: Optional[datetime] = None
+    # the show just after the change, if it must be checkpointed
+    snapshot: Optional[bytes] = field(default=None, repr=False)
+
+    @classmethod
+    def allocation(cls, show: Show, operator: str) -> "Change":
+        return cls(
+            action=ALLOCATE,
+            operator=operator,
+            details={"classes": len(show.classes()), "entries": show.total_entries()},
+            snapshot=snapshot(show),
+        )
+
+    @classmethod
+    def judgment(cls, judgment: ClassJudgment, show_class: ShowClass, operator: str) -> "Change":
+        # the names are only for reading the journal, the entries are replayed
+        details: Dict[str, Any] = {"class": judgment.class_id}
+        for place in PLACES:
+            placing = getattr(show_class, _PLACE_ATTRS[place])
+            details[place] = [
+                [entry, contestant.name]
+                for entry, (contestant, _) in zip(getattr(judgment, place), placing)
+            ]
+        return cls(action=JUDGE, operator=operator, details=details)
+
+    @classmethod
+    def prize(
+        cls, prize: str, class_id: str, contestant_id: int, name: str, operator: str
+    ) -> "Change":
+        details = {"prize": prize, "class": class_id, "entry": contestant_id, "contestant": name}
+        return cls(action=PRIZE, operator=operator, details=details)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "time": self.time.isoformat(timespec="milliseconds"),
+                "operator": self.operator,
+                "action": self.action,
+                "details": self.details,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "Change":
+        record = json.loads(line)
+        return cls(
+            action=record["action"],
+            operator=record["operator"],
+            details=record["details"],
+            time=datetime.fromisoformat(record["time"]),
+        )
+
+    def class_ids(self) -> Tuple[str, ...]:
+        return (self.details["class"],) if "class" in self.details else ()
+
+    def describe(self) -> str:
+        details = self.details
+        if self.action == ALLOCATE:
+            return f"allocated {details['entries']} entries to {details['classes']} classes"
+        if self.action == PRIZE:
+            return (
+                f"awarded {details['prize']} to entry {details['entry']} in class "
+                f"{details['class']} ({details['contestant']})"
+            )
+        placings = [
+            f"{place} {_placing([(name, _entry_label(entry)) for entry, name in details[place]])}"
+            for place in PLACES
+            if details[place]
+        ]
+        return f"judged class {details['class']}: {'; '.join(placings) or 'no placings'}"
+
+    def apply(self, show: Show) -> Show:
+        details = self.details
+        if self.action == JUDGE:
+            judgment = ClassJudgment(
+                class_id=details["class"],
+                **{
+                    place: [_entry_reference(entry) for entry, _ in details[place]]
+                    for place in PLACES
+                },
+            )
+            return show.update_class(judge_class(show, judgment))
+        if self.action == PRIZE:
+            contestant = show.class_lookup(details["class"]).entry_lookup(details["entry"])
+            return show.add_prize(
+                contestant=contestant, class_id=details["class"], prize=details["prize"]
+            )
+        raise ValueError(f"Cannot replay {self.action}, which needs a checkpoint.")
+
+
+def _entry_reference(entry):
+    # JSON turns cross-references from tuples into lists
+    return entry if isinstance(entry, int) else tuple(entry)
+
+
+def _entry_label(entry) -> str:
+    return str(entry) if isinstance(entry, int) else f"{entry[0]}-{entry[1]}"
+
+
+def _placing(placing: Sequence[Tuple[str, Any]]) -> str:
+    return ", ".join(f"{entry} {name}" for name, entry in placing) or "none"
+
+
+def describe_class(show_class: ShowClass) -> str:
+    placings = [
+        f"{place} {_placing([(c.name, e) for c, e in getattr(show_class, attr)])}"
+        for place, attr in _PLACE_ATTRS.items()
+        if getattr(show_class, attr)
+    ]
+    return f"{show_class}: {'; '.join(placings) or 'not judged'}"
+
+
+def diff_shows(before: Optional[Show], after: Optional[Show]) -> List[str]:
+    """
+    What differs between two states of the show, class by class and then in the prizes.
+    """
+    before = before or Show(classes=[])
+    after = after or Show(classes=[])
+    differences = []
+    class_ids = {c.class_id for c in before.classes()} | {c.class_id for c in after.classes()}
+    for class_id in sorted(class_ids):
+        old, new = before.class_lookup(class_id), after.class_lookup(class_id)
+        if old is None:
+            differences.append(f"class {class_id}: allocated {len(new)} entries")
+            continue
+        if new is None:
+            differences.append(f"class {class_id}: no longer in the show")
+            continue
+        if [c.name for c in old.contestants] != [c.name for c in new.contestants]:
+            differences.append(f"class {class_id}: entries changed, {len(old)} -> {len(new)}")
+        for place, attr in _PLACE_ATTRS.items():
+            old_placing = [(c.name, e) for c, e in getattr(old, attr)]
+            new_placing = [(c.name, e) for c, e in getattr(new, attr)]
+            if old_placing != new_placing:
+                differences.append(
+                    f"class {class_id}: {place} {_placing(old_placing)} -> {_placing(new_placing)}"
+                )
+    old_prizes = {(c.name, class_id, prize) for c, class_id, prize in before.prizes}
+    new_prizes = {(c.name, class_id, prize) for c, class_id, prize in after.prizes}
+    for name, class_id, prize in sorted(new_prizes - old_prizes):
+        differences.append(f"prize {prize}: awarded to {name} (class {class_id})")
+    for name, class_id, prize in sorted(old_prizes - new_prizes):
+        differences.append(f"prize {prize}: no longer awarded to {name} (class {class_id})")
+    return differences
+
+
+@dataclass
+class JournalEntry:
+    # the byte offsets of the change's line in the journal
+    start: int
+    end: int
+    change: Change
+
+
+class History:
+    def __init__(self, journal_loc: Path, checkpoints_loc: Path):
+        """
+        The checkpoints are appended to a single file, each after a line giving the offset
+         into the journal it was taken at, its length and its format version.
+        """
+        self._journal_loc = journal_loc
+        self._checkpoints_loc = checkpoints_loc
+
+    @classmethod
+    def of_ledger(cls, ledger_loc: Path) -> "History":
+        """
+        The history kept beside the show saved at ledger_loc.
+        """
+        return cls(
+            journal_loc=ledger_loc.with_suffix(".history"),
+            checkpoints_loc=ledger_loc.with_suffix(".checkpoints"),
+        )
+
+    @property
+    def journal_loc(self) -> Path:
+        return self._journal_loc
+
+    @property
+    def checkpoints_loc(self) -> Path:
+        return self._checkpoints_loc
+
+    def _checkpoint_index(self) -> Dict[int, Tuple[int, int, int]]:
+        """
+        The position, length and version of the checkpoint at each offset into the journal.
+        """
+        index: Dict[int, Tuple[int, int, int]] = {}
+        if not self._checkpoints_loc.exists():
+            return index
+        size = self._checkpoints_loc.stat().st_size
+        with self._checkpoints_loc.open("rb") as f:
+            while True:
+                header = f.readline()
+                try:
+                    # checkpoints of version 1 had no version in their header
+                    offset, length, version = [*(int(value) for value in header.split()), 1][:3]
+                except ValueError:
+                    # the end, or a checkpoint torn by a crash
+                    break
+                if f.tell() + length > size:
+                    break
+                index[offset] = (f.tell(), length, version)
+                f.seek(length, os.SEEK_CUR)
+        return index
+
+    def checkpoints(self) -> List[int]:
+        """
+        The offsets into the journal at which the show was checkpointed, in order.
+        """
+        return sorted(self._checkpoint_index())
+
+    def _write_checkpoint(self, offset: int, data: bytes):
+        header = f"{offset} {len(data)} {HISTORY_FORMAT_VERSION}\n"
+        append_durably(self._checkpoints_loc, header.encode() + data)
+        _CHECKPOINTS.inc()
+
+    def _load_checkpoint(self, offset: int) -> Show:
+        position, length, version = self._checkpoint_index()[offset]
+        if version != HISTORY_FORMAT_VERSION:
+            raise ValueError(f"The checkpoint at {offset} is from another version of greenbook.")
+        with self._checkpoints_loc.open("rb") as f:
+            f.seek(position)
+            # a fresh loader, since a YAML instance holds on to the last document it loaded
+            return YAML().load(f.read(length))
+
+    def record(self, changes: Sequence[Change], show: Show):
+        """
+        Add the changes to the journal, as saved now, given the show after them all. This
+         must be called while holding the show's lock, just after saving it.
+        """
+        if not changes:
+            return
+        saved = datetime.now().astimezone()
+        for change in changes:
+            change.time = saved
+        lines = [f"{change.to_json()}\n".encode("utf-8") for change in changes]
+        prefix = b""
+        if self._journal_loc.exists() and self._journal_loc.stat().st_size:
+            with self._journal_loc.open("rb") as f:
+                f.seek(-1, os.SEEK_END)
+                # a line torn by a crash is left on a line of its own, to be skipped
+                if f.read(1) != b"\n":
+                    prefix = b"\n"
+        text = prefix + b"".join(lines)
+        end = append_durably(self._journal_loc, text)
+        _CHANGES.inc(len(changes))
+
+        checkpoints = self.checkpoints()
+        offset = end - len(text) + len(prefix)
+        for change, line in zip(changes, lines):
+            offset += len(line)
+            if change.snapshot is not None:
+                self._write_checkpoint(offset, change.snapshot)
+                checkpoints.append(offset)
+        if not checkpoints or self._count_since(checkpoints[-1]) >= CHECKPOINT_INTERVAL:
+            self._write_checkpoint(end, snapshot(show))
+
+    def _count_since(self, offset: int) -> int:
+        with self._journal_loc.open("rb") as f:
+            f.seek(offset)
+            return f.read().count(b"\n")
+
+    def entries(self, since: int = 0) -> List[JournalEntry]:
+        """
+        The changes in the journal after the given offset into it. A last line without its
+         newline is still being written, so is left out until it is finished.
+        """
+        if not self._journal_loc.exists():
+            return []
+        with self._journal_loc.open("rb") as f:
+            f.seek(since)
+            data = f.read()
+        entries = []
+        offset = since
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            start, offset = offset, offset + len(line)
+            try:
+                change = Change.from_json(line.decode("utf-8"))
+            except (ValueError, KeyError):
+                _LOG.warning(f"Skipping an unreadable change at {start} in {self._journal_loc}")
+                continue
+            entries.append(JournalEntry(start=start, end=offset, change=change))
+        return entries
+
+    def changes(self) -> List[Change]:
+        return [entry.change for entry in self.entries()]
+
+    def show_at(self, when: datetime) -> Optional[Show]:
+        """
+        The show as it was at the given time, or None if it had not been allocated.
+        """
+        with span("history.show_at") as counts:
+            entries = self.entries()
+            # changes are saved in order, so those saved by then come first
+            saved = bisect.bisect_right([entry.change.time for entry in entries], when)
+            if not saved:
+                return None
+            show, counts["replayed"] = self._rebuild(entries[:saved])
+        return show
+
+    def rebuild(self, entries: Sequence[JournalEntry]) -> Optional[Show]:
+        """
+        The show just after the last of the given entries, which run from the start of the
+         journal, or None if there are none.
+        """
+        if not entries:
+            return None
+        with span("history.rebuild") as counts:
+            show, counts["replayed"] = self._rebuild(entries)
+        return show
+
+    def _rebuild(self, entries: Sequence[JournalEntry]) -> Tuple[Show, int]:
+        end = entries[-1].end
+        checkpoints = [offset for offset in self.checkpoints() if offset <= end]
+        if not checkpoints:
+            raise ValueError(
+                f"The history of the show does not go back to {entries[-1].change.time}."
+            )
+        show = self._load_checkpoint(checkpoints[-1])
+        replayed = [e for e in entries if e.start >= checkpoints[-1]]
+        for entry in replayed:
+            show = entry.change.apply(show)
+        return show, len(replayed)
@@ -0,0 +1,107 @@
+import csv
+import logging
+from typing import Dict, List, Tuple, Union
+from pathlib import Path
+from dataclasses import field, dataclass
+
+from greenbook.data.show import Show, ShowClass
+from greenbook.data.entries import Contestant
+
+_LOG = logging.getLogger(__name__)
+
+ALLOWED_SCORES = [
+    "1",
+    "2",
+    "3",
+    "C",
+]
+
+CLASS_COL = "class"
+PLACE_COL = "place"
+ENTRY_COL = "entry"
+SHEET_COLS = (CLASS_COL, PLACE_COL, ENTRY_COL)
+
+EntryReference = Union[int, Tuple[str, int]]
+
+
+def parse_entry_reference(value: str) -> EntryReference:
+    """
+    Parse an entry number, or a ``class:entry`` cross-reference for an entry which was
+     moved from another class.
+    """
+    value = value.strip()
+    if ":" in value:
+        class_id, contestant_id = value.split(":")
+        return class_id.strip(), int(contestant_id)
+    return int(value)
+
+
+@dataclass
+class ClassJudgment:
+    class_id: str
+    first: List[EntryReference] = field(default_factory=list)
+    second: List[EntryReference] = field(default_factory=list)
+    third: List[EntryReference] = field(default_factory=list)
+    commendations: List[EntryReference] = field(default_factory=list)
+
+    def add(self, place: str, entry: EntryReference):
+        {
+            "1": self.first,
+            "2": self.second,
+            "3": self.third,
+            "C": self.commendations,
+        }[place].append(entry)
+
+
+def judge_class(show: Show, judgment: ClassJudgment) -> ShowClass:
+    """
+    The class with the placings of the judgment, which replace any it had before.
+    """
+
+    def _lookup(entry: EntryReference) -> Tuple[Contestant, Union[int, str]]:
+        if isinstance(entry, int):
+            return show.class_lookup(judgment.class_id).entry_lookup(entry), entry
+        other_class_id, contestant_id = entry
+        contestant = show.class_lookup(other_class_id).entry_lookup(contestant_id)
+        return contestant, f"{other_class_id}-{contestant_id}"
+
+    return show.class_lookup(judgment.class_id).add_judgments(
+        first=[_lookup(c) for c in judgment.first],
+        second=[_lookup(c) for c in judgment.second],
+        third=[_lookup(c) for c in judgment.third],
+        commendations=[_lookup(c) for c in judgment.commendations],
+    )
+
+
+def read_judgment_sheet(location: Path) -> Tuple[List[ClassJudgment], List[str]]:
+    """
+    Read a results sheet with one row per placing and columns: class, place, entry.
+
+    Every row is read, and the problems found are returned alongside the judgments
+     so they can be reported together with any problems against the show itself.
+    """
+    errors = []
+    judgments: Dict[str, ClassJudgment] = {}
+    with location.open("r", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [col for col in SHEET_COLS if col not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Results sheet {location} is missing columns: {missing}")
+        # the header is line 1
+        for line_no, row in enumerate(reader, start=2):
+            class_id = (row[CLASS_COL] or "").strip()
+            place = (row[PLACE_COL] or "").strip().upper()
+            if not class_id:
+                errors.append(f"line {line_no}: no class given.")
+                continue
+            if place not in ALLOWED_SCORES:
+                errors.append(f"line {line_no}: place {place!r} is not one of {ALLOWED_SCORES}.")
+                continue
+            try:
+                entry = parse_entry_reference(row[ENTRY_COL] or "")
+            except ValueError:
+                errors.append(f"line {line_no}: cannot parse entry {row[ENTRY_COL]!r}.")
+                continue
+            judgments.setdefault(class_id, ClassJudgment(class_id=class_id)).add(place, entry)
+    _LOG.info(f"Read judgments for {len(judgments)} classes from {location}")
+    return list(judgments.values()), errors
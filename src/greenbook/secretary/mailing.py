@@ -0,0 +1,331 @@
+"""
+Emailing each contestant their entry slip.
+
+Slips are sent over a small pool of SMTP connections, which are opened as they are first
+ needed and kept open between messages, by as many threads as there are connections. A
+ message which fails for a reason which may pass, e.g. a dropped connection or a 4xx
+ reply, is retried on a fresh connection after a backoff; one refused outright is given
+ up on. Every slip sent is recorded in a log beside the show, so that sending again only
+ sends the slips which have not been.
+"""
+
+import csv
+import ssl
+import json
+import time
+import queue
+import logging
+import smtplib
+import threading
+from typing import Set, Dict, List, Tuple, Callable, Optional, Sequence
+from pathlib import Path
+from datetime import datetime
+from dataclasses import field, dataclass
+from email.utils import formataddr, make_msgid
+from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor
+
+from greenbook.data.search import normalize_name
+from greenbook.data.storage import append_durably
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
+
+_LOG = logging.getLogger(__name__)
+
+ADDRESSES_FILE = "addresses.csv"
+SENT_FILE = "sent-slips.jsonl"
+DEFAULT_SMTP_PORT = 587
+DEFAULT_CONNECTIONS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+DEFAULT_SUBJECT = "Your entries for the show"
+_WAIT_SECONDS = 0.1
+
+_SENT = REGISTRY.counter("greenbook_sent_slips_total", "Entry slips emailed.")
+_RETRIED = REGISTRY.counter("greenbook_slip_send_retries_total", "Retries of sending a slip.")
+_FAILED = REGISTRY.counter("greenbook_failed_slips_total", "Entry slips which could not be sent.")
+_SEND_SECONDS = REGISTRY.histogram("greenbook_send_slip_seconds", "Time to send a slip.")
+
+
+def read_addresses(location: Path) -> Dict[str, str]:
+    """
+    The email address of each contestant, by normalized name, from a CSV file with name
+     and email columns.
+    """
+    with Path(location).open(newline="") as f:
+        reader = csv.DictReader(f)
+        missing = {"name", "email"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{location} has no {', '.join(sorted(missing))} column.")
+        return {
+            normalize_name(row["name"]): row["email"].strip()
+            for row in reader
+            if row["email"] and row["email"].strip()
+        }
+
+
+@dataclass
+class SmtpSettings:
+    host: str
+    port: int = DEFAULT_SMTP_PORT
+    username: Optional[str] = None
+    password: Optional[str] = None
+    # upgrade the connection to TLS before logging in
+    starttls: bool = True
+    timeout: float = 30.0
+
+    def connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except BaseException:
+            smtp.close()
+            raise
+        return smtp
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether sending may succeed if tried again.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # refused, reset or timed out connections
+    return isinstance(error, OSError)
+
+
+class SmtpPool:
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        size: int = DEFAULT_CONNECTIONS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        """
+        Up to size connections are opened with connect. A message is tried up to retries
+         more times, waiting backoff seconds before the first retry and twice as long
+         before each one after.
+        """
+        if size < 1:
+            raise ValueError(f"The pool needs at least one connection, not {size}.")
+        self._connect = connect
+        self._size = size
+        self._retries = retries
+        self._backoff = backoff
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._opened = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def connections_opened(self) -> int:
+        return self._opened
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        while True:
+            with self._lock:
+                opening = self._open < self._size
+                if opening:
+                    self._open += 1
+            if opening:
+                break
+            # wait for another thread to be done with its connection, or to drop it
+            try:
+                return self._idle.get(timeout=_WAIT_SECONDS)
+            except queue.Empty:
+                continue
+        try:
+            smtp = self._connect()
+        except BaseException:
+            with self._lock:
+                self._open -= 1
+            raise
+        with self._lock:
+            self._opened += 1
+        return smtp
+
+    def _discard(self, smtp: smtplib.SMTP):
+        try:
+            smtp.close()
+        finally:
+            with self._lock:
+                self._open -= 1
+
+    def send(self, message: EmailMessage):
+        for attempt in range(self._retries + 1):
+            smtp = None
+            try:
+                smtp = self._acquire()
+                smtp.send_message(message)
+            except Exception as e:
+                if smtp is not None:
+                    # smtplib resets a connection which refused a message, but one which
+                    # failed otherwise may be in any state
+                    if is_transient(e):
+                        self._discard(smtp)
+                    else:
+                        self._idle.put(smtp)
+                if not is_transient(e) or attempt == self._retries:
+                    raise
+                _LOG.info(f"Retrying {message['To']} after: {e}")
+                _RETRIED.inc()
+                time.sleep(self._backoff * 2**attempt)
+            else:
+                self._idle.put(smtp)
+                return
+
+    def close(self):
+        while True:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            finally:
+                self._discard(smtp)
+
+    def __enter__(self) -> "SmtpPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SentLog:
+    def __init__(self, location: Path):
+        """
+        A JSON line per slip sent, giving when, to whom and its message id.
+        """
+        self._location = location
+        self._lock = threading.Lock()
+
+    def sent(self) -> Set[Tuple[str, str]]:
+        """
+        The normalized name and address of each contestant whose slip has been sent.
+        """
+        if not self._location.exists():
+            return set()
+        sent = set()
+        for line in self._location.read_text("utf-8").splitlines():
+            try:
+                record = json.loads(line)
+                sent.add((normalize_name(record["name"]), record["address"]))
+            except (ValueError, KeyError):
+                _LOG.warning(f"Skipping an unreadable line of {self._location}")
+        return sent
+
+    def record(self, name: str, address: str, message_id: str):
+        line = json.dumps(
+            {
+                "time": datetime.now().astimezone().isoformat(timespec="seconds"),
+                "name": name,
+                "address": address,
+                "message_id": message_id,
+            }
+        )
+        with self._lock:
+            append_durably(self._location, f"{line}\n")
+
+
+def slip_message(
+    sender: str, name: str, address: str, slip: Path, subject: str = DEFAULT_SUBJECT
+) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = formataddr((name, address))
+    message["Message-ID"] = make_msgid()
+    message.set_content(
+        f"Dear {name},\n\nPlease find attached your entry slip, which gives the class and "
+        "number of each of your entries and the fees due.\n"
+    )
+    message.add_attachment(
+        slip.read_bytes(), maintype="application", subtype="pdf", filename=slip.name
+    )
+    return message
+
+
+@dataclass
+class SendReport:
+    sent: List[str] = field(default_factory=list)
+    # already sent by an earlier run
+    skipped: List[str] = field(default_factory=list)
+    no_address: List[str] = field(default_factory=list)
+    no_slip: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def send_slips(
+    slips: Sequence[Tuple[str, Path]],
+    addresses: Dict[str, str],
+    pool: SmtpPool,
+    log: SentLog,
+    sender: str,
+    subject: str = DEFAULT_SUBJECT,
+    resend: bool = False,
+) -> SendReport:
+    """
+    Send each contestant's slip, given their names and slips, to their address, unless
+     it has been sent to them before. A message refused by the server is reported as
+     failed, while one which still cannot be sent after retrying stops the sending.
+    """
+    report = SendReport()
+    sent = set() if resend else log.sent()
+    to_send = []
+    for name, slip in slips:
+        address = addresses.get(normalize_name(name))
+        if address is None:
+            report.no_address.append(name)
+        elif (normalize_name(name), address) in sent:
+            report.skipped.append(name)
+        elif not slip.exists():
+            report.no_slip.append(name)
+        else:
+            to_send.append((name, address, slip))
+
+    def _send(name: str, address: str, slip: Path):
+        message = slip_message(sender, name, address, slip, subject=subject)
+        with _SEND_SECONDS.time():
+            pool.send(message)
+        log.record(name, address, message["Message-ID"])
+        _SENT.inc()
+
+    with span("mailing.send_slips", slips=len(to_send), connections=pool.size):
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            futures = [(args[0], executor.submit(_send, *args)) for args in to_send]
+            try:
+                for name, future in futures:
+                    try:
+                        future.result()
+                    except smtplib.SMTPException as e:
+                        if is_transient(e):
+                            raise
+                        report.failed[name] = str(e)
+                        _FAILED.inc()
+                    else:
+                        report.sent.append(name)
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+    return report
@@ -1,143 +1,371 @@
-import re
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Tuple, Union, Optional, Sequence
+from typing import IO, Dict, List, Tuple, Union, Callable, Optional, Sequence
 from pathlib import Path
-from collections import defaultdict
+from itertools import chain
 from ruamel.yaml import YAML
 
 from greenbook.data.show import Show, Entry, ShowClass
-from greenbook.data.entries import Contestant, DeletedContestant, AllocatedContestant
-from greenbook.render.labels import render_contestant_to_file
-from greenbook.render.results import render_prizes, render_ranking, render_class_results
-from greenbook.definitions.prices import ENTRY_COST, FREE_CLASSES
-from greenbook.definitions.prizes import ALL_PRIZES, sort_contestant_by_points
-from greenbook.definitions.classes import FLAT_CLASSES, CLASS_ID_TO_SECTION
+from greenbook.data.lookup import write_lookup_table
+from greenbook.render.pool import Rendering, RenderPool
+from greenbook.data.columns import ShowColumns
+from greenbook.data.entries import Contestant, DeletedContestant, RegisteredEntries
+from greenbook.data.storage import (
+    locked,
+    atomic_write,
+    read_version,
+    write_version,
+    open_versioned,
+)
+from greenbook.render.labels import slip_loc, render_contestant_to_file
+from greenbook.render.printer import label_stream
+from greenbook.render.results import (
+    render_prizes,
+    render_ranking,
+    render_class_page,
+    render_class_results,
+)
+from greenbook.secretary.fees import BALANCE_COL, contestant_balances
+from greenbook.telemetry.spans import span
+from greenbook.secretary.sheets import class_sheet, write_sheet
+from greenbook.secretary.history import Change, History, default_operator
+from greenbook.secretary.judging import ClassJudgment, EntryReference, judge_class
+from greenbook.telemetry.metrics import REGISTRY
+from greenbook.definitions.prizes import (
+    class_points,
+    prize_results,
+    rank_by_points,
+    sort_contestant_by_points,
+)
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE, Schedule
 
 _LOG = logging.getLogger(__name__)
 
 yaml = YAML()
 
+_SHOW_LOAD_SECONDS = REGISTRY.histogram("greenbook_show_load_seconds", "Time to load the show.")
+_SHOW_SAVE_SECONDS = REGISTRY.histogram("greenbook_show_save_seconds", "Time to save the show.")
+_ALLOCATE_SECONDS = REGISTRY.histogram(
+    "greenbook_allocate_seconds", "Time to allocate contestants to classes."
+)
+_ALLOCATED_ENTRIES = REGISTRY.counter(
+    "greenbook_allocated_entries_total", "Entries allocated to classes, over all allocations."
+)
+_JUDGMENTS = REGISTRY.counter("greenbook_judgments_total", "Classes judged.")
+_CACHED_PAGES = REGISTRY.counter(
+    "greenbook_cached_report_pages_total", "Class report pages reused from the page cache."
+)
+
+# the version of the class pages, to be incremented whenever their rendering changes
+PAGE_CACHE_FORMAT_VERSION = 2
+
 
 class Manager:
-    def __init__(self, ledger_loc: Path):
+    def __init__(
+        self,
+        ledger_loc: Path,
+        autosave: bool = True,
+        schedule: Schedule = DEFAULT_SCHEDULE,
+        operator: Optional[str] = None,
+    ):
+        """
+        With autosave off, changes are only written to the ledger by an explicit call to
+         save, so that many changes can share one write.
+
+        Every change is kept until it is saved, so that if another process saves the ledger
+         in the meantime, the changes can be re-applied to its version rather than lost.
+
+        Every change is also recorded in the show's history as made by the operator, unless
+         another is given for the change.
+        """
+        self._schedule = schedule
         self._ledger_loc = ledger_loc
+        self._autosave = autosave
+        self._dirty = False
         self._show: Optional[Show] = None
-        if self._ledger_loc.exists():
-            with self._ledger_loc.open("r") as f:
-                self._show = yaml.load(f)
-
-    def allocate(self, contestants: Sequence[AllocatedContestant]):
-        grouped_by_class: Dict[str, List[Tuple[int, Contestant]]] = defaultdict(list)
-        for allocated_contestant in contestants:
-            contestant = allocated_contestant.contestant
-            entries_df = allocated_contestant.entries_df
-            for class_id in entries_df.columns:
-                for class_entry_idx in entries_df[class_id].values:
-                    if class_entry_idx > 0:
-                        grouped_by_class[class_id].append((class_entry_idx, contestant))
-        ordered_contestants: Dict[str, List[Contestant]] = {}
-        for class_id, entries in grouped_by_class.items():
-            sorted_contestant = sorted(entries, key=lambda entry: entry[0])
-            ordered_contestants[class_id] = [cont for _, cont in sorted_contestant]
-        classes = [
-            ShowClass(
-                class_id=class_id,
-                name=FLAT_CLASSES[class_id],
-                contestants=ordered_contestants[class_id],
-                first_place=[],
-                second_place=[],
-                third_place=[],
-                commendations=[],
-            )
-            for class_id in grouped_by_class
-        ]
-        self._show = Show(classes=classes)
-        with self._ledger_loc.open("w") as f:
-            yaml.dump(self._show, f)
-            _LOG.info(f"Allocated contestants to classes in {self._ledger_loc}")
+        self._version = 0
+        self._mutations: List[Callable[[], None]] = []
+        self._changes: List[Change] = []
+        self._operator = operator or default_operator()
+        self._history = History.of_ledger(ledger_loc)
+        self._load()
+
+    def _load(self):
+        if not self._ledger_loc.exists():
+            self._show = None
+            self._version = 0
+            return
+        with (
+            span("manager.load_show") as counts,
+            _SHOW_LOAD_SECONDS.time(),
+            open_versioned(self._ledger_loc) as (version, f),
+        ):
+            # a fresh loader, since a YAML instance holds on to the last document it loaded
+            self._show = YAML().load(f)
+            self._version = version
+            counts["entries"] = self._show.total_entries()
+
+    def allocate(self, entries: RegisteredEntries, operator: Optional[str] = None):
+        with _ALLOCATE_SECONDS.time():
+            self._allocate(entries)
+        _ALLOCATED_ENTRIES.inc(self._show.total_entries())
+        self._save(
+            replay=lambda: self._allocate(entries),
+            changes=[Change.allocation(self._show, operator or self._operator)],
+        )
+        _LOG.info(f"Allocated contestants to classes in {self._ledger_loc}")
+
+    def _allocate(self, entries: RegisteredEntries):
+        with span("manager.build_classes", entries=len(entries)) as counts:
+            classes = [
+                ShowClass(
+                    class_id=class_id,
+                    name=self._schedule.class_name(class_id),
+                    contestants=contestants,
+                    first_place=[],
+                    second_place=[],
+                    third_place=[],
+                    commendations=[],
+                )
+                for class_id, contestants in entries.by_class()
+            ]
+            counts["classes"] = len(classes)
+            self._show = Show(classes=classes)
 
     def add_judgment(
         self,
         class_id: str,
-        first: Sequence[Union[int, Tuple[str, int]]],
-        second: Sequence[Union[int, Tuple[str, int]]],
-        third: Sequence[Union[int, Tuple[str, int]]],
-        commendations: Sequence[Union[int, Tuple[str, int]]],
+        first: Sequence[EntryReference],
+        second: Sequence[EntryReference],
+        third: Sequence[EntryReference],
+        commendations: Sequence[EntryReference],
+        operator: Optional[str] = None,
     ):
-        def _lookup(contestant: Union[int, Tuple[str, int]]) -> Tuple[Contestant, Union[int, str]]:
-            if isinstance(contestant, int):
-                return self.lookup_contestant(class_id, contestant), contestant
-            else:
-                other_class_id, contestant_id = contestant
-                return self.lookup_contestant(
-                    other_class_id, contestant_id
-                ), f"{other_class_id}-{contestant_id}"
+        judgment = ClassJudgment(
+            class_id=class_id,
+            first=list(first),
+            second=list(second),
+            third=list(third),
+            commendations=list(commendations),
+        )
+        self._apply_judgments([judgment])
+        _JUDGMENTS.inc()
+        self._save(
+            replay=lambda: self._apply_judgments([judgment]),
+            changes=self._judgment_changes([judgment], operator),
+        )
+        _LOG.info(f"Added judgments to class {class_id}")
 
-        show_class = self._show.class_lookup(class_id)
-        first_contestants = [_lookup(c) for c in first]
-        second_contestants = [_lookup(c) for c in second]
-        third_contestants = [_lookup(c) for c in third]
-        commendation_contestants = [_lookup(c) for c in commendations]
-        show_class = show_class.add_judgments(
-            first=first_contestants,
-            second=second_contestants,
-            third=third_contestants,
-            commendations=commendation_contestants,
+    def check_judgments(self, judgments: Sequence[ClassJudgment]) -> List[str]:
+        """
+        Return a description of every judgment which cannot be applied to the show.
+        """
+        errors = []
+
+        def _check(class_id: str, entry: EntryReference):
+            if not isinstance(entry, int):
+                class_id, entry = entry
+            show_class = self._show.class_lookup(class_id)
+            if show_class is None:
+                errors.append(f"class {class_id} is not in the show.")
+            elif not 0 < entry <= len(show_class):
+                errors.append(
+                    f"class {class_id} has no entry {entry} (it has {len(show_class)} entries)."
+                )
+
+        for judgment in judgments:
+            if self._show.class_lookup(judgment.class_id) is None:
+                errors.append(f"class {judgment.class_id} is not in the show.")
+                continue
+            for entry in chain(
+                judgment.first, judgment.second, judgment.third, judgment.commendations
+            ):
+                _check(judgment.class_id, entry)
+        return errors
+
+    def add_judgments(self, judgments: Sequence[ClassJudgment], operator: Optional[str] = None):
+        """
+        Apply the judgments for many classes at once, saving the show a single time.
+
+        Nothing is applied unless every judgment is valid.
+        """
+        errors = self.check_judgments(judgments)
+        if errors:
+            raise ValueError("Cannot apply judgments:\n" + "\n".join(errors))
+        with span("manager.apply_judgments", classes=len(judgments)):
+            self._apply_judgments(judgments)
+        _JUDGMENTS.inc(len(judgments))
+        self._save(
+            replay=lambda: self._apply_judgments(judgments),
+            changes=self._judgment_changes(judgments, operator),
         )
-        self._show = self._show.update_class(show_class)
-        with self._ledger_loc.open("w") as f:
-            yaml.dump(self._show, f)
-            _LOG.info(f"Added judgments to class {class_id}")
-
-    def add_prize(self, prize: str, class_id: str, contestant_id: int):
-        contestant = self.lookup_contestant(class_id, contestant_id)
-        self._show = self._show.add_prize(prize=prize, class_id=class_id, contestant=contestant)
-        with self._ledger_loc.open("w") as f:
-            yaml.dump(self._show, f)
-            _LOG.info(f"Added prize {prize} to contestant {contestant_id} in class {class_id}")
+        _LOG.info(f"Added judgments to {len(judgments)} classes")
+
+    def _apply_judgments(self, judgments: Sequence[ClassJudgment]):
+        show = self._show
+        for judgment in judgments:
+            show = show.update_class(self._judge_class(judgment))
+        self._show = show
+
+    def _judge_class(self, judgment: ClassJudgment) -> ShowClass:
+        return judge_class(self._show, judgment)
+
+    def _judgment_changes(
+        self, judgments: Sequence[ClassJudgment], operator: Optional[str]
+    ) -> List[Change]:
+        return [
+            Change.judgment(
+                judgment, self._show.class_lookup(judgment.class_id), operator or self._operator
+            )
+            for judgment in judgments
+        ]
+
+    def add_prize(
+        self, prize: str, class_id: str, contestant_id: int, operator: Optional[str] = None
+    ):
+        def _add_prize():
+            contestant = self.lookup_contestant(class_id, contestant_id)
+            self._show = self._show.add_prize(prize=prize, class_id=class_id, contestant=contestant)
+
+        _add_prize()
+        name = self.lookup_contestant(class_id, contestant_id).name
+        change = Change.prize(prize, class_id, contestant_id, name, operator or self._operator)
+        self._save(replay=_add_prize, changes=[change])
+        _LOG.info(f"Added prize {prize} to contestant {contestant_id} in class {class_id}")
+
+    def _save(self, replay: Callable[[], None], changes: Sequence[Change]):
+        """
+        Save a change which has just been applied, given how to apply it again and how to
+         record it in the history.
+        """
+        self._mutations.append(replay)
+        self._changes.extend(changes)
+        if self._autosave:
+            self.save()
+        else:
+            self._dirty = True
+
+    def save(self):
+        with locked(self._ledger_loc):
+            version = read_version(self._ledger_loc)
+            if version != self._version:
+                _LOG.warning(
+                    f"{self._ledger_loc} was saved by another process, re-applying "
+                    f"{len(self._mutations)} changes to its version."
+                )
+                self._load()
+                for mutation in self._mutations:
+                    mutation()
+            with (
+                span("manager.save_show", entries=self._show.total_entries()),
+                _SHOW_SAVE_SECONDS.time(),
+            ):
+                with atomic_write(self._ledger_loc) as f:
+                    write_version(f, version + 1)
+                    yaml.dump(self._show, f)
+            with span("manager.write_lookup_table"):
+                write_lookup_table(self._show, self.lookup_table_loc)
+            with span("manager.write_columns"):
+                self.columns().save(self.columns_loc)
+            with span("manager.record_history", changes=len(self._changes)):
+                self._history.record(self._changes, self._show)
+            self._version = version + 1
+        self._mutations.clear()
+        self._changes.clear()
+        self._dirty = False
+
+    @property
+    def lookup_table_loc(self) -> Path:
+        return self._ledger_loc.with_suffix(".lookup")
+
+    @property
+    def columns_loc(self) -> Path:
+        return self._ledger_loc.with_suffix(".columns.npz")
+
+    def columns(self) -> ShowColumns:
+        return ShowColumns.from_show(self._show, self._schedule)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def autosave(self) -> bool:
+        return self._autosave
+
+    @autosave.setter
+    def autosave(self, autosave: bool):
+        self._autosave = autosave
+
+    @property
+    def show(self) -> Optional[Show]:
+        return self._show
+
+    @property
+    def schedule(self) -> Schedule:
+        return self._schedule
+
+    @property
+    def history(self) -> History:
+        return self._history
 
     def lookup_contestant(self, class_id: str, contestant_id: int) -> Contestant:
-        return self._show.class_lookup(class_id).entry_lookup(contestant_id)
+        show_class = self._show.class_lookup(class_id) if self._show is not None else None
+        if show_class is None or not 0 < contestant_id <= len(show_class):
+            raise ValueError(f"Class {class_id} has no entry {contestant_id}.")
+        return show_class.entry_lookup(contestant_id)
+
+    def prize_results(self) -> Sequence[str]:
+        return prize_results(self._show, self._schedule)
 
     def report_prizes(self) -> Sequence[str]:
+        return self._report_prizes(self.prize_results())
+
+    def _report_prizes(self, winning_strings: Sequence[str]) -> Sequence[str]:
         _LOG.info("Beginning prize report.")
-        winning_strings = []
-        for prize in ALL_PRIZES:
-            winners = prize.winner(self._show)
-            winner_str = ", ".join([str(w) for w in sorted(winners)])
-            winning_strings.append(f"{prize}: {winner_str}")
-            print(f"{prize}: {winner_str}")
-        for prize in self._show.prizes:
-            contestant, _, prize_name = prize
-            winner_str = f"{prize_name}: {contestant.name}"
-            winning_strings.append(winner_str)
+        for winner_str in winning_strings:
             print(winner_str)
         _LOG.info("Completed prize report.")
         return winning_strings
 
-    def to_csv(self, location: Path):
+    def class_sheet(self, all_classes: bool = True) -> pd.DataFrame:
         """
         Create a dataframe of contestant_id x class. In each cell, the value
          is the name of the contestant corresponding to the contestant_id in the class,
           or None if that contestant id does not exist in that class.
+
+        With all_classes off, classes without entries are left out.
         """
-        all_contestant_ids = set()
-        for contestant, entries in self.contestant_entries().items():
-            all_contestant_ids.update([entry.contestant_id for entry in entries])
-        all_contestant_ids = sorted(all_contestant_ids)
-        data = {c: [None] * len(all_contestant_ids) for c in FLAT_CLASSES}
-        df = pd.DataFrame(data, index=all_contestant_ids)
-        for contestant, entries in self.contestant_entries().items():
-            name = contestant.name
-            for entry in entries:
-                df.at[entry.contestant_id, entry.class_id] = name
-        df.to_csv(location)
-        _LOG.info(f"Exported contestant data to {location}")
+        if all_classes or self._show is None:
+            class_ids = self._schedule.class_ids
+        else:
+            allocated = {show_class.class_id for show_class in self._show.classes()}
+            class_ids = [c for c in self._schedule.class_ids if c in allocated]
+        with span("manager.class_sheet", classes=len(class_ids)) as counts:
+            sheet = class_sheet(self._show, class_ids)
+            counts["entries"] = len(sheet)
+        return sheet
+
+    def export(
+        self, output: Union[Path, IO, None] = None, format: str = "csv", all_classes: bool = True
+    ):
+        write_sheet(self.class_sheet(all_classes=all_classes), output, format=format)
+        _LOG.info(f"Exported the class sheet to {output or 'stdout'}")
+
+    def to_csv(self, location: Path):
+        self.export(location, format="csv")
+
+    def ranking(self) -> Sequence[Tuple[Contestant, int]]:
+        return sort_contestant_by_points(self._show)
 
     def report_ranking(self) -> Sequence[Tuple[Contestant, int]]:
+        return self._report_ranking(self.ranking())
+
+    def _report_ranking(
+        self, ranking: Sequence[Tuple[Contestant, int]]
+    ) -> Sequence[Tuple[Contestant, int]]:
         _LOG.info("Beginning ranking report.")
-        ranking = sort_contestant_by_points(self._show)
         for contestant, points in ranking:
             print(f"{contestant}: {points}")
         _LOG.info("Completed ranking report.")
@@ -155,33 +383,152 @@ class Manager:
     def contestant_entries(self) -> Dict[Contestant, Sequence[Entry]]:
         return self._show.contestant_entries()
 
+    def _live_contestant_entries(self) -> List[Tuple[Contestant, Sequence[Entry]]]:
+        with span("manager.contestant_entries") as counts:
+            contestant_entries = [
+                (contestant, entries)
+                for contestant, entries in self.contestant_entries().items()
+                if not isinstance(contestant, DeletedContestant)
+            ]
+            counts["contestants"] = len(contestant_entries)
+        return contestant_entries
+
+    def balances(self) -> pd.DataFrame:
+        return self._balances(self._live_contestant_entries())
+
+    def _balances(
+        self, contestant_entries: Sequence[Tuple[Contestant, Sequence[Entry]]]
+    ) -> pd.DataFrame:
+        with span("manager.balances", contestants=len(contestant_entries)):
+            return contestant_balances(
+                self._schedule,
+                names=[contestant.name for contestant, _ in contestant_entries],
+                entry_classes=[
+                    [entry.class_id for entry in entries] for _, entries in contestant_entries
+                ],
+                paid=[contestant.paid for contestant, _ in contestant_entries],
+            )
+
     def render_contestants(self, directory: Path):
-        for contestant, entries in self.contestant_entries().items():
-            if isinstance(contestant, DeletedContestant):
-                continue
-            price = 0.0
-            for entry in entries:
-                if CLASS_ID_TO_SECTION[entry.class_id] not in FREE_CLASSES:
-                    price += ENTRY_COST
-            price -= contestant.paid
-            render_contestant_to_file(contestant.name, entries, directory, price=price)
+        contestant_entries = self._live_contestant_entries()
+        balances = self._balances(contestant_entries)[BALANCE_COL]
+        for (contestant, entries), balance in zip(contestant_entries, balances):
+            render_contestant_to_file(contestant.name, entries, directory, price=float(balance))
 
-    def render_final_report(self, directory: Path):
+    def slip_locs(self, directory: Path) -> List[Tuple[str, Path]]:
         """
-        Produce 2 PDFs:
+        The name of each contestant with entries, and where their slip is rendered to.
+        """
+        return [
+            (contestant.name, slip_loc(directory, contestant.name))
+            for contestant, _ in self._live_contestant_entries()
+        ]
+
+    def entry_labels(self, format: str) -> bytes:
+        """
+        Printer commands for a label for each entry, contestant by contestant.
+        """
+        return label_stream(
+            [(contestant.name, entries) for contestant, entries in self._live_contestant_entries()],
+            format=format,
+        )
+
+    @property
+    def page_cache_loc(self) -> Path:
+        return self._ledger_loc.with_suffix(".pages.npz")
+
+    def _load_page_cache(self) -> Dict[str, Tuple[str, bytes]]:
+        """
+        The fingerprint and page of each class in the page cache, which is empty if the
+         pages were rendered by another version of greenbook.
+        """
+        if not self.page_cache_loc.exists():
+            return {}
+        try:
+            with np.load(self.page_cache_loc, allow_pickle=False) as data:
+                if int(data["version"]) != PAGE_CACHE_FORMAT_VERSION:
+                    return {}
+                pages = data["pages"].tobytes()
+                starts = [0, *data["ends"].tolist()]
+                return {
+                    str(class_id): (str(fingerprint), pages[start:end])
+                    for class_id, fingerprint, start, end in zip(
+                        data["class_ids"], data["fingerprints"], starts, starts[1:]
+                    )
+                }
+        except (OSError, KeyError, ValueError):
+            _LOG.warning(f"Ignoring unreadable page cache {self.page_cache_loc}")
+            return {}
+
+    def _save_page_cache(self, pages: Dict[str, Tuple[str, bytes]]):
+        with atomic_write(self.page_cache_loc, "wb") as f:
+            np.savez(
+                f,
+                version=np.int64(PAGE_CACHE_FORMAT_VERSION),
+                class_ids=np.array(list(pages), dtype=str),
+                fingerprints=np.array([key for key, _ in pages.values()], dtype=str),
+                pages=np.frombuffer(b"".join(page for _, page in pages.values()), dtype=np.uint8),
+                ends=np.cumsum([len(page) for _, page in pages.values()], dtype=np.int64),
+            )
+
+    def class_pages(self, pool: Optional[RenderPool] = None) -> List[bytes]:
+        """
+        The results page of each class, in the order of the schedule.
+
+        The pages are cached beside the show, keyed by the fingerprint of their class, so
+         only the classes which have changed since the last report are rendered again,
+         in the pool's workers if given, the largest classes first. The result table of a
+         class is only built for a page being rendered, so it is not cached separately.
+        """
+        pool = pool or RenderPool(workers=1)
+        cache = self._load_page_cache()
+        classes = sorted(self._show.classes(), key=lambda c: self._schedule.sort_key(c.class_id))
+        keys = {c.class_id: c.fingerprint() for c in classes}
+        rendering: Dict[str, Rendering[bytes]] = {}
+        with span("manager.class_pages", classes=len(classes)) as counts:
+            for show_class in sorted(classes, key=len, reverse=True):
+                cached = cache.get(show_class.class_id)
+                if cached is None or cached[0] != keys[show_class.class_id]:
+                    rendering[show_class.class_id] = pool.submit(
+                        render_class_page, show_class.class_id, show_class.name, show_class.to_df()
+                    )
+            pages: Dict[str, Tuple[str, bytes]] = {
+                c.class_id: (
+                    (keys[c.class_id], rendering[c.class_id].result())
+                    if c.class_id in rendering
+                    else cache[c.class_id]
+                )
+                for c in classes
+            }
+            counts["rendered"] = len(rendering)
+        _CACHED_PAGES.inc(len(classes) - len(rendering))
+        if rendering or cache.keys() != pages.keys():
+            self._save_page_cache(pages)
+        return [page for _, page in pages.values()]
+
+    def render_final_report(self, directory: Path, workers: Optional[int] = None):
+        """
+        Produce 3 PDFs:
             1. A table per class in the show, giving the entry numbers, the names
             of the contestants and their results in the class.
             2. A list of all the prizes and their winners.
+            3. The overall points ranking.
+
+        The points of each contestant in each class are worked out once, for both the
+         prizes and the ranking, and the documents are rendered side by side in up to
+         workers processes, or as many as there are CPUs.
         """
-        # 1. Produce a table per class in the show
-        class_dfs: List[Tuple[str, str, pd.DataFrame]] = []
-        for show_class in sorted(
-            self._show.classes(), key=lambda c: int(re.sub(r"\D", "", c.class_id))
-        ):
-            class_df = show_class.to_df()
-            class_dfs.append((show_class.class_id, show_class.name, class_df))
-        render_class_results(class_dfs, directory)
-        # 2. Produce a list of all the prizes and their winners
-        render_prizes(self.report_prizes(), directory)
-        # 3. produce overall points ranking
-        render_ranking(self.report_ranking(), directory)
+        with RenderPool(workers) as pool, span("manager.final_report", workers=pool.workers):
+            with span("manager.report_points") as counts:
+                points = class_points(self._show)
+                prizes = self._report_prizes(prize_results(self._show, self._schedule, points))
+                ranking = self._report_ranking(rank_by_points(points))
+                counts["contestants"] = len(ranking)
+            documents = [
+                pool.submit(render_prizes, prizes, directory),
+                pool.submit(render_ranking, ranking, directory),
+            ]
+            render_class_results(self.class_pages(pool), directory)
+            for document in documents:
+                document.result()
+        _LOG.info(f"Rendered the final report to {directory} with {pool.workers} workers.")
@@ -0,0 +1,198 @@
+"""
+Splitting the judging of the classes between several judges, each of whom may only judge
+ some sections, so that every class is judged as early as possible.
+
+A class takes a fixed time plus a time per entry. Classes are first assigned longest first,
+ each to whichever judge allowed to judge it is least busy so far, and the assignment is
+ then improved by moving classes off, or swapping them with, the busiest judge while that
+ shortens their day without making anyone else's as long.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Sequence
+from dataclasses import field, dataclass
+
+from greenbook.definitions.schedule import Schedule
+
+MAX_IMPROVEMENTS = 10_000
+
+
+@dataclass
+class Judge:
+    name: str
+    # the sections the judge may judge, or all of them if empty
+    sections: Tuple[str, ...] = ()
+
+    def may_judge(self, section: str) -> bool:
+        return not self.sections or section in self.sections
+
+
+def parse_judge(value: str) -> Judge:
+    """
+    Parse a judge given as their name, optionally followed by = and the comma-separated
+     sections they may judge, e.g. "Joan Hollier=F,G".
+    """
+    name, _, sections = value.partition("=")
+    return Judge(
+        name=name.strip(),
+        sections=tuple(s.strip() for s in sections.split(",") if s.strip()),
+    )
+
+
+@dataclass
+class JudgingSlot:
+    class_id: str
+    name: str
+    entries: int
+    start: float
+    finish: float
+
+
+@dataclass
+class JudgingPlan:
+    judges: List[Judge]
+    slots: Dict[str, List[JudgingSlot]] = field(default_factory=dict)
+
+    @property
+    def makespan(self) -> float:
+        """
+        The time until every class has been judged.
+        """
+        return max((slots[-1].finish for slots in self.slots.values() if slots), default=0.0)
+
+    def load(self, judge: Judge) -> float:
+        slots = self.slots[judge.name]
+        return slots[-1].finish if slots else 0.0
+
+    @property
+    def lower_bound(self) -> float:
+        """
+        No plan could judge every class sooner than this, however they were split.
+        """
+        durations = [slot.finish - slot.start for slots in self.slots.values() for slot in slots]
+        return max(sum(durations) / len(self.judges), max(durations, default=0.0))
+
+
+def balance_loads(
+    durations: np.ndarray, eligible: np.ndarray, max_improvements: int = MAX_IMPROVEMENTS
+) -> np.ndarray:
+    """
+    The judge of each class, given the duration of each class and whether each judge
+     (column) may judge each class (row).
+    """
+    n_classes, n_judges = eligible.shape
+    unjudgeable = np.flatnonzero(~eligible.any(axis=1))
+    if len(unjudgeable):
+        raise ValueError(f"No judge may judge classes at positions {unjudgeable.tolist()}.")
+    judges = np.empty(n_classes, dtype=np.int64)
+    loads = np.zeros(n_judges)
+    # longest processing time first
+    for c in np.argsort(-durations, kind="stable"):
+        candidates = np.flatnonzero(eligible[c])
+        judge = candidates[np.argmin(loads[candidates])]
+        judges[c] = judge
+        loads[judge] += durations[c]
+
+    for _ in range(max_improvements):
+        busiest = int(np.argmax(loads))
+        makespan = loads[busiest]
+        if not _improve(busiest, makespan, durations, eligible, judges, loads):
+            break
+    return judges
+
+
+def _improve(
+    busiest: int,
+    makespan: float,
+    durations: np.ndarray,
+    eligible: np.ndarray,
+    judges: np.ndarray,
+    loads: np.ndarray,
+) -> bool:
+    """
+    Move a class off the busiest judge, or swap one of theirs for a shorter class of
+     another judge, if it leaves both judges less busy than the busiest was.
+    """
+    others = np.arange(len(loads)) != busiest
+    theirs = np.flatnonzero(judges == busiest)
+    for c in theirs[np.argsort(-durations[theirs], kind="stable")]:
+        # the least busy other judge who may judge the class
+        candidates = np.flatnonzero(eligible[c] & others)
+        if len(candidates):
+            judge = candidates[np.argmin(loads[candidates])]
+            if loads[judge] + durations[c] < makespan:
+                judges[c] = judge
+                loads[busiest] -= durations[c]
+                loads[judge] += durations[c]
+                return True
+        # shorter classes of other judges who may judge this one, and vice versa
+        deltas = durations[c] - durations
+        swappable = (
+            (judges != busiest)
+            & (deltas > 0)
+            & eligible[:, busiest]
+            & eligible[c, judges]
+            & (loads[judges] + deltas < makespan)
+        )
+        if swappable.any():
+            candidates = np.flatnonzero(swappable)
+            # the swap which leaves the busier of the two judges least busy
+            worst = np.maximum(
+                loads[judges[candidates]] + deltas[candidates], makespan - deltas[candidates]
+            )
+            other = candidates[np.argmin(worst)]
+            judge = judges[other]
+            judges[c], judges[other] = judge, busiest
+            loads[busiest] -= deltas[other]
+            loads[judge] += deltas[other]
+            return True
+    return False
+
+
+def plan_judging(
+    class_sizes: Dict[str, int],
+    schedule: Schedule,
+    judges: Sequence[Judge],
+    minutes_per_entry: float,
+    minutes_per_class: float = 0.0,
+    max_improvements: int = MAX_IMPROVEMENTS,
+) -> JudgingPlan:
+    """
+    Plan who judges each class, and when, given the number of entries in each class. Each
+     judge takes their classes in the order of the schedule.
+    """
+    if not judges:
+        raise ValueError("At least one judge is needed to plan the judging.")
+    if len({judge.name for judge in judges}) != len(judges):
+        raise ValueError("Judges must have different names.")
+    unknown = {s for judge in judges for s in judge.sections} - set(schedule.section_ids)
+    if unknown:
+        raise ValueError(f"Judges are given unknown sections: {sorted(unknown)}")
+    class_ids = sorted(class_sizes, key=schedule.sort_key)
+    sizes = np.array([class_sizes[c] for c in class_ids], dtype=np.float64)
+    durations = minutes_per_class + minutes_per_entry * sizes
+    sections = [schedule.section_of(c) for c in class_ids]
+    eligible = np.array(
+        [[judge.may_judge(section) for judge in judges] for section in sections], dtype=bool
+    ).reshape(len(class_ids), len(judges))
+    missing = [c for c, allowed in zip(class_ids, eligible.any(axis=1)) if not allowed]
+    if missing:
+        raise ValueError(f"No judge may judge classes {missing}.")
+    assignment = balance_loads(durations, eligible, max_improvements=max_improvements)
+
+    plan = JudgingPlan(judges=list(judges), slots={judge.name: [] for judge in judges})
+    clocks = np.zeros(len(judges))
+    for c, class_id in enumerate(class_ids):
+        judge = assignment[c]
+        start = clocks[judge]
+        clocks[judge] += durations[c]
+        plan.slots[judges[judge].name].append(
+            JudgingSlot(
+                class_id=class_id,
+                name=schedule.class_name(class_id),
+                entries=int(sizes[c]),
+                start=float(start),
+                finish=float(clocks[judge]),
+            )
+        )
+    return plan
@@ -0,0 +1,156 @@
+"""
+Ad-hoc questions about the show, answered by filters, group-bys and aggregations evaluated
+ over its columnar view, e.g. the contestants who entered both 25B and 25C:
+
+    where class=25B,25C; by contestant; aggregate classes; having classes=2
+
+Conditions are written column, operator, value(s), with a comma between values which are
+ alternatives. Filters are on the entries, and havings on the aggregates of each group.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Sequence
+from dataclasses import field, dataclass
+
+from greenbook.data.columns import UNPLACED, PLACE_LABELS, ShowColumns, place_codes
+from greenbook.definitions.schedule import Schedule
+
+# columns of the entries, which can be filtered and grouped by
+DIMENSIONS = ("class", "section", "contestant", "entry", "place")
+AGGREGATIONS = ("entries", "contestants", "classes", "placed", "points", "placed_rate")
+DEFAULT_AGGREGATIONS = ("entries",)
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(!=|>=|<=|=|>|<)\s*(.*?)\s*$")
+_COMPARISONS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+@dataclass
+class Condition:
+    column: str
+    op: str
+    values: List[str]
+
+    @classmethod
+    def parse(cls, condition: str) -> "Condition":
+        match = _CONDITION.match(condition)
+        if match is None:
+            raise ValueError(f"Cannot read the condition {condition!r}, e.g. class=25B,25C")
+        column, op, values = match.groups()
+        return cls(column=column, op=op, values=[v.strip() for v in values.split(",")])
+
+    def numbers(self) -> List[float]:
+        try:
+            return [float(value) for value in self.values]
+        except ValueError:
+            raise ValueError(f"{self.column} is compared with numbers, not {self.values}.")
+
+
+@dataclass
+class Query:
+    where: List[Condition] = field(default_factory=list)
+    by: List[str] = field(default_factory=list)
+    aggregations: Sequence[str] = DEFAULT_AGGREGATIONS
+    having: List[Condition] = field(default_factory=list)
+    # the columns which can be filtered and grouped by
+    dimensions: Sequence[str] = DIMENSIONS
+
+    def __post_init__(self):
+        dimensions = ", ".join(self.dimensions)
+        for condition in self.where:
+            if condition.column not in self.dimensions:
+                raise ValueError(f"Can only filter on {dimensions}.")
+        unknown = set(self.by) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Cannot group by {sorted(unknown)}, only {dimensions}.")
+        unknown = set(self.aggregations) - set(AGGREGATIONS)
+        if unknown:
+            raise ValueError(f"Unknown aggregations {sorted(unknown)}, not {AGGREGATIONS}.")
+        for condition in self.having:
+            if condition.column not in self.aggregations:
+                raise ValueError(f"Can only filter groups on the aggregations {self.aggregations}.")
+
+
+def _compare(values: np.ndarray, op: str, targets: Sequence[float]) -> np.ndarray:
+    if op == "=":
+        return np.isin(values, targets)
+    if op == "!=":
+        return ~np.isin(values, targets)
+    if len(targets) != 1:
+        raise ValueError(f"Can only compare with {op} against a single value.")
+    return _COMPARISONS[op](values, targets[0])
+
+
+def _codes(labels: Sequence[str], lookup: Dict[str, int]) -> List[int]:
+    # labels which do not occur in the show match nothing
+    return [lookup.get(label, -1) for label in labels]
+
+
+def run_query(columns: ShowColumns, schedule: Schedule, query: Query) -> pd.DataFrame:
+    """
+    The aggregates of each group of the entries which pass the filters, with a column per
+     group-by and per aggregation, or a single row if the query has no group-bys.
+    """
+    frame = pd.DataFrame(
+        {
+            "class": columns.class_codes,
+            "section": schedule.class_sections[columns.class_codes],
+            "contestant": columns.contestants,
+            "entry": columns.entries,
+            "place": columns.places,
+            "points": columns.points,
+        }
+    )
+    lookups = {
+        "class": schedule.codes,
+        "section": {section: code for code, section in enumerate(schedule.section_ids)},
+        "contestant": {name: code for code, name in enumerate(columns.names)},
+    }
+    mask = np.ones(len(frame), dtype=bool)
+    for condition in query.where:
+        if condition.column == "entry":
+            targets = condition.numbers()
+        elif condition.column == "place":
+            targets = place_codes(condition.values)
+        else:
+            targets = _codes(condition.values, lookups[condition.column])
+        mask &= _compare(frame[condition.column].to_numpy(), condition.op, targets)
+    frame = frame[mask].assign(placed=lambda f: f["place"] != UNPLACED)
+
+    keys = list(query.by) or np.zeros(len(frame), dtype=np.int8)
+    groups = frame.groupby(keys, sort=True)
+    aggregates = {
+        "entries": lambda: groups.size(),
+        "contestants": lambda: groups["contestant"].nunique(),
+        "classes": lambda: groups["class"].nunique(),
+        "placed": lambda: groups["placed"].sum(),
+        "points": lambda: groups["points"].sum(),
+        "placed_rate": lambda: (groups["placed"].sum() / groups.size()).round(3),
+    }
+    result = pd.DataFrame(
+        {aggregation: aggregates[aggregation]() for aggregation in query.aggregations}
+    )
+    if not query.by and result.empty:
+        # a total over no entries
+        result = pd.DataFrame({aggregation: [0] for aggregation in query.aggregations})
+    for condition in query.having:
+        values = result[condition.column].to_numpy()
+        result = result[_compare(values, condition.op, condition.numbers())]
+
+    result = result.reset_index(drop=not query.by)
+    labels: Dict[str, Tuple[str, ...]] = {
+        "class": schedule.class_ids,
+        "section": schedule.section_ids,
+        "contestant": columns.names,
+        "place": PLACE_LABELS,
+    }
+    for column in query.by:
+        if column in labels:
+            result[column] = np.asarray(labels[column], dtype=object)[result[column].to_numpy()]
+    return result
@@ -1,13 +1,28 @@
+import io
 import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List
+from typing import Set, List, Tuple, Callable, Optional, Sequence
 from pathlib import Path
+from collections import Counter
 from ruamel.yaml import YAML
 
+from greenbook.data.search import DUPLICATE_MIN_SCORE, NameIndex
 from greenbook.definitions import MAX_ENTRIES_PER_CLASS
-from greenbook.data.entries import Contestant, ContestantData, AllocatedContestant
-from greenbook.definitions.classes import CLASS_IDS
+from greenbook.data.entries import Contestant, DeletedContestant, RegisteredEntries
+from greenbook.data.storage import (
+    locked,
+    atomic_write,
+    group_commit,
+    read_version,
+    write_version,
+    append_durably,
+    read_versioned,
+)
+from greenbook.secretary.fees import ledger_balances
+from greenbook.telemetry.spans import span
+from greenbook.telemetry.metrics import REGISTRY
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE, Schedule
 
 yaml = YAML()
 
@@ -16,35 +31,153 @@ _LOG = logging.getLogger(__name__)
 
 LEDGER_NAME_COL = "contestant"
 PAID_COL = "paid"
-LEDGER_COLS = tuple([LEDGER_NAME_COL, PAID_COL, *CLASS_IDS])
+# marks a tombstone row, which deletes the earlier rows of the contestant of the same name
+DELETED_COL = "deleted"
+META_COLS = (LEDGER_NAME_COL, PAID_COL, DELETED_COL)
 
 
-def get_contestant_entries(ledger: pd.DataFrame) -> Dict[str, ContestantData]:
-    entry_num_ledger = ledger.drop(LEDGER_NAME_COL, axis=1).cumsum(axis=0)
-    entry_num_ledger = pd.concat([ledger[[LEDGER_NAME_COL]], entry_num_ledger], axis=1)
-    grouped_entries: Dict[str, ContestantData] = {}
-    for name, df in entry_num_ledger.groupby(LEDGER_NAME_COL):
-        paid = float(df[PAID_COL].values[-1])
-        entries_df = (
-            df.drop([LEDGER_NAME_COL, PAID_COL], axis=1).dropna(axis=1, how="all").fillna(0)
+def ledger_columns(schedule: Schedule) -> Tuple[str, ...]:
+    return tuple([*META_COLS, *schedule.class_ids])
+
+
+def deleted_name(name: str, generation: int = 1) -> str:
+    if generation == 1:
+        return f"DELETED ({name})"
+    return f"DELETED ({name}, {generation})"
+
+
+_LEDGER_LOAD_SECONDS = REGISTRY.histogram(
+    "greenbook_ledger_load_seconds", "Time to load and validate the registration ledger."
+)
+_LEDGER_SAVE_SECONDS = REGISTRY.histogram(
+    "greenbook_ledger_save_seconds", "Time to save the registration ledger."
+)
+_REGISTRATIONS = REGISTRY.counter("greenbook_registrations_total", "Contestants registered.")
+_REGISTERED_ENTRIES = REGISTRY.counter("greenbook_registered_entries_total", "Entries registered.")
+_DELETIONS = REGISTRY.counter("greenbook_deletions_total", "Contestants deleted.")
+
+
+def tombstones(ledger: pd.DataFrame) -> np.ndarray:
+    return ledger[DELETED_COL].fillna(0).to_numpy() > 0
+
+
+def row_owners(ledger: pd.DataFrame) -> np.ndarray:
+    """
+    The name each row of the ledger is registered under: the contestant's own name, or
+     their deleted name if a later tombstone deleted it. Tombstones themselves have None.
+
+    Deleting a contestant and registering them again gives them only their later entries,
+     and if they are deleted again those entries go to their second deleted name.
+    """
+    names = ledger[LEDGER_NAME_COL].astype(str).to_numpy()
+    is_tombstone = tombstones(ledger)
+    n_rows = len(ledger)
+    if not is_tombstone.any():
+        return names.astype(object)
+    tombstone_positions = np.where(is_tombstone, np.arange(n_rows), n_rows)
+    # the position of the first tombstone after each row for the same name, if any
+    next_tombstone = (
+        pd.Series(tombstone_positions[::-1]).groupby(names[::-1]).cummin().to_numpy()[::-1]
+    )
+    # the generation of each tombstone, i.e. how many times the name has been deleted
+    generation = pd.Series(is_tombstone).groupby(names).cumsum().to_numpy()
+    owners = names.astype(object)
+    for row in np.flatnonzero(next_tombstone < n_rows):
+        tombstone = next_tombstone[row]
+        owners[row] = None if tombstone == row else deleted_name(names[row], generation[tombstone])
+    return owners
+
+
+def registered_entries(ledger: pd.DataFrame) -> RegisteredEntries:
+    """
+    Every entry in the ledger, numbered in the order they were registered in each class,
+     with its contestant, in a single pass over the ledger.
+
+    Deleted entries keep their numbers, so that deleting a contestant does not change the
+     numbers of anyone else's entries.
+    """
+    with span("registrar.group_entries", rows=len(ledger)) as counts:
+        owners = row_owners(ledger)
+        is_row = pd.notna(owners)
+        names = ledger[LEDGER_NAME_COL].astype(str).to_numpy()
+        deleted_owners = set(owners[is_row & (owners != names)])
+        class_cols = [c for c in ledger.columns if c not in META_COLS]
+        counts_per_class = ledger[class_cols].to_numpy(dtype=np.float64)
+        # the cells of the ledger holding entries, by class and then by row
+        cols, rows = np.nonzero(counts_per_class.T > 0)
+        counted = np.cumsum(counts_per_class[rows, cols])
+        class_starts = np.flatnonzero(np.diff(cols, prepend=-1))
+        # the running count of entries in the class, restarted at each class
+        numbers = counted - np.repeat(
+            (counted - counts_per_class[rows, cols])[class_starts],
+            np.diff([*class_starts, len(cols)]),
         )
-        entries_df = entries_df.loc[:, (entries_df > 0).values.any(axis=0)]
-        grouped_entries[str(name)] = ContestantData(entries_df=entries_df.astype(int), paid=paid)
-    return grouped_entries
-
-
-def validate_ledger(ledger: pd.DataFrame):
-    if (ledger[PAID_COL] < 0).any():
-        ValueError("Can't accept negative payments.")
-    contestant_entries = get_contestant_entries(ledger)
-    for contestant, entries in contestant_entries.items():
-        n_entries_per_class = (entries.entries_df > 0).sum(axis=0)
-        non_zero_entries = n_entries_per_class[n_entries_per_class > 0]
-        if (non_zero_entries > MAX_ENTRIES_PER_CLASS).any():
-            raise ValueError(
-                f"{contestant=} has more than {MAX_ENTRIES_PER_CLASS} entries in some classes. "
-                f"Entries: {non_zero_entries}."
+
+        contestant_names, row_codes = np.unique(owners[is_row].astype(str), return_inverse=True)
+        owner_codes = np.full(len(ledger), -1, dtype=np.int64)
+        owner_codes[is_row] = row_codes
+        entry_owners = owner_codes[rows]
+        _check_entries_per_class(entry_owners, cols, contestant_names, class_cols)
+        paid = np.bincount(
+            row_codes,
+            weights=ledger[PAID_COL].fillna(0).to_numpy(dtype=np.float64)[is_row],
+            minlength=len(contestant_names),
+        )
+        # each contestant's classes, in the order of the ledger's columns
+        by_owner = np.argsort(entry_owners, kind="stable")
+        owner_starts = np.searchsorted(entry_owners[by_owner], np.arange(len(contestant_names)))
+        owner_classes = np.split(cols[by_owner], owner_starts[1:])
+        contestants = tuple(
+            (DeletedContestant if name in deleted_owners else Contestant)(
+                name=str(name),
+                classes=[class_cols[c] for c in classes],
+                paid=float(paid[code]),
             )
+            for code, (name, classes) in enumerate(zip(contestant_names, owner_classes))
+        )
+        counts["entries"] = len(cols)
+    return RegisteredEntries(
+        class_ids=tuple(class_cols),
+        contestants=contestants,
+        class_codes=cols.astype(np.int32),
+        numbers=numbers.astype(np.int32),
+        owners=entry_owners.astype(np.int32),
+    )
+
+
+def live_rows(ledger: pd.DataFrame) -> np.ndarray:
+    """
+    Which rows of the ledger are entries of contestants who have not been deleted.
+    """
+    owners = row_owners(ledger)
+    return owners == ledger[LEDGER_NAME_COL].astype(str).to_numpy()
+
+
+def _check_entries_per_class(
+    owners: np.ndarray, cols: np.ndarray, names: np.ndarray, class_cols: Sequence[str]
+):
+    n_entries = np.bincount(
+        owners * len(class_cols) + cols, minlength=len(names) * len(class_cols)
+    ).reshape(len(names), len(class_cols))
+    for owner in np.flatnonzero((n_entries > MAX_ENTRIES_PER_CLASS).any(axis=1)):
+        contestant = str(names[owner])
+        classes = {
+            class_cols[c]: int(n_entries[owner, c]) for c in np.flatnonzero(n_entries[owner])
+        }
+        raise ValueError(
+            f"{contestant=} has more than {MAX_ENTRIES_PER_CLASS} entries in some "
+            f"classes. Entries: {classes}."
+        )
+
+
+def validate_ledger(ledger: pd.DataFrame) -> RegisteredEntries:
+    """
+    Check the entries of every contestant, returning every entry in the ledger.
+    """
+    with span("registrar.validate_ledger", rows=len(ledger)):
+        if (ledger[PAID_COL] < 0).any():
+            raise ValueError("Can't accept negative payments.")
+        return registered_entries(ledger)
 
 
 class Registrar:
@@ -52,21 +185,178 @@ class Registrar:
     Manage the registration of contestants and their entries.
     """
 
-    def __init__(self, ledger_loc: Path):
-        self._ledger = pd.DataFrame(columns=LEDGER_COLS)
+    def __init__(
+        self, ledger_loc: Path, autosave: bool = True, schedule: Schedule = DEFAULT_SCHEDULE
+    ):
+        """
+        With autosave off, registrations are only written to the ledger by an explicit
+         call to save, so that many registrations can share one write.
+
+        Registrations are kept until they are saved, so that if another process saves the
+         ledger in the meantime, they can be added to its version rather than lost.
+        """
+        self._schedule = schedule
         self._ledger_loc = ledger_loc
+        self._autosave = autosave
+        self._dirty = False
+        self._mutations: List[Callable[[], None]] = []
+        self._load()
+
+    def _load(self):
+        self._ledger = pd.DataFrame(columns=ledger_columns(self._schedule))
+        self._version = 0
+        # the size of the file when loaded or last saved, and how many rows of the ledger
+        # and which columns it holds, so that saving need only append the new rows
+        self._size = 0
+        self._saved_rows = 0
+        self._saved_columns: Tuple[str, ...] = ()
+        self._name_index: Optional[NameIndex] = None
+        # every entry in the ledger, grouped once for as long as the ledger is unchanged
+        self._entries: Optional[RegisteredEntries] = None
         if self._ledger_loc.exists():
-            self._ledger = pd.read_csv(self._ledger_loc, index_col=0)
-            _LOG.info(f"loaded {len(self._ledger)} rows from {self._ledger_loc}")
-            validate_ledger(self._ledger)
+            with _LEDGER_LOAD_SECONDS.time():
+                with span("registrar.load_ledger") as counts:
+                    version, text, size = read_versioned(self._ledger_loc)
+                    complete = text.endswith("\n")
+                    if not complete:
+                        _LOG.warning(
+                            f"Ignoring the incomplete last row of {self._ledger_loc}, "
+                            "left by an interrupted save."
+                        )
+                        head, newline, _ = text.rpartition("\n")
+                        text = head + newline
+                    ledger = pd.read_csv(io.StringIO(text), index_col=0)
+                    if DELETED_COL not in ledger.columns:
+                        # ledgers from before deletions were recorded
+                        ledger.insert(META_COLS.index(DELETED_COL), DELETED_COL, np.nan)
+                        complete = False
+                    self._ledger = ledger
+                    self._version = version
+                    self._size = size
+                    # an incomplete or old file is rewritten in full by the next save
+                    if complete:
+                        self._saved_rows = len(ledger)
+                        self._saved_columns = tuple(ledger.columns)
+                    counts["rows"] = len(self._ledger)
+                _LOG.info(f"loaded {len(self._ledger)} rows from {self._ledger_loc}")
+                self._entries = validate_ledger(self._ledger)
 
     def register(self, contestant: Contestant):
-        entry_data = np.full((len(contestant.classes), len(CLASS_IDS)), fill_value=np.nan)
-        for idx, _class in enumerate(contestant.classes):
-            entry_data[idx, CLASS_IDS.index(_class)] = 1
+        self.register_many([contestant])
+
+    def register_many(self, contestants: Sequence[Contestant]):
+        """
+        Register several contestants with a single write to the ledger.
+
+        Only the new entries are checked, with the existing entries of any contestant who
+         is already registered, so registering costs the same however long the ledger is.
+        """
+        with span("registrar.check_duplicates", contestants=len(contestants)):
+            for contestant in contestants:
+                self._warn_if_duplicate(contestant.name)
+        with span("registrar.build_rows", contestants=len(contestants)):
+            rows = [self._ledger_rows(contestant) for contestant in contestants]
+
+        def _append():
+            self._check_new_entries(contestants)
+            self._ledger = pd.concat([self._ledger, *rows], axis=0)
+            self._entries = None
+            if self._name_index is not None:
+                for contestant in contestants:
+                    self._name_index.add(contestant.name)
+
+        _append()
+        self._mutations.append(_append)
+        _REGISTRATIONS.inc(len(contestants))
+        _REGISTERED_ENTRIES.inc(sum(len(contestant.classes) for contestant in contestants))
+        self._save()
+
+    def delete_contestant(self, name: str):
+        """
+        Delete a contestant by appending a tombstone to the ledger, rather than rewriting it.
+
+        Their entries keep their numbers, under their deleted name, until the ledger is
+         compacted, so that the numbers of everyone else's entries do not change.
+        """
+        tombstone = pd.DataFrame(
+            {LEDGER_NAME_COL: [name], PAID_COL: [np.nan], DELETED_COL: [1.0]},
+            columns=ledger_columns(self._schedule),
+        )
+
+        def _delete():
+            if name not in self.name_index():
+                raise ValueError(f"{name} is not registered, so cannot be deleted.")
+            self._ledger = pd.concat([self._ledger, tombstone], axis=0)
+            self._entries = None
+            self._name_index.remove(name)
+
+        _delete()
+        self._mutations.append(_delete)
+        _DELETIONS.inc()
+        self._save()
+
+    def amend(self, contestant: Contestant):
+        """
+        Replace the entries and payment of a registered contestant, with a single write.
+        """
+        with group_commit(self):
+            self.delete_contestant(contestant.name)
+            self.register(contestant)
+
+    def compact(self) -> int:
+        """
+        Rewrite the ledger without deleted contestants and their tombstones, returning the
+         number of rows dropped.
+
+        This renumbers the entries registered after theirs, so should be done before the
+         entries are allocated.
+        """
+        with locked(self._ledger_loc):
+            self._refresh()
+            live = live_rows(self._ledger)
+            dropped = int((~live).sum())
+            self._ledger = self._ledger[live]
+            self._entries = None
+            with span("registrar.compact_ledger", rows=len(self._ledger), dropped=dropped):
+                self._rewrite(read_version(self._ledger_loc) + 1)
+        self._mutations.clear()
+        self._dirty = False
+        self._name_index = None
+        if dropped:
+            _LOG.warning(
+                f"Dropped {dropped} deleted rows from {self._ledger_loc}; entry numbers have "
+                "changed, so the entries must be allocated again."
+            )
+        return dropped
+
+    def _check_new_entries(self, contestants: Sequence[Contestant]):
+        with span("registrar.check_entries", contestants=len(contestants)):
+            classes = {}
+            for contestant in contestants:
+                classes.setdefault(contestant.name, []).extend(contestant.classes)
+            if any(name in self.name_index() for name in classes):
+                # entries added to a registered contestant count with their existing ones
+                for registered in self.entries().contestants:
+                    if registered.name in classes:
+                        classes[registered.name].extend(registered.classes)
+            for contestant, entered in classes.items():
+                n_entries = Counter(entered)
+                if max(n_entries.values(), default=0) > MAX_ENTRIES_PER_CLASS:
+                    raise ValueError(
+                        f"{contestant=} has more than {MAX_ENTRIES_PER_CLASS} entries in some "
+                        f"classes. Entries: {dict(n_entries)}."
+                    )
+
+    def _ledger_rows(self, contestant: Contestant) -> pd.DataFrame:
+        for class_id in contestant.classes:
+            if class_id not in self._schedule:
+                raise ValueError(f"Unknown class {class_id}")
+        codes = self._schedule.encode(contestant.classes)
+        entry_data = np.full((len(codes), len(self._schedule)), fill_value=np.nan)
+        entry_data[np.arange(len(codes)), codes] = 1
         entries = pd.DataFrame(
             data=entry_data,
-            columns=CLASS_IDS,
+            columns=self._schedule.class_ids,
         )
         paid_col = [0.0] * (len(entries) - 1)
         paid_col.append(contestant.paid)
@@ -74,34 +364,124 @@ class Registrar:
             {
                 LEDGER_NAME_COL: [contestant.name] * len(entries),
                 PAID_COL: paid_col,
+                DELETED_COL: np.nan,
             }
         )
         contestant_df = pd.concat([entries_meta, entries], axis=1)
-        assert tuple(contestant_df.columns) == LEDGER_COLS
-        new_ledger = pd.concat([self._ledger, contestant_df], axis=0)
-        validate_ledger(new_ledger)
-        self._ledger = new_ledger
-        self._ledger.to_csv(self._ledger_loc)
-
-    def contestants(self) -> List[AllocatedContestant]:
-        contestants = []
-        for name, data in get_contestant_entries(self._ledger).items():
-            classes = []
-            for col in data.entries_df.columns:
-                n_entries = (data.entries_df[col] > 0).values.sum()
-                classes.extend([col] * n_entries)
-            contestant = Contestant(
-                name=name,
-                classes=classes,
-                paid=data.paid,
+        assert tuple(contestant_df.columns) == ledger_columns(self._schedule)
+        return contestant_df
+
+    def _save(self):
+        if self._autosave:
+            self.save()
+        else:
+            self._dirty = True
+
+    def save(self):
+        """
+        Append the rows added since the ledger was loaded or last saved, or rewrite it if
+         it cannot simply be appended to.
+        """
+        with locked(self._ledger_loc):
+            self._refresh()
+            new_rows = self._ledger.tail(len(self._ledger) - self._saved_rows)
+            with (
+                span("registrar.save_ledger", rows=len(new_rows)),
+                _LEDGER_SAVE_SECONDS.time(),
+            ):
+                if (
+                    self._saved_rows == 0
+                    or self._saved_columns != tuple(self._ledger.columns)
+                    or not self._ledger_loc.exists()
+                ):
+                    self._rewrite(read_version(self._ledger_loc) + 1)
+                else:
+                    self._size = append_durably(self._ledger_loc, new_rows.to_csv(header=False))
+                    self._saved_rows = len(self._ledger)
+        self._mutations.clear()
+        self._dirty = False
+
+    def _refresh(self):
+        """
+        Reload the ledger, re-applying the unsaved changes to it, if another process has
+         saved it since it was loaded.
+        """
+        on_disk = (0, 0)
+        if self._ledger_loc.exists():
+            on_disk = (read_version(self._ledger_loc), self._ledger_loc.stat().st_size)
+        if on_disk != (self._version, self._size):
+            _LOG.warning(
+                f"{self._ledger_loc} was saved by another process, adding "
+                f"{len(self._mutations)} changes to its version."
             )
-            contestants.append(
-                AllocatedContestant(
-                    contestant=contestant,
-                    entries_df=data.entries_df,
-                )
+            self._load()
+            for mutation in self._mutations:
+                mutation()
+
+    def _rewrite(self, version: int):
+        with atomic_write(self._ledger_loc) as f:
+            write_version(f, version)
+            self._ledger.to_csv(f)
+        self._version = version
+        self._size = self._ledger_loc.stat().st_size
+        self._saved_rows = len(self._ledger)
+        self._saved_columns = tuple(self._ledger.columns)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def autosave(self) -> bool:
+        return self._autosave
+
+    @autosave.setter
+    def autosave(self, autosave: bool):
+        self._autosave = autosave
+
+    def registered_names(self) -> Set[str]:
+        """
+        The names of the contestants who are registered and have not been deleted.
+        """
+        names = self._ledger[LEDGER_NAME_COL][live_rows(self._ledger)]
+        return {str(name) for name in names}
+
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex(self.registered_names())
+        return self._name_index
+
+    def similar_names(self, name: str, limit: int = 10) -> List[Tuple[str, float]]:
+        return self.name_index().search(name, limit=limit)
+
+    def _warn_if_duplicate(self, name: str):
+        if name in self.name_index():
+            _LOG.warning(f"{name} is already registered; these entries will be added to theirs.")
+            return
+        similar = [
+            other
+            for other, _ in self.name_index().search(name, limit=3, min_score=DUPLICATE_MIN_SCORE)
+        ]
+        if similar:
+            _LOG.warning(f"{name} may be a duplicate of already registered {', '.join(similar)}.")
+
+    def balances(self) -> pd.DataFrame:
+        with span("registrar.balances", rows=len(self._ledger)):
+            return ledger_balances(
+                self._schedule,
+                self._ledger[live_rows(self._ledger)],
+                name_col=LEDGER_NAME_COL,
+                paid_col=PAID_COL,
             )
-        return contestants
+
+    def entries(self) -> RegisteredEntries:
+        """
+        Every registered entry, with its number in its class and its contestant, ready to
+         be allocated.
+        """
+        if self._entries is None:
+            self._entries = registered_entries(self._ledger)
+        return self._entries
 
     # def to_csv(self, location: Path):
     #     """
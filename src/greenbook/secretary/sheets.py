@@ -0,0 +1,59 @@
+"""
+The class sheet of the allocated show: a row per entry number and a column per class,
+ giving the name of the contestant with that entry number in the class.
+
+The sheet is built with one pivot of flat arrays of every entry, rather than cell by cell.
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from typing import IO, Union, Optional, Sequence
+from pathlib import Path
+
+from greenbook.data.show import Show
+
+ENTRY_COL = "entry"
+SHEET_FORMATS = ("csv", "jsonl", "parquet")
+
+
+def class_sheet(show: Optional[Show], class_ids: Sequence[str]) -> pd.DataFrame:
+    """
+    The class sheet, with a column for each of the class ids in order, whether or not the
+     class has any entries.
+    """
+    classes = [] if show is None else show.classes()
+    lengths = np.array([len(show_class.contestants) for show_class in classes], dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    entries = pd.DataFrame(
+        {
+            ENTRY_COL: np.arange(lengths.sum()) - np.repeat(starts, lengths) + 1,
+            "class": np.repeat([show_class.class_id for show_class in classes], lengths),
+            "name": [
+                contestant.name for show_class in classes for contestant in show_class.contestants
+            ],
+        }
+    )
+    sheet = entries.pivot(index=ENTRY_COL, columns="class", values="name")
+    sheet = sheet.reindex(index=np.arange(1, lengths.max(initial=0) + 1), columns=list(class_ids))
+    sheet.index.name = None
+    sheet.columns.name = None
+    return sheet
+
+
+def write_sheet(sheet: pd.DataFrame, output: Union[Path, IO, None] = None, format: str = "csv"):
+    """
+    Write the class sheet to a file, or to stdout if output is None. JSON Lines has an
+     object per entry number, and parquet (which needs pyarrow) a column per class.
+    """
+    if format not in SHEET_FORMATS:
+        raise ValueError(f"Unknown class sheet format {format}, expected one of {SHEET_FORMATS}.")
+    if output is None:
+        output = sys.stdout.buffer if format == "parquet" else sys.stdout
+    if format == "csv":
+        sheet.to_csv(output)
+    elif format == "jsonl":
+        records = sheet.rename_axis(ENTRY_COL).reset_index()
+        records.to_json(output, orient="records", lines=True)
+    else:
+        sheet.rename_axis(ENTRY_COL).to_parquet(output)
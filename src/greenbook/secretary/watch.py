@@ -0,0 +1,172 @@
+"""
+Keeping the results board, or the final report, up to date while the show is judged.
+
+The watcher follows the history journal rather than loading the show: polling costs a
+ stat of the journal and its checkpoints, and each change saved since the last poll is
+ read from the end of the journal and replayed on the watcher's copy of the show. Only
+ the classes it changed are rendered again, along with the prizes and the ranking. An
+ allocation replaces the whole show, so the show is then rebuilt from its checkpoint.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Tuple, Union, Optional
+from pathlib import Path
+from datetime import datetime
+
+from greenbook.data.show import Show
+from greenbook.render.board import write_board, render_board, render_class_html
+from greenbook.render.results import (
+    render_prizes,
+    render_ranking,
+    render_class_page,
+    render_class_results,
+)
+from greenbook.telemetry.spans import span
+from greenbook.secretary.history import ALLOCATE, History, JournalEntry
+from greenbook.telemetry.metrics import REGISTRY
+from greenbook.definitions.prizes import class_points, prize_results, rank_by_points
+from greenbook.definitions.schedule import Schedule
+
+_LOG = logging.getLogger(__name__)
+
+BOARD_FORMATS = ("html", "pdf")
+DEFAULT_POLL_INTERVAL = 0.5
+
+_BOARD_UPDATES = REGISTRY.counter(
+    "greenbook_board_updates_total", "Updates of the results board after the show changed."
+)
+
+
+class ResultsWatcher:
+    def __init__(self, history: History, schedule: Schedule, directory: Path, format: str = "html"):
+        """
+        As html, the board is a page which reloads itself each second. As pdf, it is the
+         final report, for a viewer which reloads files when they change.
+        """
+        if format not in BOARD_FORMATS:
+            raise ValueError(f"The board is one of {', '.join(BOARD_FORMATS)}, not {format}.")
+        self._history = history
+        self._schedule = schedule
+        self._directory = directory
+        self._format = format
+        self._show: Optional[Show] = None
+        # how far through the journal the show has been brought
+        self._offset = 0
+        # the sizes of the journal and checkpoints when last polled
+        self._seen: Optional[Tuple[int, int]] = None
+        # the rendered results of each class, in the order they were last changed
+        self._pages: Dict[str, Union[str, bytes]] = {}
+
+    @property
+    def show(self) -> Optional[Show]:
+        return self._show
+
+    def _sizes(self) -> Tuple[int, int]:
+        sizes = []
+        for location in (self._history.journal_loc, self._history.checkpoints_loc):
+            try:
+                sizes.append(location.stat().st_size)
+            except FileNotFoundError:
+                sizes.append(0)
+        return sizes[0], sizes[1]
+
+    def poll(self) -> List[str]:
+        """
+        Bring the board up to date with the changes saved since the last poll, if any, and
+         return the classes which were rendered again.
+        """
+        sizes = self._sizes()
+        if sizes == self._seen:
+            return []
+        self._seen = sizes
+        if sizes[0] < self._offset:
+            _LOG.info(f"{self._history.journal_loc} was replaced, so reading it again.")
+            self._show, self._offset = None, 0
+        entries = self._history.entries(since=self._offset)
+        if not entries and self._show is not None:
+            return []
+        if self._show is None or any(entry.change.action == ALLOCATE for entry in entries):
+            changed = self._rebuild()
+        else:
+            changed = self._replay(entries)
+        if changed is None:
+            return []
+        self._render(changed)
+        return changed
+
+    def _rebuild(self) -> Optional[List[str]]:
+        entries = self._history.entries()
+        try:
+            show = self._history.rebuild(entries)
+        except ValueError as e:
+            # the checkpoint of an allocation is written just after its change
+            _LOG.info(f"Waiting for the show to be checkpointed: {e}")
+            return None
+        self._show = show
+        self._offset = entries[-1].end if entries else 0
+        self._pages = {}
+        if show is None:
+            return []
+        # the latest judged classes are shown first, so they are rendered in that order
+        judged: Dict[str, None] = {}
+        for entry in entries:
+            if entry.change.action == ALLOCATE:
+                judged = {}
+            for class_id in entry.change.class_ids():
+                judged.pop(class_id, None)
+                judged[class_id] = None
+        if self._format == "pdf":
+            return [show_class.class_id for show_class in show.classes()]
+        return list(judged)
+
+    def _replay(self, entries: List[JournalEntry]) -> List[str]:
+        changed: Dict[str, None] = {}
+        for entry in entries:
+            self._show = entry.change.apply(self._show)
+            for class_id in entry.change.class_ids():
+                changed.pop(class_id, None)
+                changed[class_id] = None
+        self._offset = entries[-1].end
+        return list(changed)
+
+    def _render(self, changed: List[str]):
+        with span(f"watch.render_{self._format}", classes=len(changed)):
+            for class_id in changed:
+                show_class = self._show.class_lookup(class_id)
+                self._pages.pop(class_id, None)
+                if self._format == "html":
+                    self._pages[class_id] = render_class_html(show_class)
+                else:
+                    self._pages[class_id] = render_class_page(
+                        show_class.class_id, show_class.name, show_class.to_df()
+                    )
+            prizes, ranking = [], []
+            if self._show is not None:
+                points = class_points(self._show)
+                prizes = prize_results(self._show, self._schedule, points)
+                ranking = rank_by_points(points)
+            if self._format == "html":
+                board = render_board(
+                    class_results=list(reversed(self._pages.values())),
+                    prize_results=prizes,
+                    ranking=ranking,
+                    updated=datetime.now(),
+                )
+                write_board(board, self._directory)
+            else:
+                class_ids = sorted(self._pages, key=self._schedule.sort_key)
+                render_class_results([self._pages[c] for c in class_ids], self._directory)
+                render_prizes(prizes, self._directory)
+                render_ranking(ranking, self._directory)
+        _BOARD_UPDATES.inc()
+        _LOG.info(f"Updated the results in {self._directory} for classes {changed}")
+
+    def run(self, interval: float = DEFAULT_POLL_INTERVAL, stop: Optional[threading.Event] = None):
+        """
+        Poll every interval seconds until stopped.
+        """
+        stop = stop or threading.Event()
+        self.poll()
+        while not stop.wait(interval):
+            self.poll()
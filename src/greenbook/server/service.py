@@ -0,0 +1,303 @@
+"""
+A small HTTP/JSON service which lets several stewards record results against one show.
+
+The registrar and manager are held in memory and only ever changed from the event loop,
+ so requests never interleave. Persistence is left to a single writer task, which waits
+ for a short interval after the first change so that a burst of changes shares one write,
+ then saves in a thread so that requests are still answered meanwhile. Changes wait for
+ the save to finish, and a save which fails is retried with the next.
+"""
+
+import json
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import Any, Dict, Tuple, Callable, Optional
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+from greenbook.data.entries import Contestant
+from greenbook.data.storage import commit
+from greenbook.secretary.judging import (
+    ClassJudgment,
+    EntryReference,
+    parse_entry_reference,
+)
+from greenbook.secretary.manager import Manager
+from greenbook.telemetry.metrics import REGISTRY, save_metrics
+from greenbook.secretary.registration import Registrar
+
+_LOG = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_FLUSH_INTERVAL = 0.5
+MAX_BODY_BYTES = 1024 * 1024
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+Response = Tuple[HTTPStatus, Any]
+
+
+class RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _entry_reference(value) -> EntryReference:
+    if isinstance(value, int):
+        return value
+    return parse_entry_reference(str(value))
+
+
+async def _read_line(reader: asyncio.StreamReader, status: HTTPStatus, what: str) -> str:
+    try:
+        line = await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # the line is longer than the reader's limit
+        raise RequestError(status, f"{what} is too long.")
+    return line.decode("latin-1").strip()
+
+
+class ShowServer:
+    def __init__(
+        self,
+        registrar: Registrar,
+        manager: Manager,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        metrics_loc: Optional[Path] = None,
+    ):
+        """
+        If a metrics location is given, metrics are added to it with every write, and
+         reported from it (plus any recorded since) at /metrics.
+        """
+        self._registrar = registrar
+        self._manager = manager
+        self._host = host
+        self._port = port
+        self._flush_interval = flush_interval
+        self._metrics_loc = metrics_loc
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Event] = None
+        # held by the writer while saving, and by requests which change the show
+        self._saving: Optional[asyncio.Lock] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._pending = 0
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, str], Any], Response]] = {
+            ("POST", "/register"): self._register,
+            ("POST", "/judge"): self._judge,
+            ("GET", "/lookup"): self._lookup,
+            ("GET", "/ranking"): self._ranking,
+            ("GET", "/prizes"): self._prizes,
+            ("GET", "/metrics"): self._metrics,
+        }
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._changed = asyncio.Event()
+        self._saving = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+        self._writer_task = asyncio.create_task(self._writer())
+        _LOG.info(f"Serving the show on http://{self._host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        if self._flushing is not None:
+            await asyncio.wait([self._flushing])
+            if self._flushing.exception() is not None:
+                _LOG.error(f"Could not save the show, so retrying: {self._flushing.exception()}")
+        self._flush(self._take_metrics())
+
+    # region persistence
+    def _mark_changed(self):
+        self._pending += 1
+        self._changed.set()
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._changed.wait()
+            # give any other stewards' changes the chance to join this write
+            await asyncio.sleep(self._flush_interval)
+            self._changed.clear()
+            async with self._saving:
+                metrics = self._take_metrics()
+                self._flushing = loop.run_in_executor(None, self._flush, metrics)
+                try:
+                    # stopping the server waits for the save rather than abandoning it
+                    await asyncio.shield(self._flushing)
+                except Exception as e:
+                    _LOG.error(f"Could not save the show, so retrying with the next write: {e}")
+                    if metrics is not None:
+                        REGISTRY.merge(metrics)
+                    self._changed.set()
+
+    def _take_metrics(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        The metrics recorded since the last write, if they are saved, taken on the event
+         loop so that none recorded while saving are lost.
+        """
+        if self._metrics_loc is None or not REGISTRY.recorded():
+            return None
+        metrics = REGISTRY.to_dict()
+        REGISTRY.reset()
+        return metrics
+
+    def _flush(self, metrics: Optional[Dict[str, Dict[str, Any]]] = None):
+        commit(self._registrar, self._manager)
+        if self._pending:
+            _LOG.info(f"Saved {self._pending} changes")
+        self._pending = 0
+        if metrics is not None:
+            save_metrics(self._metrics_loc, metrics)
+
+    # endregion
+
+    # region http
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await self._handle_request(reader)
+        except RequestError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), PROMETHEUS_CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Response:
+        request_line = await _read_line(reader, HTTPStatus.REQUEST_URI_TOO_LONG, "Request line")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Malformed request: {request_line!r}")
+        headers = {}
+        while True:
+            line = await _read_line(
+                reader, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line"
+            )
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Content-Length is not a valid length.")
+        if length > MAX_BODY_BYTES:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+        body = None
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except json.JSONDecodeError as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Body is not valid JSON: {e}")
+        url = urlsplit(target)
+        handler = self._routes.get((method.upper(), url.path))
+        if handler is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+        try:
+            if method.upper() == "GET":
+                return handler(dict(parse_qsl(url.query)), body)
+            async with self._saving:
+                return handler(dict(parse_qsl(url.query)), body)
+        except (ValueError, AssertionError, KeyError, TypeError, IndexError) as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{type(e).__name__}: {e}")
+
+    # endregion
+
+    # region handlers
+    def _require_show(self):
+        if self._manager.show is None:
+            raise RequestError(HTTPStatus.CONFLICT, "Contestants have not been allocated yet.")
+
+    def _register(self, query: Dict[str, str], body: Any) -> Response:
+        contestant = Contestant(
+            name=body["name"],
+            classes=[str(c) for c in body["entries"]],
+            paid=float(body.get("paid", 0.0)),
+        )
+        self._registrar.register(contestant)
+        self._mark_changed()
+        return HTTPStatus.CREATED, {"name": contestant.name, "entries": len(contestant.classes)}
+
+    def _judge(self, query: Dict[str, str], body: Any) -> Response:
+        self._require_show()
+        judgment = ClassJudgment(
+            class_id=str(body["class"]),
+            **{
+                place: [_entry_reference(entry) for entry in body.get(place, [])]
+                for place in ("first", "second", "third", "commendations")
+            },
+        )
+        errors = self._manager.check_judgments([judgment])
+        if errors:
+            raise RequestError(HTTPStatus.BAD_REQUEST, " ".join(errors))
+        self._manager.add_judgments([judgment], operator=body.get("operator"))
+        self._mark_changed()
+        return HTTPStatus.OK, {"class": judgment.class_id}
+
+    def _lookup(self, query: Dict[str, str], body: Any) -> Response:
+        self._require_show()
+        class_id, entry = query["class"], int(query["entry"])
+        show_class = self._manager.show.class_lookup(class_id)
+        if show_class is None or not 0 < entry <= len(show_class):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Class {class_id} has no entry {entry}.")
+        contestant = self._manager.lookup_contestant(class_id=class_id, contestant_id=entry)
+        return HTTPStatus.OK, {"class": class_id, "entry": entry, "contestant": contestant.name}
+
+    def _ranking(self, query: Dict[str, str], body: Any) -> Response:
+        self._require_show()
+        return HTTPStatus.OK, [
+            {"contestant": contestant.name, "points": points}
+            for contestant, points in self._manager.ranking()
+        ]
+
+    def _prizes(self, query: Dict[str, str], body: Any) -> Response:
+        self._require_show()
+        return HTTPStatus.OK, list(self._manager.prize_results())
+
+    def _metrics(self, query: Dict[str, str], body: Any) -> Response:
+        if self._metrics_loc is None:
+            return HTTPStatus.OK, REGISTRY.exposition()
+        return HTTPStatus.OK, REGISTRY.totals(self._metrics_loc).exposition()
+
+    # endregion
@@ -0,0 +1,199 @@
+"""
+Counters and histograms of the show's operations, exposed in the Prometheus text format.
+
+Each CLI run is a separate process, so the metrics recorded during a run are added to a
+ metrics file in the show's location when it finishes, and the metrics command (or the
+ server's /metrics endpoint) reports the running totals from there.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import bisect
+from typing import Any, Dict, Union, Iterator, Sequence
+from pathlib import Path
+from contextlib import contextmanager
+
+from greenbook.data.storage import locked, atomic_write
+
+METRICS_FILE = "metrics.json"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        assert amount >= 0, "Counters can only increase."
+        self.value += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "counter", "help": self.help, "value": self.value}
+
+    def merge(self, data: Dict[str, Any]):
+        self.value += data["value"]
+
+    def reset(self):
+        self.value = 0.0
+
+    def exposition(self) -> Sequence[str]:
+        return [f"{self.name} {_format_value(self.value)}"]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # one more count than buckets, for observations above the largest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "histogram",
+            "help": self.help,
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": self.sum,
+        }
+
+    def merge(self, data: Dict[str, Any]):
+        if tuple(data["buckets"]) != self.buckets:
+            raise ValueError(f"Cannot merge histograms {self.name} with different buckets.")
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.sum += data["sum"]
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def exposition(self) -> Sequence[str]:
+        lines = []
+        cumulative = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bucket)}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter(name, help))
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram(name, help, buckets))
+
+    def _get_or_create(self, metric: Metric) -> Metric:
+        existing = self._metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric):
+            raise ValueError(f"Metric {metric.name} is already registered as another type.")
+        return existing
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.to_dict() for name, metric in sorted(self._metrics.items())}
+
+    def merge(self, data: Dict[str, Dict[str, Any]]):
+        for name, metric_data in data.items():
+            if metric_data["type"] == "counter":
+                metric = self.counter(name, metric_data["help"])
+            else:
+                metric = self.histogram(name, metric_data["help"], metric_data["buckets"])
+            metric.merge(metric_data)
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def exposition(self) -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.to_dict()['type']}")
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+    def totals(self, location: Path) -> MetricsRegistry:
+        """
+        The metrics saved at the location plus those recorded since the last flush.
+        """
+        totals = load_metrics(location)
+        totals.merge(self.to_dict())
+        return totals
+
+    def recorded(self) -> bool:
+        """
+        Whether anything has been recorded since the last flush.
+        """
+        return any(
+            metric.value if isinstance(metric, Counter) else metric.count
+            for metric in self._metrics.values()
+        )
+
+    def flush(self, location: Path):
+        """
+        Add the metrics recorded since the last flush to those saved at the location, if
+         any were.
+        """
+        if self.recorded():
+            save_metrics(location, self.to_dict())
+        self.reset()
+
+
+def load_metrics(location: Path) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    if location.exists():
+        registry.merge(json.loads(location.read_text()))
+    return registry
+
+
+REGISTRY = MetricsRegistry()
+
+
+def save_metrics(location: Path, recorded: Dict[str, Dict[str, Any]]):
+    """
+    Add the recorded metrics to those saved at the location, holding its lock so that
+     commands run at the same time do not lose each other's.
+    """
+    with locked(location):
+        totals = load_metrics(location)
+        totals.merge(recorded)
+        with atomic_write(location) as f:
+            json.dump(totals.to_dict(), f)
@@ -0,0 +1,40 @@
+import sys
+import pstats
+import logging
+import cProfile
+from typing import Any, Callable
+from pathlib import Path
+from datetime import datetime
+
+from greenbook.telemetry.spans import span, configure_spans
+
+_LOG = logging.getLogger(__name__)
+
+SPANS_FILE = "spans.jsonl"
+N_STATS_LINES = 30
+
+
+def run_profiled(func: Callable[[], Any], directory: Path, name: str) -> Any:
+    """
+    Run func under cProfile with timing spans enabled.
+
+    The spans are appended to spans.jsonl in the directory, the full profile is dumped
+     next to them for e.g. snakeviz or pstats, and the most expensive calls by cumulative
+     time are printed to stderr.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    profile_loc = directory / f"{name}-{stamp}.prof"
+    profiler = cProfile.Profile()
+    with (directory / SPANS_FILE).open("a") as sink:
+        configure_spans(sink)
+        try:
+            with span(f"command.{name}"):
+                result = profiler.runcall(func)
+        finally:
+            configure_spans(None)
+            profiler.dump_stats(profile_loc)
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(N_STATS_LINES)
+    _LOG.info(f"Wrote profile to {profile_loc} and spans to {directory / SPANS_FILE}")
+    return result
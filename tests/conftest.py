@@ -0,0 +1,23 @@
+import pytest
+
+from typing import List
+from pathlib import Path
+
+
+@pytest.fixture
+def out_dir(tmp_path: Path) -> Path:
+    """
+    An empty directory for the test's show, removed by pytest in time.
+    """
+    return tmp_path
+
+
+@pytest.fixture
+def out_dirs(tmp_path: Path) -> List[Path]:
+    """
+    Empty directories for two shows.
+    """
+    random_dirs = [tmp_path / f"show-{i}" for i in range(2)]
+    for random_dir in random_dirs:
+        random_dir.mkdir()
+    return random_dirs
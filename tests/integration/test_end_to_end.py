@@ -1,9 +1,6 @@
-import pytest
-
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
 from collections import defaultdict
 
 from greenbook.cli.main import get_manager, get_registrar
@@ -13,23 +10,6 @@ from greenbook.definitions.classes import FLAT_CLASSES
 
 
 class TestEndToEndShow:
-    @pytest.fixture
-    def out_dir(
-        self,
-    ):
-        random_dir = Path(f".{hash(datetime.now())}")
-        random_dir.mkdir(exist_ok=True)
-        yield random_dir
-        # remove all files and dir
-        for file in random_dir.iterdir():
-            if file.is_file():
-                file.unlink()
-            else:
-                for subfile in file.iterdir():
-                    subfile.unlink()
-                file.rmdir()
-        random_dir.rmdir()
-
     def test_basic_winners(self, out_dir):
         contestants = [
             Contestant(name="Alice Appleby", classes=tuple(["1", "2", "3", "7"]), paid=0.0),
@@ -77,7 +57,7 @@ class TestEndToEndShow:
             registrar.register(contestant)
 
         manager = get_manager(out_dir)
-        manager.allocate(registrar.contestants())
+        manager.allocate(registrar.entries())
 
         def _lookup_contestant_id(_contestant, class_id, entry_ord):
             return contestant_lookup[(_contestant.name, class_id, entry_ord)]
@@ -268,7 +248,7 @@ class TestEndToEndShow:
             registrar.register(contestant)
 
         manager = get_manager(out_dir)
-        manager.allocate(registrar.contestants())
+        manager.allocate(registrar.entries())
         contestant_entries = manager.contestant_entries()
 
         class_entries = defaultdict(list)
@@ -295,14 +275,14 @@ class TestEndToEndShow:
         for contestant in contestants:
             registrar_rolling.register(contestant)
             manager = get_manager(out_dir_rolling)
-            manager.allocate(registrar_rolling.contestants())
+            manager.allocate(registrar_rolling.entries())
         contestant_entries_rolling = manager.contestant_entries()
 
         registrar_single = get_registrar(out_dir_single)
         for contestant in contestants:
             registrar_single.register(contestant)
         manager = get_manager(out_dir_single)
-        manager.allocate(registrar_single.contestants())
+        manager.allocate(registrar_single.entries())
         contestant_entries_single = manager.contestant_entries()
         assert contestant_entries_rolling == contestant_entries_single
 
@@ -318,7 +298,7 @@ class TestEndToEndShow:
             registrar.register(contestant)
 
         manager = get_manager(out_dir)
-        manager.allocate(registrar.contestants())
+        manager.allocate(registrar.entries())
         csv_loc = out_dir / "contestants.csv"
         manager.to_csv(csv_loc)
         df = pd.read_csv(csv_loc, index_col=0)
@@ -341,7 +321,6 @@ class TestEndToEndShow:
             for idx, col in locs:
                 assert df.loc[idx, col] == name
 
-    @pytest.mark.skip(reason="deprecate")
     def test_registration_with_deletes(self, out_dir):
         """
         Check that the contestant IDs are not changes by deletion of other contestants.
@@ -358,17 +337,17 @@ class TestEndToEndShow:
         for contestant in contestants:
             registrar_del.register(contestant)
         manager = get_manager(out_dir_del)
-        manager.allocate(registrar_del.contestants())
+        manager.allocate(registrar_del.entries())
         delete = "Bob Beetroot"
         registrar_del.delete_contestant(delete)
-        manager.allocate(registrar_del.contestants())
+        manager.allocate(registrar_del.entries())
         contestant_entries_del = manager.contestant_entries()
 
         registrar_single = get_registrar(out_dir_single)
         for contestant in contestants:
             registrar_single.register(contestant)
         manager = get_manager(out_dir_single)
-        manager.allocate(registrar_single.contestants())
+        manager.allocate(registrar_single.entries())
         contestant_entries_single = manager.contestant_entries()
 
         for contestant in contestant_entries_del:
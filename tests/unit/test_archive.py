@@ -0,0 +1,108 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar, get_show_columns
+from greenbook.data.entries import Contestant
+from greenbook.secretary.query import Query, Condition, run_query
+from greenbook.secretary.archive import ARCHIVE_DIMENSIONS, Archive
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE
+
+
+class TestArchive:
+    @pytest.fixture
+    def shows(self, out_dirs):
+        entrants = [
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ],
+            [
+                Contestant(name="alice  APPLEBY", classes=["1", "42"], paid=0.0),
+                Contestant(name="Dennis Dill", classes=["1", "42"], paid=0.0),
+            ],
+        ]
+        judgments = [
+            [
+                dict(class_id="1", first=[3], second=[4], third=[1], commendations=[]),
+                dict(class_id="42", first=[1], second=[], third=[], commendations=[]),
+            ],
+            [
+                dict(class_id="1", first=[1], second=[2], third=[], commendations=[]),
+                dict(class_id="42", first=[2], second=[1], third=[], commendations=[]),
+            ],
+        ]
+        managers = []
+        for out_dir, contestants, show_judgments in zip(out_dirs, entrants, judgments):
+            registrar = get_registrar(out_dir)
+            registrar.register_many(contestants)
+            manager = get_manager(out_dir)
+            manager.allocate(registrar.entries())
+            for judgment in show_judgments:
+                manager.add_judgment(**judgment)
+            managers.append(manager)
+        managers[1].add_prize(prize="Best in Show", class_id="42", contestant_id=1)
+        return managers
+
+    @pytest.fixture
+    def archive(self, shows, out_dirs):
+        with Archive(out_dirs[0] / "archive.sqlite") as archive:
+            for name, manager in zip(["2023", "2024"], shows):
+                archive.add_show(name, manager.show, DEFAULT_SCHEDULE)
+            yield archive
+
+    def _query(self, where=(), by=(), aggregations=("entries",), having=()) -> Query:
+        return Query(
+            where=[Condition.parse(c) for c in where],
+            by=list(by),
+            aggregations=aggregations,
+            having=[Condition.parse(c) for c in having],
+            dimensions=ARCHIVE_DIMENSIONS,
+        )
+
+    def test_across_shows(self, archive):
+        assert archive.shows() == ["2023", "2024"]
+        # contestants are matched across shows by their normalized names
+        wins = archive.query(
+            self._query(where=['contestant="ALICE Appleby"', "place=1"], by=["show"])
+        )
+        assert wins.to_dict("records") == [{"show": "2024", "entries": 1}]
+        result = archive.query(
+            self._query(by=["contestant"], aggregations=("points", "classes"), having=["points>0"])
+        )
+        assert result.to_dict("records") == [
+            {"contestant": "alice  APPLEBY", "points": 6, "classes": 4},
+            {"contestant": "Bob Beetroot", "points": 3, "classes": 3},
+            {"contestant": "Carole Carrot", "points": 3, "classes": 2},
+            {"contestant": "Dennis Dill", "points": 5, "classes": 2},
+        ]
+        result = archive.query(self._query(where=["class=1", "show>=2024"], by=["place"]))
+        assert result.to_dict("records") == [
+            {"place": "1", "entries": 1},
+            {"place": "2", "entries": 1},
+        ]
+
+    def test_matches_show_query(self, archive, out_dirs):
+        query = self._query(by=["class", "place"], aggregations=("entries", "points"))
+        expected = run_query(get_show_columns(out_dirs[0]), DEFAULT_SCHEDULE, query)
+        result = archive.query(
+            self._query(where=["show=2023"], by=query.by, aggregations=query.aggregations)
+        )
+        # classes are listed in the order of their ids rather than of the schedule
+        assert sorted(result.to_dict("records"), key=str) == sorted(
+            expected.to_dict("records"), key=str
+        )
+
+    def test_prize_winners(self, archive, shows):
+        winners = archive.prize_winners(prize="best in show")
+        assert winners.to_dict("records") == [
+            {"show": "2024", "prize": "Best in Show", "winner": "alice  APPLEBY"}
+        ]
+        assert set(archive.prize_winners(last=1)["show"]) == {"2024"}
+        # archiving a show again replaces it
+        archive.add_show("2024", shows[0].show, DEFAULT_SCHEDULE)
+        assert archive.prize_winners(prize="best in show").empty
+        assert archive.shows() == ["2023", "2024"]
+
+    def test_unknown_column(self):
+        with pytest.raises(ValueError, match="Can only filter"):
+            Query(where=[Condition.parse("show=2024")])
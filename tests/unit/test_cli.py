@@ -2,27 +2,9 @@ import pytest
 
 import subprocess
 from pathlib import Path
-from datetime import datetime
 
 
 class TestCLI:
-    @pytest.fixture
-    def out_dir(
-        self,
-    ):
-        random_dir = Path(f".{hash(datetime.now())}")
-        random_dir.mkdir(exist_ok=True)
-        yield random_dir
-        # remove all files and dir
-        for file in random_dir.iterdir():
-            if file.is_file():
-                file.unlink()
-            else:
-                for subfile in file.iterdir():
-                    subfile.unlink()
-                file.rmdir()
-        random_dir.rmdir()
-
     @pytest.fixture
     def base_cli_invocation(self, out_dir):
         return ["greenbook", "--location", str(out_dir.absolute())]
@@ -45,6 +27,9 @@ class TestCLI:
         ]
         commands.extend(register_cmds)
         commands.append([*base_cli_invocation, "allocate"])
+        commands.append(
+            [*base_cli_invocation, "plan_judging", "--judges", "Joan Hollier=A,B", "Ken Leek"]
+        )
 
         judging = [
             ("1", "--first=1"),
@@ -68,8 +53,18 @@ class TestCLI:
 
         commands.extend(judging_cmds)
         commands.extend(prize_cmds)
+        commands.append([*base_cli_invocation, "history", "--class", "35"])
+        commands.append([*base_cli_invocation, "at", "--time", "now", "--compare_to", "now"])
 
         commands.append([*base_cli_invocation, "final_report"])
+        show = base_cli_invocation[2]
+        commands.append([*base_cli_invocation, "federate", "--show", show, "--show", show])
+        archive = ["--archive", str(Path(show) / "archive.sqlite")]
+        commands.append([*base_cli_invocation, "archive", "--name", "2024", *archive])
+        commands.append(
+            [*base_cli_invocation, "archive_query", "--where", "place=1", "--by", "show", *archive]
+        )
+        commands.append([*base_cli_invocation, "archive_prizes", "--last", "1", *archive])
 
         # run the CLI via subprocess
         for cmd in commands:
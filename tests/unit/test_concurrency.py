@@ -0,0 +1,63 @@
+import multiprocessing
+from pathlib import Path
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.data.storage import read_version
+
+N_WORKERS = 8
+N_CONTESTANTS = 5
+CLASSES_PER_WORKER = 3
+SURNAMES = ("Appleby", "Beetroot", "Carrot", "Dahlia", "Eggplant")
+
+
+def _worker_classes(worker: int):
+    return [str(1 + CLASSES_PER_WORKER * worker + k) for k in range(CLASSES_PER_WORKER)]
+
+
+def _register(location: Path, worker: int):
+    # one registrar for all of the worker's registrations, so that others save in between
+    registrar = get_registrar(location)
+    for surname in SURNAMES[:N_CONTESTANTS]:
+        registrar.register(
+            Contestant(name=f"Steward{worker} {surname}", classes=_worker_classes(worker), paid=0.0)
+        )
+
+
+def _judge(location: Path, worker: int):
+    manager = get_manager(location)
+    for class_id in _worker_classes(worker):
+        manager.add_judgment(class_id=class_id, first=[1], second=[2], third=[], commendations=[])
+
+
+class TestConcurrency:
+    @staticmethod
+    def _run_workers(target, location: Path):
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=target, args=(location, worker)) for worker in range(N_WORKERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120)
+            assert process.exitcode == 0
+
+    def test_concurrent_register_and_judge(self, out_dir):
+        self._run_workers(_register, out_dir)
+        registrar = get_registrar(out_dir)
+        entries = registrar.entries()
+        assert len(entries.contestants) == N_WORKERS * N_CONTESTANTS
+        # the first save writes the ledger and the rest append to it
+        assert read_version(out_dir / "contestants.csv") == 1
+
+        get_manager(out_dir).allocate(entries)
+        self._run_workers(_judge, out_dir)
+        show = get_manager(out_dir).show
+        for worker in range(N_WORKERS):
+            for class_id in _worker_classes(worker):
+                show_class = show.class_lookup(class_id)
+                assert len(show_class.first_place) == 1
+                assert len(show_class.second_place) == 1
+        # one write for the allocation and one per judgment
+        assert read_version(out_dir / "classes.yaml") == 1 + N_WORKERS * CLASSES_PER_WORKER
@@ -0,0 +1,80 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar, get_show_columns
+from greenbook.data.entries import Contestant
+from greenbook.definitions.prizes import (
+    ALL_PRIZES,
+    prize_results,
+    sort_contestant_by_points,
+)
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE
+from greenbook.secretary.federation import federate, load_shows
+
+
+class TestFederation:
+    @pytest.fixture
+    def shows(self, out_dirs):
+        entrants = [
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ],
+            [
+                Contestant(name="alice  APPLEBY", classes=["1", "42"], paid=0.0),
+                Contestant(name="Dennis Dill", classes=["1", "42"], paid=0.0),
+            ],
+        ]
+        judgments = [
+            [
+                dict(class_id="1", first=[3], second=[4], third=[1], commendations=[]),
+                dict(class_id="42", first=[1], second=[], third=[], commendations=[]),
+            ],
+            [
+                dict(class_id="1", first=[1], second=[2], third=[], commendations=[]),
+                dict(class_id="42", first=[2], second=[1], third=[], commendations=[]),
+            ],
+        ]
+        managers = []
+        for out_dir, contestants, show_judgments in zip(out_dirs, entrants, judgments):
+            registrar = get_registrar(out_dir)
+            registrar.register_many(contestants)
+            manager = get_manager(out_dir)
+            manager.allocate(registrar.entries())
+            for judgment in show_judgments:
+                manager.add_judgment(**judgment)
+            managers.append(manager)
+        return managers
+
+    def test_single_show(self, shows, out_dirs):
+        federation = federate(load_shows(out_dirs[:1], get_show_columns))
+        show = shows[0].show
+        assert federation.ranking() == [(c.name, p) for c, p in sort_contestant_by_points(show)]
+        assert (
+            federation.prize_results(DEFAULT_SCHEDULE)
+            == prize_results(show, DEFAULT_SCHEDULE)[: len(ALL_PRIZES)]
+        )
+
+    def test_combined(self, shows, out_dirs):
+        federation = federate(load_shows(out_dirs, get_show_columns, workers=2))
+        assert federation.shows == 2
+        assert federation.names == (
+            "Alice Appleby",
+            "Bob Beetroot",
+            "Carole Carrot",
+            "Dennis Dill",
+        )
+        assert federation.shows_entered.tolist() == [2, 1, 1, 1]
+        assert federation.points["1"] == {"Alice Appleby": 4, "Carole Carrot": 3, "Dennis Dill": 2}
+        assert federation.ranking()[0] == ("Alice Appleby", 6)
+        assert "M & B Shield: Alice Appleby" in federation.prize_results(DEFAULT_SCHEDULE)
+        # the same whether loaded side by side or one after another
+        assert (
+            federate(load_shows(out_dirs, get_show_columns, workers=1)).points == federation.points
+        )
+
+    def test_different_schedules(self, shows, out_dirs):
+        columns = load_shows(out_dirs, get_show_columns)
+        columns[1].class_ids = columns[1].class_ids[::-1]
+        with pytest.raises(ValueError, match="same schedule"):
+            federate(columns)
@@ -0,0 +1,62 @@
+import numpy as np
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.secretary.fees import BALANCE_COLS, compute_fees, contestant_balances
+from greenbook.definitions.schedule import SCHEDULE_FILE, Schedule, write_schedule
+
+FEES_SCHEDULE = Schedule.from_config(
+    {
+        "entry_fee": 0.5,
+        "free_sections": ["K"],
+        "section_fees": {"F": 0.2},
+        "class_fees": {"V3": 2.0},
+        "section_caps": {"F": 0.5},
+        "fee_cap": 4.0,
+        "sections": {
+            "V": {"V1": "Leeks", "V2": "Onions", "V3": "Giant marrow"},
+            "F": {"F1": "Sweet peas", "F2": "Roses", "F3": "Dahlias"},
+            "K": {"K1": "Sand garden"},
+        },
+    }
+)
+
+
+class TestFees:
+    def test_compute_fees(self):
+        codes = FEES_SCHEDULE.encode(["V1", "V3", "F1", "F2", "F3", "K1", "V1", "V2", "V3", "V3"])
+        owners = np.array([0, 0, 0, 0, 0, 0, 2, 2, 2, 2])
+        fees = compute_fees(FEES_SCHEDULE, owners, codes, n_contestants=3)
+        # 0.5 + 2.0 for vegetables, 0.6 for flowers capped at 0.5, children's free
+        # nothing for the contestant without entries, 5.0 capped at 4.0
+        assert fees.tolist() == [3.0, 0.0, 4.0]
+
+    def test_contestant_balances(self):
+        balances = contestant_balances(
+            FEES_SCHEDULE,
+            names=["Alice Appleby", "Bob Beetroot"],
+            entry_classes=[["V1", "F1"], ["K1"]],
+            paid=[1.0, 0.0],
+        )
+        assert tuple(balances.columns) == BALANCE_COLS
+        assert balances["entries"].tolist() == [2, 1]
+        assert balances["fees"].tolist() == [0.7, 0.0]
+        assert balances["balance"].tolist() == [-0.3, 0.0]
+
+    def test_ledger_and_slip_balances_agree(self, out_dir):
+        write_schedule(FEES_SCHEDULE, out_dir / SCHEDULE_FILE)
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["V1", "F1"], paid=0.5))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["V3", "V3", "K1"], paid=0.0))
+        # a second registration adds to the first, including what was paid
+        registrar.register(Contestant(name="Alice Appleby", classes=["F2", "F3"], paid=0.2))
+        balances = registrar.balances()
+        assert balances["contestant"].tolist() == ["Alice Appleby", "Bob Beetroot"]
+        assert balances["entries"].tolist() == [4, 3]
+        assert balances["paid"].tolist() == [0.7, 0.0]
+        assert balances["balance"].tolist() == [0.3, 4.0]
+
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        from_show = manager.balances().sort_values("contestant").reset_index(drop=True)
+        assert from_show.equals(balances)
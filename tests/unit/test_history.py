@@ -0,0 +1,79 @@
+import pytest
+
+from datetime import timedelta
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.secretary import history
+from greenbook.data.entries import Contestant
+from greenbook.secretary.history import diff_shows
+
+
+class TestHistory:
+    @pytest.fixture
+    def manager(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir, operator="joan")
+        manager.allocate(registrar.entries())
+        return manager
+
+    def test_overwritten_judgment(self, manager, out_dir):
+        manager.add_judgment(class_id="1", first=[1], second=[2], third=[], commendations=[])
+        manager.add_judgment(
+            class_id="1", first=[2], second=[1], third=[], commendations=[], operator="ken"
+        )
+        changes = get_manager(out_dir).history.changes()
+        assert [(c.action, c.operator) for c in changes] == [
+            ("allocate", "joan"),
+            ("judge", "joan"),
+            ("judge", "ken"),
+        ]
+        before = manager.history.show_at(changes[1].time)
+        assert [c.name for c, _ in before.class_lookup("1").first_place] == ["Alice Appleby"]
+        assert diff_shows(before, manager.show) == [
+            "class 1: first 1 Alice Appleby -> 2 Bob Beetroot",
+            "class 1: second 2 Bob Beetroot -> 1 Alice Appleby",
+        ]
+        assert manager.history.show_at(changes[0].time - timedelta(seconds=1)) is None
+
+    def test_replay_from_checkpoints(self, manager, monkeypatch):
+        monkeypatch.setattr(history, "CHECKPOINT_INTERVAL", 2)
+        states = []
+        for first in [1, 2, 3, 4, 1]:
+            manager.add_judgment(class_id="1", first=[first], second=[], third=[], commendations=[])
+            manager.add_judgment(
+                class_id="25C", first=[("25B", 2)], second=[], third=[], commendations=[]
+            )
+            manager.add_prize(prize=f"Spoon {first}", class_id="1", contestant_id=first)
+            states.append(manager.show)
+        # after the allocation and every other change
+        assert len(manager.history.checkpoints()) == 1 + 15 // 2
+        changes = manager.history.changes()
+        for change, state in zip(changes[3::3], states):
+            assert diff_shows(manager.history.show_at(change.time), state) == []
+
+    def test_old_checkpoints_are_not_loaded(self, manager):
+        (checkpoint,) = manager.history.checkpoints()
+        data = manager.history.checkpoints_loc.read_bytes()
+        header, _, snapshot = data.partition(b"\n")
+        assert header.split()[2] == str(history.HISTORY_FORMAT_VERSION).encode()
+        assert snapshot.startswith(b"!Show")
+        # a checkpoint of version 1, whose header has no version, is refused unread
+        manager.history.checkpoints_loc.write_bytes(b"%d 9\nnot a show" % checkpoint)
+        changes = manager.history.changes()
+        with pytest.raises(ValueError, match="another version"):
+            manager.history.show_at(changes[0].time)
+
+    def test_torn_journal(self, manager):
+        with manager.history.journal_loc.open("a") as f:
+            f.write('{"time": "2024-08')
+        manager.add_judgment(class_id="1", first=[3], second=[], third=[], commendations=[])
+        changes = manager.history.changes()
+        assert [c.action for c in changes] == ["allocate", "judge"]
+        assert diff_shows(manager.history.show_at(changes[-1].time), manager.show) == []
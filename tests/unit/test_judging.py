@@ -0,0 +1,57 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.secretary.judging import read_judgment_sheet
+
+
+class TestBatchJudging:
+    @pytest.fixture
+    def contestants(self):
+        return [
+            Contestant(name="Alice Appleby", classes=["1", "2", "3"], paid=0.0),
+            Contestant(name="Bob Beetroot", classes=["1", "2", "2", "42"], paid=0.0),
+            Contestant(name="Carole Carrot", classes=["1", "42"], paid=0.0),
+        ]
+
+    @pytest.fixture
+    def manager(self, out_dir, contestants):
+        registrar = get_registrar(out_dir)
+        for contestant in contestants:
+            registrar.register(contestant)
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        return manager
+
+    def test_batch_judging(self, out_dir, manager, contestants):
+        sheet = out_dir / "results.csv"
+        sheet.write_text("class,place,entry\n1,1,3\n1,2,1\n1,C,2\n2,1,2\n2,1,3\n42,3,1:1\n")
+        judgments, errors = read_judgment_sheet(sheet)
+        assert errors == []
+        manager.add_judgments(judgments)
+
+        show_class = manager.report_class("1")
+        assert tuple(show_class.first_place) == ((contestants[2], 3),)
+        assert tuple(show_class.second_place) == ((contestants[0], 1),)
+        assert tuple(show_class.commendations) == ((contestants[1], 2),)
+        show_class = manager.report_class("2")
+        assert tuple(show_class.first_place) == ((contestants[1], 2), (contestants[1], 3))
+        show_class = manager.report_class("42")
+        assert tuple(show_class.third_place) == ((contestants[0], "1-1"),)
+        # all classes were saved together
+        reloaded = get_manager(out_dir)
+        assert len(reloaded.report_class("1").first_place) == 1
+        assert len(reloaded.report_class("2").first_place) == 2
+        assert len(reloaded.report_class("42").third_place) == 1
+
+    def test_errors_reported_together(self, out_dir, manager):
+        sheet = out_dir / "results.csv"
+        sheet.write_text("class,place,entry\n1,4,1\n1,1,one\n1,1,9\n99,1,1\n2,1,1\n")
+        judgments, errors = read_judgment_sheet(sheet)
+        assert len(errors) == 2
+        errors.extend(manager.check_judgments(judgments))
+        assert len(errors) == 4
+        with pytest.raises(ValueError):
+            manager.add_judgments(judgments)
+        # nothing was applied, not even the valid judgment for class 2
+        assert tuple(get_manager(out_dir).report_class("2").first_place) == ()
@@ -0,0 +1,57 @@
+import pytest
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from greenbook.cli.main import get_manager, get_registrar, get_lookup_table
+from greenbook.data.lookup import LookupTable
+from greenbook.data.entries import Contestant
+
+
+def _lookup_in_process(table_loc: Path, class_id: str, contestant_id: int):
+    with LookupTable(table_loc) as table:
+        return table.lookup(class_id, contestant_id)
+
+
+class TestLookupTable:
+    @pytest.fixture
+    def manager(self, out_dir):
+        registrar = get_registrar(out_dir)
+        for contestant in [
+            Contestant(name="Alice Appleby", classes=["1", "2", "3"], paid=0.0),
+            Contestant(name="Bob Beetroot", classes=["1", "2", "2", "42"], paid=0.0),
+            Contestant(name="Zoë Ørsted", classes=["1", "42", "60A"], paid=0.0),
+        ]:
+            registrar.register(contestant)
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        return manager
+
+    def test_matches_show(self, out_dir, manager):
+        with get_lookup_table(out_dir) as table:
+            assert sorted(table.class_ids()) == sorted(c.class_id for c in manager.show.classes())
+            for show_class in manager.show.classes():
+                assert table.class_size(show_class.class_id) == len(show_class)
+                for number, contestant in enumerate(show_class.contestants, start=1):
+                    assert table.lookup(show_class.class_id, number) == contestant.name
+            # a miss is reported as by the show itself
+            for class_id, number in [("1", 0), ("1", 4), ("99", 1)]:
+                message = f"Class {class_id} has no entry {number}."
+                with pytest.raises(ValueError, match=message):
+                    table.lookup(class_id, number)
+                with pytest.raises(ValueError, match=message):
+                    manager.lookup_contestant(class_id, number)
+
+    def test_no_show(self, out_dir):
+        (out_dir / "classes.lookup").write_bytes(b"")
+        assert get_lookup_table(out_dir) is None
+
+    def test_shared_between_processes(self, manager):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            names = pool.map(
+                _lookup_in_process,
+                [manager.lookup_table_loc] * 3,
+                ["1", "2", "60A"],
+                [3, 3, 1],
+            )
+            assert list(names) == ["Zoë Ørsted", "Bob Beetroot", "Zoë Ørsted"]
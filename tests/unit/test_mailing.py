@@ -0,0 +1,176 @@
+import pytest
+
+import email
+import smtplib
+import threading
+import socketserver
+from email import policy
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.secretary.mailing import (
+    SENT_FILE,
+    SentLog,
+    SmtpPool,
+    SmtpSettings,
+    send_slips,
+    read_addresses,
+)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough of SMTP for smtplib to send messages.
+    """
+
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 localhost ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                if address in server.refused:
+                    self._reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (line := self.rfile.readline()) != b".\r\n":
+                    data += line
+                with server.lock:
+                    failing = server.failures > 0
+                    if failing:
+                        server.failures -= 1
+                    else:
+                        server.messages.append((recipients, data))
+                if failing:
+                    self._reply("421 Too busy, closing connection")
+                    return
+                self._reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Not implemented")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.failures = 0
+        self.refused = set()
+        self.messages = []
+
+
+class TestMailing:
+    @pytest.fixture
+    def smtp_server(self):
+        server = _SMTPServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def slips(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.render_contestants(out_dir)
+        (out_dir / "addresses.csv").write_text(
+            "name,email\n"
+            "alice appleby,alice@example.com\n"
+            "Bob Beetroot,bob@example.com\n"
+            "Carole Carrot,\n"
+        )
+        return manager.slip_locs(out_dir)
+
+    def _send(self, smtp_server, slips, out_dir, **kwargs):
+        settings = SmtpSettings(
+            host="127.0.0.1", port=smtp_server.server_address[1], starttls=False
+        )
+        with SmtpPool(settings.connect, size=2, backoff=0.0) as pool:
+            return send_slips(
+                slips,
+                read_addresses(out_dir / "addresses.csv"),
+                pool,
+                SentLog(out_dir / SENT_FILE),
+                sender="secretary@example.com",
+                **kwargs,
+            )
+
+    def test_send_once(self, smtp_server, slips, out_dir):
+        report = self._send(smtp_server, slips, out_dir)
+        assert report.sent == ["Alice Appleby", "Bob Beetroot"]
+        assert report.no_address == ["Carole Carrot"]
+        assert smtp_server.connections <= 2
+        received = {}
+        for recipients, data in smtp_server.messages:
+            message = email.message_from_bytes(data, policy=policy.default)
+            (attachment,) = message.iter_attachments()
+            received[tuple(recipients)] = (attachment.get_filename(), attachment.get_content())
+        assert received[("alice@example.com",)] == (
+            "Alice Appleby.pdf",
+            (out_dir / "Alice Appleby.pdf").read_bytes(),
+        )
+        assert received[("bob@example.com",)][0] == "Bob Beetroot.pdf"
+
+        # sending again skips those already sent, unless asked to resend
+        report = self._send(smtp_server, slips, out_dir)
+        assert report.sent == []
+        assert report.skipped == ["Alice Appleby", "Bob Beetroot"]
+        assert len(smtp_server.messages) == 2
+        report = self._send(smtp_server, slips, out_dir, resend=True)
+        assert report.sent == ["Alice Appleby", "Bob Beetroot"]
+
+    def test_retry_and_refusal(self, smtp_server, slips, out_dir):
+        smtp_server.failures = 2
+        smtp_server.refused = {"bob@example.com"}
+        report = self._send(smtp_server, slips, out_dir)
+        assert report.sent == ["Alice Appleby"]
+        assert list(report.failed) == ["Bob Beetroot"]
+        assert [recipients for recipients, _ in smtp_server.messages] == [["alice@example.com"]]
+
+        # the refused slip is tried again next time
+        smtp_server.refused = set()
+        report = self._send(smtp_server, slips, out_dir)
+        assert report.sent == ["Bob Beetroot"]
+        assert report.skipped == ["Alice Appleby"]
+
+    def test_server_down(self, smtp_server, slips, out_dir):
+        smtp_server.failures = 100
+        with pytest.raises(smtplib.SMTPException):
+            self._send(smtp_server, slips, out_dir)
+        assert not (out_dir / SENT_FILE).exists()
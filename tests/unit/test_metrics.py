@@ -0,0 +1,87 @@
+import threading
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.telemetry.metrics import REGISTRY, MetricsRegistry, load_metrics
+
+
+class TestMetrics:
+    def test_exposition(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("things_total", "Things.")
+        counter.inc()
+        counter.inc(2)
+        histogram = registry.histogram("wait_seconds", "Waits.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert registry.exposition() == (
+            "# HELP things_total Things.\n"
+            "# TYPE things_total counter\n"
+            "things_total 3\n"
+            "# HELP wait_seconds Waits.\n"
+            "# TYPE wait_seconds histogram\n"
+            'wait_seconds_bucket{le="0.1"} 2\n'
+            'wait_seconds_bucket{le="1"} 3\n'
+            'wait_seconds_bucket{le="+Inf"} 4\n'
+            "wait_seconds_sum 3.65\n"
+            "wait_seconds_count 4\n"
+        )
+
+    def test_flush_accumulates(self, out_dir):
+        metrics_loc = out_dir / "metrics.json"
+        for _ in range(3):
+            registry = MetricsRegistry()
+            registry.counter("runs_total", "Runs.").inc()
+            registry.histogram("run_seconds", "Run time.").observe(0.2)
+            registry.flush(metrics_loc)
+            assert registry.to_dict()["runs_total"]["value"] == 0
+        totals = load_metrics(metrics_loc).to_dict()
+        assert totals["runs_total"]["value"] == 3
+        assert sum(totals["run_seconds"]["counts"]) == 3
+
+    def test_flush_skips_when_nothing_recorded(self, out_dir):
+        metrics_loc = out_dir / "metrics.json"
+        registry = MetricsRegistry()
+        registry.counter("runs_total", "Runs.")
+        registry.flush(metrics_loc)
+        assert not metrics_loc.exists()
+        registry.counter("runs_total", "Runs.").inc()
+        registry.flush(metrics_loc)
+        assert load_metrics(metrics_loc).to_dict()["runs_total"]["value"] == 1
+
+    def test_concurrent_flushes(self, out_dir):
+        metrics_loc = out_dir / "metrics.json"
+
+        def _run():
+            for _ in range(10):
+                registry = MetricsRegistry()
+                registry.counter("runs_total", "Runs.").inc()
+                registry.flush(metrics_loc)
+
+        threads = [threading.Thread(target=_run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert load_metrics(metrics_loc).to_dict()["runs_total"]["value"] == 40
+
+    def test_instrumentation(self, out_dir):
+        before = REGISTRY.to_dict()
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_judgment(class_id="1", first=[1], second=[], third=[], commendations=[])
+        after = REGISTRY.to_dict()
+
+        def _delta(name, key="value"):
+            if key == "counts":
+                return sum(after[name][key]) - sum(before[name][key])
+            return after[name][key] - before[name][key]
+
+        assert _delta("greenbook_registrations_total") == 1
+        assert _delta("greenbook_registered_entries_total") == 2
+        assert _delta("greenbook_allocated_entries_total") == 2
+        assert _delta("greenbook_judgments_total") == 1
+        assert _delta("greenbook_show_save_seconds", "counts") == 2
+        assert _delta("greenbook_ledger_save_seconds", "counts") == 1
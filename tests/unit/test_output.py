@@ -0,0 +1,107 @@
+import pytest
+
+import io
+import re
+import json
+import pandas as pd
+from pypdf import PdfReader
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.secretary import manager as manager_module
+from greenbook.render.pdf import merge_pdfs
+from greenbook.data.entries import Contestant
+from greenbook.render.results import render_class_page
+from greenbook.telemetry.spans import configure_spans
+from greenbook.telemetry.metrics import REGISTRY
+
+
+def _rendered_pages() -> int:
+    return REGISTRY.to_dict()["greenbook_rendered_report_pages_total"]["value"]
+
+
+def _n_pages(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+class TestFinalReport:
+    @pytest.fixture
+    def judged(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "2", "3"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "2", "42"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_judgment(class_id="1", first=[1], second=[], third=[], commendations=[])
+        return out_dir
+
+    def test_pages_are_cached(self, judged):
+        out_dir = judged
+        report_dir = out_dir / "report"
+        report_loc = report_dir / "final-class-report.pdf"
+
+        before = _rendered_pages()
+        get_manager(out_dir).render_final_report(report_dir)
+        # a page per class, then the prizes and ranking
+        assert _rendered_pages() - before == 4 + 2
+        first_report = report_loc.read_bytes()
+        assert _n_pages(first_report) == 4
+
+        before = _rendered_pages()
+        get_manager(out_dir).render_final_report(report_dir)
+        assert _rendered_pages() - before == 2
+        assert report_loc.read_bytes() == first_report
+
+        get_manager(out_dir).add_judgment(
+            class_id="2", first=[2], second=[1], third=[], commendations=[]
+        )
+        before = _rendered_pages()
+        get_manager(out_dir).render_final_report(report_dir)
+        assert _rendered_pages() - before == 1 + 2
+        assert _n_pages(report_loc.read_bytes()) == 4
+        assert report_loc.read_bytes() != first_report
+
+    def test_page_cache_of_another_version(self, judged, monkeypatch):
+        report_dir = judged / "report"
+        get_manager(judged).render_final_report(report_dir)
+        monkeypatch.setattr(manager_module, "PAGE_CACHE_FORMAT_VERSION", 0)
+        before = _rendered_pages()
+        get_manager(judged).render_final_report(report_dir)
+        assert _rendered_pages() - before == 4 + 2
+
+    def test_rendered_side_by_side(self, judged):
+        report_dir = judged / "report"
+        before = _rendered_pages()
+        sink = io.StringIO()
+        configure_spans(sink)
+        try:
+            get_manager(judged).render_final_report(report_dir, workers=2)
+        finally:
+            configure_spans(None)
+        # the pages rendered by the workers are counted here
+        assert _rendered_pages() - before == 4 + 2
+        assert _n_pages((report_dir / "final-class-report.pdf").read_bytes()) == 4
+        for name in ("final-prize-report.pdf", "final-ranking-report.pdf"):
+            assert _n_pages((report_dir / name).read_bytes()) == 1
+        # as are the timings of the documents rendered there
+        spans = [json.loads(line) for line in sink.getvalue().splitlines()]
+        parents = {span["phase"]: span["parent"] for span in spans}
+        assert parents["render.prizes"] == "manager.final_report"
+        assert parents["render.ranking"] == "manager.final_report"
+        assert parents["manager.class_pages"] == "manager.final_report"
+
+
+class TestMergePdfs:
+    @pytest.fixture
+    def pages(self):
+        df = pd.DataFrame({"Entry": [1, 2], "Contestant": ["Alice Appleby", "Bob Beetroot"]})
+        return [render_class_page(str(n), f"Class {n}", df) for n in range(1, 4)]
+
+    def test_merged_pdf_is_well_formed(self, pages):
+        merged = PdfReader(io.BytesIO(merge_pdfs(pages)), strict=True)
+        assert len(merged.pages) == 3
+        for n, page in enumerate(merged.pages, start=1):
+            assert f"class {n} --- Class {n}" in page.extract_text()
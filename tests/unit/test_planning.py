@@ -0,0 +1,91 @@
+import pytest
+
+import re
+import numpy as np
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.render.judging import clock_time, render_judging_sheets
+from greenbook.secretary.planning import Judge, parse_judge, plan_judging, balance_loads
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE
+
+
+class TestPlanning:
+    @staticmethod
+    def _class_sizes(n_classes, seed=0):
+        rng = np.random.default_rng(seed)
+        class_ids = DEFAULT_SCHEDULE.class_ids
+        return {
+            class_ids[i]: int(rng.integers(1, 40))
+            for i in rng.permutation(len(class_ids))[:n_classes]
+        }
+
+    def test_parse_judge(self):
+        assert parse_judge("Joan Hollier=F, G") == Judge("Joan Hollier", ("F", "G"))
+        assert parse_judge("Ken Leek") == Judge("Ken Leek", ())
+
+    def test_sections_respected(self):
+        schedule = DEFAULT_SCHEDULE
+        judges = [Judge("Flowers", ("F", "G")), Judge("Anyone"), Judge("Veg", ("A", "B"))]
+        class_sizes = self._class_sizes(80)
+        plan = plan_judging(class_sizes, schedule, judges, minutes_per_entry=1.0)
+        planned = [slot.class_id for slots in plan.slots.values() for slot in slots]
+        assert sorted(planned) == sorted(class_sizes)
+        for judge in judges:
+            slots = plan.slots[judge.name]
+            assert all(judge.may_judge(schedule.section_of(slot.class_id)) for slot in slots)
+            # in schedule order, back to back
+            assert [s.class_id for s in slots] == sorted(
+                (s.class_id for s in slots), key=schedule.sort_key
+            )
+            assert all(a.finish == b.start for a, b in zip(slots, slots[1:]))
+
+    def test_unjudgeable(self):
+        with pytest.raises(ValueError):
+            plan_judging({"1": 3}, DEFAULT_SCHEDULE, [Judge("Flowers", ("F",))], 1.0)
+        with pytest.raises(ValueError):
+            plan_judging({"1": 3}, DEFAULT_SCHEDULE, [Judge("Ken", ("Z",))], 1.0)
+
+    def test_local_search(self):
+        # longest first gives 4+2+2 against 3+3, where 4+3 against 3+2+2 is best
+        durations = np.array([4.0, 3.0, 3.0, 2.0, 2.0])
+        eligible = np.ones((5, 2), dtype=bool)
+        judges = balance_loads(durations, eligible, max_improvements=0)
+        assert np.bincount(judges, weights=durations).max() == 8
+        judges = balance_loads(durations, eligible)
+        assert np.bincount(judges, weights=durations).max() == 7
+
+    def test_large_show(self):
+        # 200 classes of 1 to 40 entries between 10 judges, the last 4 of whom may only
+        # judge one class in 5
+        rng = np.random.default_rng(0)
+        durations = 2.0 + rng.integers(1, 41, size=200)
+        open_to_all = np.arange(200) % 5 == 0
+        eligible = np.ones((200, 10), dtype=bool)
+        eligible[:, 6:] = open_to_all[:, None]
+        judges = balance_loads(durations, eligible)
+        assert eligible[np.arange(200), judges].all()
+        loads = np.bincount(judges, weights=durations, minlength=10)
+        # no split could do better than sharing out all the classes, or than the first 6
+        # judges sharing out those only they may judge
+        lower_bound = max(durations.sum() / 10, durations[~open_to_all].sum() / 6)
+        assert loads.max() <= lower_bound * 1.05
+
+    def test_sheets(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        class_sizes = manager.columns().class_sizes()
+        assert class_sizes == {"1": 2, "25B": 2, "25C": 1, "42": 1}
+        judges = [parse_judge("Joan=A"), parse_judge("Ken")]
+        plan = plan_judging(class_sizes, DEFAULT_SCHEDULE, judges, 5.0, minutes_per_class=10.0)
+        assert [s.class_id for s in plan.slots["Joan"]] == ["1"]
+        assert clock_time("09:30", plan.makespan) == "10:20"
+        sheets_loc = render_judging_sheets(plan, out_dir / "judging", start="09:30")
+        assert len(re.findall(rb"/Type /Page\b", sheets_loc.read_bytes())) == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from pathlib import Path
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.show import Entry
+from greenbook.data.entries import Contestant
+from greenbook.render.printer import LABEL_FORMATS, initials, label_stream, write_labels
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+
+class TestPrinter:
+    @pytest.fixture
+    def manager(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="bob van beetroot", classes=["1", "42"], paid=0.0),
+                Contestant(name="Zoë O'Brien", classes=["25B"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        return manager
+
+    def test_initials(self):
+        assert initials("bob van beetroot") == "BVB"
+        assert initials("Zoë  (Jo) O'Brien") == "ZO"
+
+    @pytest.mark.parametrize("format", LABEL_FORMATS)
+    def test_golden(self, manager, out_dir, format):
+        output = out_dir / f"labels.{format}"
+        write_labels(manager.entry_labels(format), output)
+        assert output.read_bytes() == (GOLDEN_DIR / f"entry_labels.{format}").read_bytes()
+
+    def test_many_labels(self):
+        names_entries = [
+            (f"Contestant {i}", [Entry(i % 30 + 1, str(c), "Class") for c in range(1, 11)])
+            for i in range(1000)
+        ]
+        for format in LABEL_FORMATS:
+            stream = label_stream(names_entries, format)
+            assert stream.count(b"Class ") == 10_000
+            assert stream.count(b"Class 10") == 1_000
+            assert stream.count(b"Entry 30") == 33 * 10
@@ -0,0 +1,44 @@
+import io
+import json
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.telemetry.spans import span, configure_spans
+from greenbook.telemetry.profiling import SPANS_FILE, run_profiled
+
+
+class TestProfiling:
+    def test_spans_disabled(self):
+        with span("nothing", items=1) as counts:
+            counts["more"] = 2
+        assert counts == {"items": 1, "more": 2}
+
+    def test_phase_spans(self, out_dir):
+        sink = io.StringIO()
+        configure_spans(sink)
+        try:
+            registrar = get_registrar(out_dir)
+            registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+            with span("outer"):
+                get_manager(out_dir).allocate(registrar.entries())
+        finally:
+            configure_spans(None)
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        phases = {record["phase"]: record for record in records}
+        assert {
+            "registrar.check_entries",
+            "registrar.save_ledger",
+            "registrar.group_entries",
+            "manager.build_classes",
+            "manager.save_show",
+        } <= set(phases)
+        assert phases["manager.save_show"]["counts"] == {"entries": 2}
+        assert phases["manager.save_show"]["parent"] == "outer"
+        assert all(record["duration"] >= 0 for record in records)
+
+    def test_run_profiled(self, out_dir):
+        profile_dir = out_dir / "profile"
+        assert run_profiled(lambda: 42, directory=profile_dir, name="answer") == 42
+        assert len(list(profile_dir.glob("answer-*.prof"))) == 1
+        (record,) = [json.loads(line) for line in (profile_dir / SPANS_FILE).open()]
+        assert record["phase"] == "command.answer"
@@ -0,0 +1,77 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar, get_show_columns
+from greenbook.data.columns import ShowColumns
+from greenbook.data.entries import Contestant
+from greenbook.secretary.query import Query, Condition, run_query
+from greenbook.definitions.prizes import sort_contestant_by_points
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE
+
+
+class TestQuery:
+    @pytest.fixture
+    def manager(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_judgment(class_id="1", first=[3], second=[4], third=[1], commendations=[])
+        manager.add_judgment(
+            class_id="25C", first=[("25B", 2)], second=[1], third=[], commendations=[]
+        )
+        return manager
+
+    @staticmethod
+    def _query(manager, **kwargs):
+        kwargs["where"] = [Condition.parse(c) for c in kwargs.get("where", [])]
+        kwargs["having"] = [Condition.parse(c) for c in kwargs.get("having", [])]
+        return run_query(manager.columns(), DEFAULT_SCHEDULE, Query(**kwargs))
+
+    def test_entries_per_section(self, manager):
+        # the entry moved from 25B to 25C is counted in both
+        result = self._query(manager, by=["section"])
+        assert dict(zip(result["section"], result["entries"])) == {"A": 4, "C": 5, "E": 1}
+
+    def test_no_placings(self, manager):
+        result = self._query(
+            manager, by=["contestant"], aggregations=["placed"], having=["placed=0"]
+        )
+        assert list(result["contestant"]) == []
+        result = self._query(
+            manager,
+            where=["class!=1"],
+            by=["contestant"],
+            aggregations=["placed"],
+            having=["placed=0"],
+        )
+        assert list(result["contestant"]) == ["Carole Carrot"]
+
+    def test_entered_both(self, manager):
+        result = self._query(
+            manager,
+            where=["class=25B,25C", "entry>0"],
+            by=["contestant"],
+            aggregations=["classes"],
+            having=["classes=2"],
+        )
+        assert list(result["contestant"]) == ["Alice Appleby"]
+
+    def test_points_match_ranking(self, manager):
+        result = self._query(manager, by=["contestant"], aggregations=["points"])
+        points = dict(zip(result["contestant"], result["points"]))
+        for contestant, ranked_points in sort_contestant_by_points(manager.show):
+            assert points[contestant.name] == ranked_points
+        total = self._query(manager, aggregations=["entries", "placed_rate"])
+        assert total.to_dict("records") == [{"entries": 10, "placed_rate": 0.5}]
+
+    def test_saved_columns(self, manager, out_dir):
+        columns = get_show_columns(out_dir)
+        saved = ShowColumns.load(manager.columns_loc)
+        assert saved.names == columns.names == manager.columns().names
+        assert (saved.places == manager.columns().places).all()
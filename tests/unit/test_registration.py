@@ -1,27 +1,15 @@
 import pytest
 
 import pandas as pd
-from pathlib import Path
-from datetime import datetime
 
 from greenbook.cli.main import get_registrar
-from greenbook.data.entries import Contestant
+from greenbook.secretary import registration
+from greenbook.data.entries import Contestant, DeletedContestant
+from greenbook.data.storage import read_version
 from greenbook.definitions.classes import FLAT_CLASSES
 
 
 class TestRegistrar:
-    @pytest.fixture
-    def out_dir(
-        self,
-    ):
-        random_dir = Path(f".{hash(datetime.now())}")
-        random_dir.mkdir(exist_ok=True)
-        yield random_dir
-        # remove all files and dir
-        for file in random_dir.iterdir():
-            file.unlink()
-        random_dir.rmdir()
-
     @pytest.mark.skip("deprecated method")
     def test_export(self, out_dir):
         contestants = [
@@ -63,3 +51,100 @@ class TestRegistrar:
         assert df.loc[3, "3"] == 2
         for col in set(FLAT_CLASSES.keys()) - {"1", "3"}:
             assert df.loc[3, col] == 0
+
+    def test_delete_appends_tombstone(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.2))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["1", "42"], paid=0.0))
+        ledger_loc = out_dir / "contestants.csv"
+        before = ledger_loc.read_text()
+        registrar.delete_contestant("Alice Appleby")
+        # the ledger is appended to rather than rewritten
+        assert ledger_loc.read_text().startswith(before)
+        assert read_version(ledger_loc) == 1
+
+        entries = get_registrar(out_dir).entries()
+        by_name = {c.name: c for c in entries.contestants}
+        assert set(by_name) == {"DELETED (Alice Appleby)", "Bob Beetroot"}
+        assert isinstance(by_name["DELETED (Alice Appleby)"], DeletedContestant)
+        # Bob's entries keep their numbers
+        assert entries.entry_numbers("Bob Beetroot", "1") == [2]
+        assert list(get_registrar(out_dir).balances()["contestant"]) == ["Bob Beetroot"]
+        with pytest.raises(ValueError):
+            registrar.delete_contestant("Alice Appleby")
+
+    def test_amend_and_compact(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["1"], paid=0.0))
+        registrar.amend(Contestant(name="Alice Appleby", classes=["3"], paid=0.1))
+        registrar.amend(Contestant(name="Alice Appleby", classes=["4"], paid=0.1))
+
+        names = {c.name: c for c in get_registrar(out_dir).entries().contestants}
+        assert set(names) == {
+            "DELETED (Alice Appleby)",
+            "DELETED (Alice Appleby, 2)",
+            "Alice Appleby",
+            "Bob Beetroot",
+        }
+        assert names["Alice Appleby"].classes == ("4",)
+        assert names["Alice Appleby"].paid == 0.1
+
+        assert get_registrar(out_dir).compact() == 5
+        ledger_loc = out_dir / "contestants.csv"
+        assert read_version(ledger_loc) == 2
+        entries = get_registrar(out_dir).entries()
+        assert {c.name for c in entries.contestants} == {"Alice Appleby", "Bob Beetroot"}
+        # Bob's entry is renumbered now that Alice's first entry in class 1 is gone
+        assert entries.entry_numbers("Bob Beetroot", "1") == [1]
+
+    def test_amend_checks_only_new_entries(self, out_dir, monkeypatch):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["1"], paid=0.0))
+        registrar.name_index()
+
+        def scan(*args):
+            raise AssertionError("the whole ledger was scanned")
+
+        monkeypatch.setattr(registration, "live_rows", scan)
+        monkeypatch.setattr(registration, "validate_ledger", scan)
+        registrar.amend(Contestant(name="Alice Appleby", classes=["3"], paid=0.1))
+        with pytest.raises(ValueError):
+            registrar.delete_contestant("Carol Carrot")
+        assert registrar.similar_names("Alice Appleby")[0][0] == "Alice Appleby"
+        monkeypatch.undo()
+
+        names = {c.name: c for c in get_registrar(out_dir).entries().contestants}
+        assert names["Alice Appleby"].classes == ("3",)
+
+    def test_interrupted_append(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+        ledger_loc = out_dir / "contestants.csv"
+        with ledger_loc.open("a") as f:
+            f.write("2,Bob Beet")
+        registrar = get_registrar(out_dir)
+        assert [c.name for c in registrar.entries().contestants] == ["Alice Appleby"]
+        registrar.register(Contestant(name="Carole Carrot", classes=["1"], paid=0.0))
+        assert "Bob Beet" not in ledger_loc.read_text()
+        names = [c.name for c in get_registrar(out_dir).entries().contestants]
+        assert names == ["Alice Appleby", "Carole Carrot"]
+
+    def test_entries(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "42"], paid=0.5))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["1", "1"], paid=0.0))
+        registrar.register(Contestant(name="Alice Appleby", classes=["1"], paid=0.25))
+        entries = get_registrar(out_dir).entries()
+        contestants = {c.name: c for c in entries.contestants}
+        assert contestants["Alice Appleby"].classes == ("1", "1", "42")
+        assert contestants["Alice Appleby"].paid == 0.75
+        assert entries.entry_numbers("Bob Beetroot", "1") == [2, 3]
+        assert [(class_id, [c.name for c in cs]) for class_id, cs in entries.by_class()] == [
+            ("1", ["Alice Appleby", "Bob Beetroot", "Bob Beetroot", "Alice Appleby"]),
+            ("42", ["Alice Appleby"]),
+        ]
+        with pytest.raises(ValueError):
+            registrar.register(Contestant(name="Bob Beetroot", classes=["1"], paid=0.0))
+        assert len(get_registrar(out_dir).entries()) == 5
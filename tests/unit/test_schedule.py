@@ -0,0 +1,65 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.definitions.prices import ENTRY_COST
+from greenbook.definitions.classes import FLAT_CLASSES
+from greenbook.definitions.schedule import (
+    SCHEDULE_FILE,
+    DEFAULT_SCHEDULE,
+    Schedule,
+    load_schedule,
+    write_schedule,
+)
+
+SMALL_SCHEDULE = {
+    "entry_fee": 0.5,
+    "free_sections": ["K"],
+    "class_fees": {"V2": 1.0},
+    "sections": {
+        "V": {"V10": "Leeks", "V2": "Onions", "V1": "Marrows"},
+        "K": {"K1": "Sand garden"},
+    },
+}
+
+
+class TestSchedule:
+    def test_default_schedule(self):
+        assert DEFAULT_SCHEDULE.class_ids == tuple(FLAT_CLASSES)
+        assert DEFAULT_SCHEDULE.class_name("1") == FLAT_CLASSES["1"]
+        assert DEFAULT_SCHEDULE.entry_fees[DEFAULT_SCHEDULE.codes["1"]] == ENTRY_COST
+        ordered = sorted(DEFAULT_SCHEDULE.class_ids, key=DEFAULT_SCHEDULE.sort_key)
+        assert ordered.index("9") < ordered.index("10") < ordered.index("25A")
+
+    def test_compile(self):
+        schedule = Schedule.from_config(SMALL_SCHEDULE)
+        assert list(schedule.encode(["V1", "K1", "V10"])) == [2, 3, 0]
+        assert sorted(schedule.class_ids, key=schedule.sort_key) == ["K1", "V1", "V2", "V10"]
+        assert list(schedule.entry_fees) == [0.5, 1.0, 0.5, 0.0]
+        assert schedule.section_class_ids("V") == ["V10", "V2", "V1"]
+        assert schedule.section_of("K1") == "K"
+        with pytest.raises(ValueError):
+            Schedule.from_config({**SMALL_SCHEDULE, "class_fees": {"X1": 1.0}})
+
+    def test_load(self, out_dir):
+        config_loc = out_dir / SCHEDULE_FILE
+        write_schedule(Schedule.from_config(SMALL_SCHEDULE), config_loc)
+        schedule = load_schedule(config_loc)
+        assert schedule.class_ids == ("V10", "V2", "V1", "K1")
+        assert schedule.to_config() == Schedule.from_config(SMALL_SCHEDULE).to_config()
+        # nothing is cached beside the show, so edits take effect at once
+        write_schedule(Schedule.from_config({**SMALL_SCHEDULE, "entry_fee": 0.25}), config_loc)
+        assert load_schedule(config_loc).entry_fees[0] == 0.25
+        assert [path.name for path in out_dir.iterdir()] == [SCHEDULE_FILE]
+
+    def test_show_with_own_schedule(self, out_dir):
+        write_schedule(Schedule.from_config(SMALL_SCHEDULE), out_dir / SCHEDULE_FILE)
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["V2", "K1"], paid=0.0))
+        with pytest.raises(ValueError):
+            registrar.register(Contestant(name="Bob Beetroot", classes=["1"], paid=0.0))
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        assert manager.show.class_lookup("V2").name == "Onions"
+        (entries,) = manager.contestant_entries().values()
+        assert sorted(entry.class_id for entry in entries) == ["K1", "V2"]
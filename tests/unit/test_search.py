@@ -0,0 +1,36 @@
+import logging
+
+from greenbook.cli.main import get_registrar
+from greenbook.data.search import NameIndex, normalize_name
+from greenbook.data.entries import Contestant
+
+
+class TestNameIndex:
+    def test_normalize(self):
+        assert normalize_name("  Mrs. Zoë  O'Brien ") == "mrs zoe o brien"
+
+    def test_fuzzy_search(self):
+        index = NameIndex(
+            ["Aunt Dahlia", "Major Marrow", "Mrs Ann Smyth", "Bettie Beetroot", "Aunt Agatha"]
+        )
+        assert index.search("Aunt Dahila")[0][0] == "Aunt Dahlia"
+        assert index.search("mrs smyth")[0][0] == "Mrs Ann Smyth"
+        assert index.search("Major Marrow")[0] == ("Major Marrow", 1.0)
+        assert index.search("Zebedee Zzyzx") == []
+        index.remove("Aunt Dahlia")
+        assert index.search("Aunt Dahila")[0][0] == "Aunt Agatha"
+        index.add("Aunt Dahlia")
+        assert index.search("Aunt Dahila")[0][0] == "Aunt Dahlia"
+        assert len(index) == 5
+
+    def test_duplicate_warning(self, out_dir, caplog):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Aunt Dahlia", classes=["1"], paid=0.0))
+        with caplog.at_level(logging.WARNING):
+            registrar.register(Contestant(name="Major Marrow", classes=["1"], paid=0.0))
+        assert not caplog.records
+        with caplog.at_level(logging.WARNING):
+            registrar.register(Contestant(name="Aunt Dahila", classes=["2"], paid=0.0))
+        assert "duplicate of already registered Aunt Dahlia" in caplog.text
+        # the index is rebuilt from the ledger on load
+        assert get_registrar(out_dir).similar_names("dahlia")[0][0] == "Aunt Dahlia"
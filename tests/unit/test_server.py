@@ -0,0 +1,142 @@
+import pytest
+
+import json
+import socket
+import asyncio
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from greenbook.server import service
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.server.service import ShowServer
+
+
+class TestShowServer:
+    @pytest.fixture
+    def server(self, out_dir):
+        registrar = get_registrar(out_dir)
+        for contestant in [
+            Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0),
+            Contestant(name="Bob Beetroot", classes=["1", "2", "2"], paid=0.0),
+        ]:
+            registrar.register(contestant)
+        get_manager(out_dir).allocate(registrar.entries())
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        server = ShowServer(
+            registrar=get_registrar(out_dir, autosave=False),
+            manager=get_manager(out_dir, autosave=False),
+            port=0,
+            flush_interval=0.05,
+            metrics_loc=out_dir / "metrics.json",
+        )
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        yield server
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    @staticmethod
+    def _call(server, method, path, body=None):
+        request = Request(
+            f"http://127.0.0.1:{server.port}{path}",
+            method=method,
+            data=None if body is None else json.dumps(body).encode(),
+        )
+        with urlopen(request) as response:
+            return response.status, json.loads(response.read())
+
+    def test_judging_and_results(self, server, out_dir):
+        status, body = self._call(server, "GET", "/lookup?class=2&entry=3")
+        assert status == 200
+        assert body["contestant"] == "Bob Beetroot"
+
+        self._call(server, "POST", "/judge", {"class": "1", "first": [2], "second": [1]})
+        self._call(server, "POST", "/judge", {"class": "2", "first": [1], "third": ["1:2"]})
+        status, ranking = self._call(server, "GET", "/ranking")
+        assert ranking == [
+            {"contestant": "Alice Appleby", "points": 5},
+            {"contestant": "Bob Beetroot", "points": 4},
+        ]
+        status, prizes = self._call(server, "GET", "/prizes")
+        assert "M & B Shield: Alice Appleby" in prizes
+
+        status, body = self._call(
+            server, "POST", "/register", {"name": "Carole Carrot", "entries": ["1", "42"]}
+        )
+        assert status == 201
+
+        with pytest.raises(HTTPError) as error:
+            self._call(server, "POST", "/judge", {"class": "1", "first": [9]})
+        assert error.value.code == 400
+        with pytest.raises(HTTPError) as error:
+            self._call(server, "GET", "/lookup?class=99&entry=1")
+        assert error.value.code == 404
+
+        # the writer task persists both changes without a request
+        for _ in range(100):
+            if not server._manager.dirty and not server._registrar.dirty:
+                break
+            threading.Event().wait(0.05)
+        assert len(get_manager(out_dir).report_class("1").first_place) == 1
+
+        with urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            metrics = response.read().decode()
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert "# TYPE greenbook_judgments_total counter" in metrics
+        assert "Carole Carrot" in [c.name for c in get_registrar(out_dir).entries().contestants]
+
+    @staticmethod
+    def _wait_until_saved(server):
+        for _ in range(100):
+            if not server._manager.dirty and not server._registrar.dirty:
+                return
+            threading.Event().wait(0.05)
+        raise AssertionError("The show was not saved.")
+
+    def test_failed_save_is_retried(self, server, out_dir, monkeypatch):
+        failures = []
+        commit = service.commit
+
+        def _commit_failing_once(*stores):
+            if not failures:
+                failures.append(stores)
+                raise OSError("Disk full")
+            return commit(*stores)
+
+        monkeypatch.setattr(service, "commit", _commit_failing_once)
+        self._call(server, "POST", "/judge", {"class": "1", "first": [2]})
+        for _ in range(100):
+            if failures:
+                break
+            threading.Event().wait(0.05)
+        assert failures
+        self._call(server, "POST", "/judge", {"class": "2", "first": [1]})
+        self._wait_until_saved(server)
+        manager = get_manager(out_dir)
+        assert len(manager.report_class("1").first_place) == 1
+        assert len(manager.report_class("2").first_place) == 1
+
+    def test_bad_content_length(self, server):
+        for length in ("abc", "-5"):
+            with socket.create_connection(("127.0.0.1", server.port), timeout=5) as connection:
+                connection.sendall(
+                    f"POST /register HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()
+                )
+                response = connection.makefile("rb").read()
+            assert response.startswith(b"HTTP/1.1 400 ")
+
+    def test_line_too_long(self, server):
+        long = "x" * 70_000
+        for request, status in (
+            (f"GET /{long} HTTP/1.1\r\n\r\n", b"414"),
+            (f"GET /results HTTP/1.1\r\nX-Long: {long}\r\n\r\n", b"431"),
+        ):
+            with socket.create_connection(("127.0.0.1", server.port), timeout=5) as connection:
+                connection.sendall(request.encode())
+                response = connection.makefile("rb").read()
+            assert response.startswith(b"HTTP/1.1 " + status + b" ")
@@ -0,0 +1,51 @@
+import pytest
+
+import io
+import json
+import pandas as pd
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+
+
+class TestClassSheet:
+    @pytest.fixture
+    def manager(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "42", "42"], paid=0.0),
+            ]
+        )
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        return manager
+
+    def test_matches_entries(self, manager):
+        sheet = manager.class_sheet()
+        n_filled = 0
+        for contestant, entries in manager.contestant_entries().items():
+            for entry in entries:
+                assert sheet.loc[entry.contestant_id, entry.class_id] == contestant.name
+                n_filled += 1
+        assert sheet.notna().to_numpy().sum() == n_filled
+        assert list(sheet.index) == [1, 2]
+
+    def test_nonempty(self, manager):
+        assert list(manager.class_sheet(all_classes=False).columns) == ["1", "2", "42"]
+
+    def test_jsonl(self, manager):
+        output = io.StringIO()
+        manager.export(output, format="jsonl", all_classes=False)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert records == [
+            {"entry": 1, "1": "Alice Appleby", "2": "Alice Appleby", "42": "Bob Beetroot"},
+            {"entry": 2, "1": "Bob Beetroot", "2": None, "42": "Bob Beetroot"},
+        ]
+
+    def test_parquet(self, manager, out_dir):
+        pytest.importorskip("pyarrow")
+        manager.export(out_dir / "classes.parquet", format="parquet")
+        sheet = pd.read_parquet(out_dir / "classes.parquet")
+        assert sheet.loc[2, "42"] == "Bob Beetroot"
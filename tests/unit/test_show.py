@@ -0,0 +1,44 @@
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.show import Show, Entry, ShowClass
+from greenbook.data.entries import Contestant
+
+
+class TestShow:
+    def test_compact_model(self):
+        contestant = Contestant(name="Alice Appleby", classes=["1", "2"], paid=0)
+        show_class = ShowClass(
+            class_id="1",
+            name="White Potatoes",
+            contestants=[contestant],
+            first_place=[[contestant, 1]],
+            second_place=[],
+            third_place=[],
+            commendations=[],
+        )
+        entry = Entry(contestant_id=1, class_id="1", name="White Potatoes")
+        for obj in (contestant, show_class, entry, Show([show_class])):
+            assert not hasattr(obj, "__dict__")
+        assert contestant.classes == ("1", "2")
+        assert show_class.first_place == ((contestant, 1),)
+        assert contestant.name is Contestant(name="Alice Appleby", classes=[], paid=0).name
+
+    def test_reload(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.5))
+        registrar.register(Contestant(name="Bob Beetroot", classes=["1"], paid=0.0))
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_prize(prize="Wooden Spoon", class_id="1", contestant_id=2)
+        manager.add_judgment(class_id="1", first=[2], second=[1], third=[], commendations=[])
+
+        show = get_manager(out_dir).show
+        show_class = show.class_lookup("1")
+        assert isinstance(show_class.contestants, tuple)
+        assert [c.name for c in show_class.contestants] == ["Alice Appleby", "Bob Beetroot"]
+        (alice,) = show.class_lookup("2").contestants
+        # contestants are shared between classes, not copied
+        assert alice is show_class.contestants[0]
+        assert alice.classes == ("1", "2") and type(alice.paid) is float
+        assert show_class.first_place == ((show_class.contestants[1], 2),)
+        # judging keeps the prizes already awarded
+        assert [prize for _, _, prize in show.prizes] == ["Wooden Spoon"]
@@ -0,0 +1,57 @@
+import pytest
+
+from greenbook.cli.main import get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.data.storage import atomic_write, group_commit
+from greenbook.telemetry.metrics import REGISTRY
+
+
+class TestStorage:
+    def test_atomic_write(self, out_dir):
+        location = out_dir / "state.txt"
+        with atomic_write(location) as f:
+            f.write("first")
+        assert location.read_text() == "first"
+        with pytest.raises(KeyboardInterrupt):
+            with atomic_write(location) as f:
+                f.write("sec")
+                raise KeyboardInterrupt()
+        # an interrupted write leaves the previous version, and no temporary file
+        assert location.read_text() == "first"
+        assert [p.name for p in out_dir.iterdir()] == ["state.txt"]
+
+    def test_interrupted_show_save(self, out_dir, monkeypatch):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2"], paid=0.0))
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        saved = (out_dir / "classes.yaml").read_text()
+
+        def _dump(data, stream):
+            stream.write("!!python/object:greenbook.data.show.Sh")
+            raise KeyboardInterrupt()
+
+        monkeypatch.setattr("greenbook.secretary.manager.yaml.dump", _dump)
+        with pytest.raises(KeyboardInterrupt):
+            manager.add_judgment(class_id="1", first=[1], second=[], third=[], commendations=[])
+        assert (out_dir / "classes.yaml").read_text() == saved
+
+    def test_group_commit(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register(Contestant(name="Alice Appleby", classes=["1", "2", "3", "4"], paid=0.0))
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        before = REGISTRY.to_dict()["greenbook_show_save_seconds"]["counts"]
+        with group_commit(manager):
+            for class_id in ("1", "2", "3", "4"):
+                manager.add_judgment(
+                    class_id=class_id, first=[1], second=[], third=[], commendations=[]
+                )
+            assert manager.dirty
+        after = REGISTRY.to_dict()["greenbook_show_save_seconds"]["counts"]
+        assert sum(after) - sum(before) == 1
+        assert manager.autosave and not manager.dirty
+        reloaded = get_manager(out_dir)
+        assert all(
+            reloaded.show.class_lookup(class_id).first_place for class_id in ("1", "2", "3", "4")
+        )
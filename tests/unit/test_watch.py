@@ -0,0 +1,72 @@
+import pytest
+
+import re
+
+from greenbook.cli.main import get_history, get_manager, get_registrar
+from greenbook.data.entries import Contestant
+from greenbook.render.board import BOARD_FILE
+from greenbook.secretary.watch import ResultsWatcher
+from greenbook.definitions.schedule import DEFAULT_SCHEDULE
+
+
+class TestWatch:
+    @pytest.fixture
+    def registrar(self, out_dir):
+        registrar = get_registrar(out_dir)
+        registrar.register_many(
+            [
+                Contestant(name="Alice Appleby", classes=["1", "25B", "25C"], paid=0.0),
+                Contestant(name="Bob Beetroot", classes=["1", "25B", "42"], paid=0.0),
+                Contestant(name="Carole Carrot", classes=["1", "1", "25C"], paid=0.0),
+            ]
+        )
+        return registrar
+
+    def test_board_follows_judging(self, registrar, out_dir):
+        watcher = ResultsWatcher(get_history(out_dir), DEFAULT_SCHEDULE, out_dir)
+        assert watcher.poll() == []
+        assert "No classes have been judged yet" in (out_dir / BOARD_FILE).read_text()
+
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_judgment(class_id="1", first=[3], second=[4], third=[1], commendations=[])
+        assert watcher.poll() == ["1"]
+        # nothing is rendered again until the show changes
+        assert watcher.poll() == []
+
+        manager.add_judgment(class_id="42", first=[1], second=[], third=[], commendations=[])
+        assert watcher.poll() == ["42"]
+        board = (out_dir / BOARD_FILE).read_text()
+        # the latest results come first
+        assert board.index("Class 42") < board.index("Class 1 ")
+        assert "<li>Carole Carrot: 3 points</li>" in board
+        assert watcher.show.class_lookup("1").fingerprint() == (
+            get_manager(out_dir).show.class_lookup("1").fingerprint()
+        )
+
+        # an allocation replaces the show, and with it the results
+        manager.allocate(registrar.entries())
+        assert watcher.poll() == []
+        assert "Class 42" not in (out_dir / BOARD_FILE).read_text()
+
+    def test_restart(self, registrar, out_dir):
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        manager.add_judgment(class_id="42", first=[1], second=[], third=[], commendations=[])
+        manager.add_judgment(class_id="1", first=[3], second=[4], third=[1], commendations=[])
+        manager.add_judgment(class_id="42", first=[], second=[1], third=[], commendations=[])
+        watcher = ResultsWatcher(get_history(out_dir), DEFAULT_SCHEDULE, out_dir)
+        assert watcher.poll() == ["1", "42"]
+        board = (out_dir / BOARD_FILE).read_text()
+        assert board.index("Class 42") < board.index("Class 1 ")
+
+    def test_pdf(self, registrar, out_dir):
+        manager = get_manager(out_dir)
+        manager.allocate(registrar.entries())
+        watcher = ResultsWatcher(get_history(out_dir), DEFAULT_SCHEDULE, out_dir, format="pdf")
+        assert sorted(watcher.poll()) == ["1", "25B", "25C", "42"]
+        manager.add_judgment(class_id="1", first=[3], second=[4], third=[1], commendations=[])
+        assert watcher.poll() == ["1"]
+        report = (out_dir / "final-class-report.pdf").read_bytes()
+        assert len(re.findall(rb"/Type /Page\b(?!s)", report)) == 4
+        assert (out_dir / "final-ranking-report.pdf").exists()